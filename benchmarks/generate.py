@@ -0,0 +1,269 @@
+"""Generator of synthetic packages for `make-translations` benchmarks.
+
+Run `python -m benchmarks.generate --help` from the repository root.
+"""
+
+import json
+import random
+from pathlib import Path
+
+import click
+import polib
+
+LANGUAGES = (
+    "cs", "en", "da", "de", "fr", "es", "it", "pl", "sk", "hu",
+    "nl", "sv", "fi", "pt", "ro", "hr", "sl", "bg", "el", "uk",
+)  # fmt: skip
+
+SIZES = {
+    "small": dict(
+        python_files=20, jinja_files=10, jsx_files=10, languages=3, entries=1_000
+    ),
+    "default": dict(
+        python_files=200, jinja_files=100, jsx_files=100, languages=10, entries=10_000
+    ),
+    "large": dict(
+        python_files=1000,
+        jinja_files=500,
+        jsx_files=500,
+        languages=10,
+        entries=100_000,
+    ),
+}
+
+MODULE = "bench_module"
+BABEL_OUTPUT_TRANSLATIONS = f"{MODULE}/translations"
+I18NEXT_OUTPUT_TRANSLATIONS = f"{MODULE}/theme/assets/semantic-ui/translations/{MODULE}"
+I18NEXT_SOURCE_PATH = f"{MODULE}/theme/assets/semantic-ui/js"
+
+
+def _split(total, parts):
+    """Splits `total` into `parts` almost equal chunks."""
+    if parts <= 0:
+        return []
+    return [total // parts + (1 if i < total % parts else 0) for i in range(parts)]
+
+
+def _write_python_file(path: Path, msgids):
+    lines = ["from oarepo_runtime.i18n import lazy_gettext as _", "", ""]
+    for i, msgid in enumerate(msgids):
+        lines.append(f"def function_{i}():")
+        lines.append(f"    return _({msgid!r})")
+        lines.append("")
+    path.write_text("\n".join(lines))
+
+
+def _write_jinja_file(path: Path, msgids):
+    lines = ["{#def example=None #}", "<div>"]
+    for i, msgid in enumerate(msgids):
+        if i % 2:
+            lines.append(f'    <Field label={{ _("{msgid}") }}></Field>')
+        else:
+            lines.append(f'    <h1>{{{{ _("{msgid}") }}}}</h1>')
+    lines.append("</div>")
+    path.write_text("\n".join(lines))
+
+
+def _write_html_file(path: Path, msgids):
+    lines = ["<div>"]
+    for msgid in msgids:
+        lines.append(f"  <span>{{{{ _('{msgid}') }}}}</span>")
+    lines.append("</div>")
+    path.write_text("\n".join(lines))
+
+
+def _write_jsx_file(path: Path, msgids, index):
+    lines = [
+        "import React from 'react'",
+        f'import {{ i18next }} from "@translations/{MODULE}/i18next";',
+        'import { Trans } from "react-i18next";',
+        "",
+        f"export const Component{index} = () =>",
+        "    <div>",
+    ]
+    for i, msgid in enumerate(msgids):
+        if i % 2:
+            lines.append(f"        <Trans>{msgid}</Trans>")
+        else:
+            lines.append(f"        <p>{{i18next.t('{msgid}')}}</p>")
+    lines.append("    </div>")
+    path.write_text("\n".join(lines))
+
+
+def _write_catalogue(path: Path, entries):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    catalogue = polib.POFile()
+    catalogue.metadata = {
+        "Project-Id-Version": "1.0",
+        "MIME-Version": "1.0",
+        "Content-Type": "text/plain; charset=utf-8",
+        "Content-Transfer-Encoding": "8bit",
+    }
+    for msgid, msgstr, occurrences in entries:
+        catalogue.append(
+            polib.POEntry(msgid=msgid, msgstr=msgstr, occurrences=occurrences)
+        )
+    catalogue.save(str(path))
+
+
+def generate_package(
+    root: Path,
+    python_files=200,
+    jinja_files=100,
+    jsx_files=100,
+    languages=10,
+    entries=10_000,
+    input_translations=2,
+    seed=0,
+) -> dict:
+    """Generates a synthetic package with translatable sources and existing catalogues.
+
+    Messages are split equally between python, html/jinja and jsx sources. Existing language
+    catalogues contain translations of about half of the messages, each of the
+    `input_translations` babel input directories translates another tenth of them and an
+    i18next input directory provides translations for a tenth of the jsx messages.
+
+    :param root: directory to create the package in (`setup.cfg` is written there)
+    :param python_files: number of python source files
+    :param jinja_files: number of JinjaX templates (plus the same number of html templates)
+    :param jsx_files: number of jsx source files
+    :param languages: number of languages
+    :param entries: total number of distinct messages
+    :param input_translations: number of babel input translation directories
+    :param seed: random seed, the same arguments always generate the same package
+    :return: i18n configuration of the package
+    """
+    rnd = random.Random(seed)
+    if languages > len(LANGUAGES):
+        raise ValueError(f"At most {len(LANGUAGES)} languages are supported")
+    language_codes = list(LANGUAGES[:languages])
+
+    module_dir = root / MODULE
+    templates_dir = module_dir / "templates"
+    js_dir = root / I18NEXT_SOURCE_PATH
+    for directory in (module_dir, templates_dir, js_dir):
+        directory.mkdir(parents=True, exist_ok=True)
+    (module_dir / "__init__.py").write_text("")
+
+    groups = [
+        g
+        for g in (
+            ("python", python_files),
+            ("template", jinja_files),
+            ("jsx", jsx_files),
+        )
+        if g[1]
+    ]
+    msgids = {}
+    occurrences = {}
+    counter = 0
+    for (kind, files), count in zip(groups, _split(entries, len(groups))):
+        msgids[kind] = []
+        for file_index, file_count in enumerate(_split(count, files)):
+            file_msgids = [f"{kind} message {counter + i}" for i in range(file_count)]
+            counter += file_count
+            msgids[kind] += file_msgids
+            if kind == "python":
+                path = module_dir / f"module_{file_index}.py"
+                _write_python_file(path, file_msgids)
+            elif kind == "template":
+                half = len(file_msgids) // 2
+                path = templates_dir / f"Component{file_index}.jinja"
+                _write_jinja_file(path, file_msgids[:half])
+                _write_html_file(
+                    templates_dir / f"page_{file_index}.html", file_msgids[half:]
+                )
+            else:
+                path = js_dir / f"Component{file_index}.jsx"
+                _write_jsx_file(path, file_msgids, file_index)
+            for line, msgid in enumerate(file_msgids):
+                occurrences[msgid] = [(str(path.relative_to(root)), str(line + 1))]
+
+    all_msgids = [msgid for kind_msgids in msgids.values() for msgid in kind_msgids]
+
+    for language in language_codes:
+        _write_catalogue(
+            root / BABEL_OUTPUT_TRANSLATIONS / language / "LC_MESSAGES" / "messages.po",
+            [
+                (
+                    msgid,
+                    f"{language} {msgid}" if rnd.random() < 0.5 else "",
+                    occurrences[msgid],
+                )
+                for msgid in all_msgids
+            ],
+        )
+
+    babel_input_translations = []
+    for input_index in range(input_translations):
+        input_dir = f"{MODULE}/input_{input_index}/translations"
+        babel_input_translations.append(input_dir)
+        for language in language_codes:
+            _write_catalogue(
+                root / input_dir / language / "LC_MESSAGES" / "messages.po",
+                [
+                    (msgid, f"{language} input {input_index} {msgid}", [])
+                    for msgid in all_msgids
+                    if rnd.random() < 0.1
+                ],
+            )
+
+    i18next_input_translations = []
+    if msgids.get("jsx"):
+        input_dir = f"{MODULE}/i18next_input"
+        i18next_input_translations.append(input_dir)
+        for language in language_codes:
+            path = root / input_dir / language / "translations.json"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(
+                json.dumps(
+                    {
+                        msgid: f"{language} i18next {msgid}"
+                        for msgid in msgids["jsx"]
+                        if rnd.random() < 0.1
+                    }
+                )
+            )
+
+    i18n_configuration = {
+        "languages": language_codes,
+        "babel_source_paths": [MODULE],
+        "babel_input_translations": babel_input_translations,
+        "babel_output_translations": BABEL_OUTPUT_TRANSLATIONS,
+        "i18next_source_paths": [I18NEXT_SOURCE_PATH],
+        "i18next_input_translations": i18next_input_translations,
+        "i18next_output_translations": I18NEXT_OUTPUT_TRANSLATIONS,
+    }
+
+    setup_cfg = ["[oarepo.i18n]"]
+    for key, value in i18n_configuration.items():
+        if isinstance(value, list):
+            setup_cfg.append(f"{key} =")
+            setup_cfg += [f"    {item}" for item in value]
+        else:
+            setup_cfg.append(f"{key} = {value}")
+    (root / "setup.cfg").write_text("\n".join(setup_cfg) + "\n")
+
+    return i18n_configuration
+
+
+@click.command(help="Generates a synthetic package for make-translations benchmarks.")
+@click.argument("root", type=click.Path(file_okay=False))
+@click.option("--size", type=click.Choice(list(SIZES)), default="default")
+@click.option("--python-files", type=int)
+@click.option("--jinja-files", type=int)
+@click.option("--jsx-files", type=int)
+@click.option("--languages", type=int)
+@click.option("--entries", type=int)
+@click.option("--input-translations", type=int, default=2, show_default=True)
+def main(root, size, input_translations, **overrides):
+    options = {
+        **SIZES[size],
+        **{k: v for k, v in overrides.items() if v is not None},
+    }
+    generate_package(Path(root), input_translations=input_translations, **options)
+    click.secho(f"Generated package in {root} ({options})", fg="green")
+
+
+if __name__ == "__main__":
+    main()
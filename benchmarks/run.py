@@ -0,0 +1,432 @@
+"""Benchmarks of `oarepo_tools.babel` and `oarepo_tools.i18next` on synthetic packages.
+
+Run `python -m benchmarks.run --help` from the repository root.
+"""
+
+import contextlib
+import io
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import click
+
+from oarepo_tools import po
+from oarepo_tools.babel import (
+    compile_babel_translations,
+    ensure_babel_configuration,
+    ensure_babel_output_translations,
+    extract_babel_messages,
+    load_cached_catalogue,
+    load_catalogue,
+    merge_babel_catalogues,
+    merge_catalogue_dirs,
+    update_babel_translations,
+)
+from oarepo_tools.i18next import (
+    compile_i18next_translations,
+    ensure_i18next_output_translations,
+    extract_i18next_messages,
+    merge_catalogues_from_i18next_translation_dir,
+    merge_i18next_messages_to_po,
+    npm_proj_cwd,
+)
+from oarepo_tools.make_translations import make_translations
+
+from .generate import SIZES, generate_package
+
+BASELINE_FILE = Path(__file__).parent / "baseline.json"
+
+# name -> (function, requires node toolchain, untimed setup function)
+BENCHMARKS = {}
+
+
+def benchmark(name, node=False, setup=None):
+    def decorator(func):
+        BENCHMARKS[name] = (func, node, setup)
+        return func
+
+    return decorator
+
+
+class Workspace:
+    """A fresh copy of the generated package a benchmark runs in."""
+
+    def __init__(self, base_dir: Path, i18n_configuration: dict):
+        self.base_dir = base_dir
+        self.config = i18n_configuration
+        self.babel_ini_file = base_dir / "babel.ini"
+        self.translations_dir = (
+            base_dir / i18n_configuration["babel_output_translations"]
+        )
+        self.i18next_dir = base_dir / i18n_configuration["i18next_output_translations"]
+        self.messages_pot = base_dir / ".bench" / "messages.pot"
+        self.language = i18n_configuration["languages"][0]
+
+    def catalogue(self, language=None):
+        language = language or self.language
+        return self.translations_dir / language / "LC_MESSAGES" / "messages.po"
+
+
+@benchmark("babel.ensure_babel_configuration")
+def bench_ensure_babel_configuration(ws: Workspace):
+    ensure_babel_configuration(ws.base_dir)
+
+
+@benchmark("babel.ensure_babel_output_translations")
+def bench_ensure_babel_output_translations(ws: Workspace):
+    ensure_babel_output_translations(ws.base_dir, ws.config)
+
+
+@benchmark("babel.extract_babel_messages")
+def bench_extract_babel_messages(ws: Workspace):
+    output_dir = ws.base_dir / ".bench" / "extracted"
+    output_dir.mkdir(parents=True)
+    extract_babel_messages(
+        ws.base_dir, ws.babel_ini_file, output_dir, ws.config, jobs=1
+    )
+
+
+@benchmark("babel.extract_babel_messages[parallel]")
+def bench_extract_babel_messages_parallel(ws: Workspace):
+    output_dir = ws.base_dir / ".bench" / "extracted"
+    output_dir.mkdir(parents=True)
+    extract_babel_messages(ws.base_dir, ws.babel_ini_file, output_dir, ws.config)
+
+
+def _extract_babel_messages_cached(ws: Workspace):
+    output_dir = ws.base_dir / ".bench" / "extracted"
+    output_dir.mkdir(parents=True, exist_ok=True)
+    extract_babel_messages(
+        ws.base_dir,
+        ws.babel_ini_file,
+        output_dir,
+        ws.config,
+        cache_dir=ws.base_dir / ".bench" / "cache",
+        jobs=1,
+    )
+
+
+@benchmark("babel.extract_babel_messages[cached]", setup=_extract_babel_messages_cached)
+def bench_extract_babel_messages_cached(ws: Workspace):
+    # one changed file, the others are taken from the extraction cache
+    source = ws.base_dir / "bench_module" / "module_0.py"
+    source.write_text(source.read_text() + "\n_('changed message')\n")
+    _extract_babel_messages_cached(ws)
+
+
+@benchmark("babel.load_catalogue")
+def bench_load_catalogue(ws: Workspace):
+    load_catalogue(ws.messages_pot)
+
+
+@benchmark("babel.load_cached_catalogue")
+def bench_load_cached_catalogue(ws: Workspace):
+    load_cached_catalogue(ws.messages_pot)
+    load_cached_catalogue(ws.messages_pot)
+
+
+@benchmark("babel.merge_babel_catalogues")
+def bench_merge_babel_catalogues(ws: Workspace):
+    merge_babel_catalogues(ws.messages_pot, ws.catalogue())
+
+
+@benchmark("po.pofile[native]")
+def bench_pofile_native(ws: Workspace):
+    po.pofile(ws.catalogue())
+
+
+@benchmark("po.pofile[polib]")
+def bench_pofile_polib(ws: Workspace):
+    with po.po_engine("polib"):
+        po.pofile(ws.catalogue())
+
+
+def _parse_catalogue(ws: Workspace):
+    ws.parsed_catalogue = po.pofile(ws.catalogue())
+
+
+def _save_catalogue(ws: Workspace):
+    ws.parsed_catalogue.save(str(ws.catalogue()))
+    ws.parsed_catalogue.save_as_mofile(str(ws.catalogue().with_suffix(".mo")))
+
+
+@benchmark("po.save[native]", setup=_parse_catalogue)
+def bench_save_native(ws: Workspace):
+    _save_catalogue(ws)
+
+
+@benchmark("po.save[polib]", setup=_parse_catalogue)
+def bench_save_polib(ws: Workspace):
+    with po.po_engine("polib"):
+        _save_catalogue(ws)
+
+
+@benchmark("babel.update_babel_translations[serial]")
+def bench_update_babel_translations_serial(ws: Workspace):
+    update_babel_translations(
+        ws.messages_pot,
+        ws.translations_dir,
+        [ws.base_dir / d for d in ws.config["babel_input_translations"]],
+        jobs=1,
+    )
+
+
+@benchmark("babel.update_babel_translations[parallel]")
+def bench_update_babel_translations_parallel(ws: Workspace):
+    update_babel_translations(
+        ws.messages_pot,
+        ws.translations_dir,
+        [ws.base_dir / d for d in ws.config["babel_input_translations"]],
+    )
+
+
+@benchmark("babel.merge_catalogue_dirs")
+def bench_merge_catalogue_dirs(ws: Workspace):
+    merge_catalogue_dirs(
+        ws.base_dir / ws.config["babel_input_translations"][0], ws.translations_dir
+    )
+
+
+@benchmark("babel.merge_catalogue_dirs[all]")
+def bench_merge_catalogue_dirs_all(ws: Workspace):
+    merge_catalogue_dirs(
+        [ws.base_dir / d for d in ws.config["babel_input_translations"]],
+        ws.translations_dir,
+    )
+
+
+@benchmark("babel.compile_babel_translations")
+def bench_compile_babel_translations(ws: Workspace):
+    compile_babel_translations(ws.translations_dir)
+
+
+@benchmark("i18next.merge_i18next_messages_to_po")
+def bench_merge_i18next_messages_to_po(ws: Workspace):
+    merge_i18next_messages_to_po(
+        ws.base_dir
+        / ws.config["i18next_input_translations"][0]
+        / ws.language
+        / "translations.json",
+        ws.catalogue(),
+    )
+
+
+@benchmark("i18next.merge_catalogues_from_i18next_translation_dir")
+def bench_merge_catalogues_from_i18next_translation_dir(ws: Workspace):
+    merge_catalogues_from_i18next_translation_dir(
+        ws.base_dir / ws.config["i18next_input_translations"][0], ws.translations_dir
+    )
+
+
+@benchmark("i18next.merge_catalogues_from_i18next_translation_dir[all]")
+def bench_merge_catalogues_from_i18next_translation_dir_all(ws: Workspace):
+    merge_catalogues_from_i18next_translation_dir(
+        [ws.base_dir / d for d in ws.config["i18next_input_translations"]],
+        ws.translations_dir,
+    )
+
+
+@benchmark("i18next.ensure_i18next_output_translations")
+def bench_ensure_i18next_output_translations(ws: Workspace):
+    ensure_i18next_output_translations(ws.base_dir, ws.config)
+
+
+def _extract_i18next_messages(ws: Workspace, engine):
+    output_dir = ws.base_dir / ".bench" / "i18next"
+    output_dir.mkdir(parents=True)
+    extract_i18next_messages(
+        ws.base_dir,
+        output_dir,
+        {**ws.config, "i18next_scanner": engine, "i18next_converter": engine},
+    )
+
+
+@benchmark("i18next.extract_i18next_messages[native]")
+def bench_extract_i18next_messages_native(ws: Workspace):
+    _extract_i18next_messages(ws, "native")
+
+
+@benchmark("i18next.extract_i18next_messages[node]", node=True)
+def bench_extract_i18next_messages_node(ws: Workspace):
+    _extract_i18next_messages(ws, "node")
+
+
+def _compile_i18next_translations(ws: Workspace, converter):
+    for language in ws.config["languages"]:
+        (ws.i18next_dir / "messages" / language / "LC_MESSAGES").mkdir(
+            parents=True, exist_ok=True
+        )
+    compile_i18next_translations(
+        ws.translations_dir,
+        ws.i18next_dir,
+        {**ws.config, "i18next_converter": converter},
+    )
+
+
+@benchmark("i18next.compile_i18next_translations[native]")
+def bench_compile_i18next_translations_native(ws: Workspace):
+    _compile_i18next_translations(ws, "native")
+
+
+@benchmark("i18next.compile_i18next_translations[node]", node=True)
+def bench_compile_i18next_translations_node(ws: Workspace):
+    _compile_i18next_translations(ws, "node")
+
+
+@benchmark("make_translations[without-ui,cold]")
+def bench_make_translations_cold(ws: Workspace):
+    make_translations(ws.base_dir, without_ui=True)
+
+
+@benchmark("make_translations[without-ui,warm]", setup=bench_make_translations_cold)
+def bench_make_translations_warm(ws: Workspace):
+    # the build manifest was recorded by the setup, nothing should be rebuilt
+    make_translations(ws.base_dir, without_ui=True)
+
+
+def node_toolchain_available():
+    return (Path(npm_proj_cwd) / "node_modules").exists() and shutil.which("npm")
+
+
+@contextlib.contextmanager
+def _quiet(verbose):
+    if verbose:
+        yield
+        return
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(
+        io.StringIO()
+    ):
+        yield
+
+
+def prepare_template(root: Path, size: str, verbose=False) -> dict:
+    """Generates the package all benchmarks copy and its shared artifacts."""
+    i18n_configuration = generate_package(root / "package", **SIZES[size])
+    base_dir = root / "package"
+    cwd = os.getcwd()
+    try:
+        os.chdir(base_dir)
+        with _quiet(verbose):
+            babel_ini_file = ensure_babel_configuration(base_dir)
+            messages_dir = base_dir / ".bench"
+            messages_dir.mkdir()
+            extract_babel_messages(
+                base_dir, babel_ini_file, messages_dir, i18n_configuration
+            )
+    finally:
+        os.chdir(cwd)
+    return i18n_configuration
+
+
+def run_benchmark(root: Path, func, setup, i18n_configuration, repeat, verbose=False):
+    """Runs `func` `repeat` times, each time in a fresh copy of the package.
+
+    :return: the best wall time in seconds
+    """
+    timings = []
+    template = root / "package"
+    for i in range(repeat):
+        workspace_dir = root / f"run-{i}"
+        shutil.copytree(template, workspace_dir)
+        cwd = os.getcwd()
+        try:
+            os.chdir(workspace_dir)
+            workspace = Workspace(workspace_dir, i18n_configuration)
+            with _quiet(verbose):
+                if setup is not None:
+                    setup(workspace)
+                started = time.perf_counter()
+                func(workspace)
+                timings.append(time.perf_counter() - started)
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(workspace_dir)
+    return min(timings)
+
+
+@click.command(help="Runs benchmarks and compares the results with a baseline.")
+@click.option("--size", type=click.Choice(list(SIZES)), default="default")
+@click.option("--repeat", type=int, default=3, show_default=True)
+@click.option(
+    "-k", "--filter", "name_filter", help="Run only benchmarks containing this text."
+)
+@click.option(
+    "--baseline",
+    "baseline_file",
+    type=click.Path(dir_okay=False),
+    default=str(BASELINE_FILE),
+    show_default=True,
+)
+@click.option(
+    "--threshold",
+    type=float,
+    default=1.5,
+    show_default=True,
+    help="Fail when a benchmark is slower than baseline * threshold.",
+)
+@click.option(
+    "--update-baseline", is_flag=True, help="Store the results as the new baseline."
+)
+@click.option("--verbose", is_flag=True, help="Show output of benchmarked functions.")
+def main(size, repeat, name_filter, baseline_file, threshold, update_baseline, verbose):
+    baseline_file = Path(baseline_file)
+    baseline = json.loads(baseline_file.read_text()) if baseline_file.exists() else {}
+    size_baseline = baseline.get(size, {})
+    has_node = node_toolchain_available()
+
+    results = {}
+    regressions = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        click.secho(f"Generating {size} package: {SIZES[size]}", fg="green")
+        i18n_configuration = prepare_template(root, size, verbose=verbose)
+
+        click.secho(
+            f"{'benchmark':60} {'time [s]':>10} {'baseline':>10} {'ratio':>7}",
+            bold=True,
+        )
+        for name, (func, node, setup) in BENCHMARKS.items():
+            if name_filter and name_filter not in name:
+                continue
+            if node and not has_node:
+                click.secho(f"{name:60} {'skipped (no node toolchain)':>29}")
+                continue
+
+            result = run_benchmark(
+                root, func, setup, i18n_configuration, repeat, verbose=verbose
+            )
+            results[name] = round(result, 4)
+
+            expected = size_baseline.get(name)
+            if expected:
+                ratio = result / expected
+                regressed = ratio > threshold
+                if regressed:
+                    regressions.append(name)
+                click.secho(
+                    f"{name:60} {result:10.4f} {expected:10.4f} {ratio:7.2f}",
+                    fg="red" if regressed else None,
+                )
+            else:
+                click.secho(f"{name:60} {result:10.4f} {'-':>10} {'-':>7}")
+
+    if update_baseline:
+        baseline[size] = {**size_baseline, **results}
+        baseline_file.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        click.secho(f"Baseline written to {baseline_file}", fg="green")
+    elif regressions:
+        click.secho(
+            f"{len(regressions)} benchmark(s) slower than {threshold}x baseline: "
+            f"{', '.join(regressions)}",
+            fg="red",
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
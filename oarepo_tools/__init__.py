@@ -1,7 +1,17 @@
+import multiprocessing
+import os
+import pickle
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
 
 import click
 
+from . import po
+from .manifest import count_outputs, counting_outputs
+
 
 def validate_output_translations_dir(
     base_dir, i18n_configuration, config_key, create_if_missing=False
@@ -40,3 +50,107 @@ def validate_source_paths(
         sanitized_source_paths.append(source_path)
 
     return sanitized_source_paths
+
+
+def configured_choice(i18n_configuration, config_key, choices):
+    """Returns the value of `config_key` of the i18n configuration, the first of `choices`
+    when it is not set.
+
+    :raises SystemExit: when the configured value is not one of `choices`
+    """
+    value = i18n_configuration.get(config_key) or choices[0]
+    if value not in choices:
+        click.secho(
+            f"configuration error: `{config_key}` must be one of "
+            f"{', '.join(choices)}, not {value}",
+            fg="red",
+        )
+        sys.exit(1)
+    return value
+
+
+# pool of worker processes shared by all `parallel_map` calls inside `worker_pool()`
+_shared_executor = None
+
+# (path, object) of the last shared data loaded by this worker process
+_worker_shared_data = (None, None)
+
+
+@contextmanager
+def worker_pool(jobs=None):
+    """Shares a single pool of worker processes among all `parallel_map` calls in the block.
+
+    Worker processes (and anything they cache, e.g. parsed input catalogues) are then reused,
+    for example when building several packages in one process.
+
+    :param jobs: number of worker processes (default: number of CPUs)
+    """
+    global _shared_executor
+    if _shared_executor is not None:
+        yield _shared_executor
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=jobs or os.cpu_count() or 1,
+        mp_context=multiprocessing.get_context("spawn"),
+    ) as executor:
+        _shared_executor = executor
+        try:
+            yield executor
+        finally:
+            _shared_executor = None
+
+
+def _load_shared_data(path):
+    global _worker_shared_data
+    if _worker_shared_data[0] != path:
+        with open(path, "rb") as f:
+            _worker_shared_data = (path, pickle.load(f))
+    return _worker_shared_data[1]
+
+
+def _call_with_shared_data(task):
+    func, shared_data_path, item, engine = task
+    with po.po_engine(engine), counting_outputs() as outputs:
+        result = func(_load_shared_data(shared_data_path), item)
+    return result, outputs
+
+
+def parallel_map(func, items, jobs=None, shared_data=None):
+    """Calls `func(shared_data, item)` on every item of `items` in a pool of worker processes.
+
+    `shared_data` is pickled only once and each worker process loads it only once,
+    regardless of the number of items it processes.
+
+    :param func: picklable (module-level) function taking the shared data and a single item
+    :param items: items to process
+    :param jobs: maximum number of worker processes (default: number of CPUs), ignored
+                 inside a `worker_pool()` block
+    :param shared_data: picklable object passed to every call of `func`
+    :return: list of results in the order of `items`
+    """
+    items = list(items)
+    jobs = min(jobs or os.cpu_count() or 1, len(items))
+
+    if jobs <= 1 or (_shared_executor is not None and len(items) <= 1):
+        # not worth handing the work to another process
+        return [func(shared_data, item) for item in items]
+
+    with tempfile.NamedTemporaryFile(suffix=".pickle") as shared_data_file:
+        pickle.dump(shared_data, shared_data_file, protocol=pickle.HIGHEST_PROTOCOL)
+        shared_data_file.flush()
+        # worker processes parse and write catalogues by the engine of this process
+        tasks = [(func, shared_data_file.name, item, po.PO_ENGINE) for item in items]
+
+        if _shared_executor is not None:
+            results = list(_shared_executor.map(_call_with_shared_data, tasks))
+        else:
+            with ProcessPoolExecutor(
+                max_workers=jobs, mp_context=multiprocessing.get_context("spawn")
+            ) as executor:
+                results = list(executor.map(_call_with_shared_data, tasks))
+
+    # outputs written by the worker processes are counted in this process
+    for _, outputs in results:
+        count_outputs(**outputs)
+    return [result for result, _ in results]
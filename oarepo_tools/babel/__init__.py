@@ -1,14 +1,37 @@
-import re
-import shutil
+import copy
+import io
+import os
 import sys
 from pathlib import Path
+from typing import Optional
 
 import click
 
-from oarepo_tools import validate_output_translations_dir, validate_source_paths
+from oarepo_tools import (
+    extraction,
+    parallel_map,
+    validate_output_translations_dir,
+    validate_source_paths,
+)
+from oarepo_tools.extraction import extraction_shards
+from oarepo_tools.index import BABEL_FILE_KINDS, FileIndex, classify
+from oarepo_tools.manifest import write_output
+from oarepo_tools.po import Catalogue, Entry, pofile, save_catalogue, save_template
+from oarepo_tools.prefilter import JINJA_TRANS_BLOCK, marker_pattern, prefilter
+from oarepo_tools.profiling import add_counters, add_record, measure
 
 try:
-    from babel.messages.frontend import CommandLineInterface
+    from babel.messages.catalog import Catalog
+    from babel.messages.extract import DEFAULT_KEYWORDS, check_and_call_extract_file
+    from babel.messages.frontend import parse_keywords
+    from babel.messages.mofile import write_mo
+    from babel.messages.pofile import read_po
+    from babel.util import pathmatch
+
+    try:
+        from babel.messages.frontend import parse_mapping_cfg
+    except ImportError:  # babel < 2.14
+        from babel.messages.frontend import parse_mapping as parse_mapping_cfg
 except ImportError:
     click.secho(
         "Babel is not installed in the current virtualenv. "
@@ -41,6 +64,19 @@ except ImportError:
     )
     sys.exit(1)
 
+# Glob patterns of source files that are scanned by babel (see babel.ini)
+BABEL_SOURCE_PATTERNS = ("**/*.py", "**/*.html", "**/*.jinja")
+
+# Keywords of translation functions extracted in addition to the babel defaults (`_`, `gettext`, ...)
+BABEL_KEYWORDS = ("lazy_gettext",)
+
+# Fewer files than this are extracted in this process, starting worker processes
+# (which import jinja2 and the extractors) would take longer than the extraction
+PARALLEL_EXTRACTION_MIN_FILES = 100
+
+# babel.ini shipped with oarepo-tools, installed into every package
+BABEL_CONFIGURATION = Path(__file__).parent / "babel.ini"
+
 
 def ensure_babel_configuration(base_dir: Path):
     """Ensures that babel.ini is installed in package root and up-to-date.
@@ -50,12 +86,12 @@ def ensure_babel_configuration(base_dir: Path):
     """
     babel_ini_file = base_dir / "babel.ini"
     # check if babel.ini exists and if it does not, create it
-    if not babel_ini_file.exists():
-        shutil.copy(Path(__file__).parent / "babel.ini", babel_ini_file)
-        click.secho(f"Created babel.ini in {base_dir}", fg="green")
-    else:
-        shutil.copy(Path(__file__).parent / "babel.ini", babel_ini_file)
-        click.secho(f"Updated babel.ini in {base_dir}", fg="yellow")
+    exists = babel_ini_file.exists()
+    if write_output(babel_ini_file, BABEL_CONFIGURATION.read_bytes()):
+        if exists:
+            click.secho(f"Updated babel.ini in {base_dir}", fg="yellow")
+        else:
+            click.secho(f"Created babel.ini in {base_dir}", fg="green")
 
     return babel_ini_file
 
@@ -94,85 +130,280 @@ def ensure_babel_output_translations(base_dir: Path, i18n_configuration: dict) -
     return output_dir
 
 
-def extract_babel_messages(
-    base_dir: Path, babel_ini_file: Path, output_dir: Path, i18n_configuration: dict
-):
+def read_babel_configuration(babel_ini_file: Path):
+    """Parses `babel.ini`.
+
+    :return: tuple of method map (list of (pattern, extraction method)) and options map
+             (pattern -> options of the extraction method)
     """
-    Collects all gettext translation keys from `babel_source_paths` using `pybabel` and
-    stores it in a `messages.pot` catalogue in the root of `output_dir`.
+    with open(babel_ini_file) as f:
+        return parse_mapping_cfg(f, filename=str(babel_ini_file))
+
+
+def _match_extractor(method_map, options_map, relative_path):
+    # the same matching as `babel.messages.extract.check_and_call_extract_file`
+    for pattern, method in method_map:
+        if not pathmatch(pattern, relative_path):
+            continue
+        for options_pattern, options in options_map.items():
+            if pathmatch(options_pattern, relative_path):
+                return method, options
+        return method, {}
+    return None
+
+
+class ExtractionCache(extraction.ExtractionCache):
+    """Cache of babel messages extracted from single source files,
+    see :class:`oarepo_tools.extraction.ExtractionCache`.
+    """
+
+    def get(self, key: str):
+        """Returns cached messages, a list of (lineno, message, comments, context) as returned
+        by `babel.messages.extract.extract_from_file`, or None when not cached."""
+        messages = super().get(key)
+        if messages is None:
+            return None
+        return [
+            (lineno, tuple(message) if isinstance(message, list) else message, *rest)
+            for lineno, message, *rest in messages
+        ]
+
+
+def _extract_files(shared_data, source_files: list) -> dict:
+    base_dir, method_map, options_map, keywords = shared_data
+    return {
+        source_file: [
+            message[1:]
+            for message in check_and_call_extract_file(
+                source_file,
+                method_map,
+                options_map,
+                callback=None,
+                keywords=keywords,
+                comment_tags=(),
+                strip_comment_tags=False,
+                dirpath=base_dir,
+            )
+        ]
+        for source_file in source_files
+    }
+
+
+def extract_babel_catalogue(
+    base_dir: Path,
+    babel_ini_file: Path,
+    i18n_configuration: dict,
+    source_files=None,
+    cache_dir: Path = None,
+    jobs=None,
+) -> Optional[polib.POFile]:
+    """
+    Collects all gettext translation keys from `babel_source_paths` with extractors
+    configured in `babel.ini` into an in-memory messages template.
 
     :param base_dir: Python package root directory (containing `setup.cfg` or `oarepo.yaml`)
     :param babel_ini_file: path to the `babel.ini` configuration file
-    :param output_dir: path to a directory, where `messages.pot` should be created
-    :param i18n_configuration: _description_
-    :return: returns a path to the resulting `messages.pot` catalogue
+    :param i18n_configuration:
+    :param source_files: files to extract the messages from (e.g. taken from
+                         a :class:`oarepo_tools.index.FileIndex`), when not given
+                         `babel_source_paths` are walked
+    :param cache_dir: directory of the :class:`ExtractionCache`, when given only files
+                      that changed since the last extraction are extracted again
+    :param jobs: maximum number of worker processes the files are extracted in
+                 (default: number of CPUs), 1 extracts in this process. The result
+                 does not depend on the number of processes.
+    :return: catalogue of the extracted messages with their locations (relative
+             to `base_dir`) and flags or None if there are no sources
     """
-    babel_source_paths = validate_source_paths(
-        base_dir, i18n_configuration, "babel_source_paths"
-    )
-    if not babel_source_paths:
+    if source_files is None:
+        babel_source_paths = validate_source_paths(
+            base_dir, i18n_configuration, "babel_source_paths"
+        )
+        source_files = (
+            FileIndex(base_dir=base_dir).files(
+                babel_source_paths, BABEL_SOURCE_PATTERNS
+            )
+            if babel_source_paths
+            else []
+        )
+    source_files = [path for path in source_files if classify(path) in BABEL_FILE_KINDS]
+    if not source_files:
         click.secho(
             f"Skipping babel extraction: no valid source paths",
             fg="yellow",
         )
-        return
-
-    jinjax_extra_source = output_dir / "jinjax_messages.jinja"
-    babel_source_paths.append(jinjax_extra_source)
-
-    messages_pot = output_dir / "messages.pot"
+        return None
+
+    click.secho(f"Extracting babel messages from {len(source_files)} files")
+
+    method_map, options_map = read_babel_configuration(babel_ini_file)
+    keywords = {**DEFAULT_KEYWORDS, **parse_keywords(BABEL_KEYWORDS)}
+    cache = ExtractionCache(cache_dir) if cache_dir is not None else None
+
+    # (relative path, messages or None when they are to be extracted) in file order
+    sources = []
+    pending = {}
+    for source_file in source_files:
+        relative_path = os.path.relpath(source_file, base_dir).replace(os.sep, "/")
+        extractor = _match_extractor(method_map, options_map, relative_path)
+        if extractor is None:
+            continue
+
+        messages = None
+        if cache is not None:
+            key = ExtractionCache.key(source_file, *extractor, keywords)
+            messages = cache.get(key)
+            if messages is None:
+                pending[str(source_file)] = key
+        else:
+            pending[str(source_file)] = None
+        sources.append((relative_path, str(source_file), messages))
+
+    # files without any call of a keyword (or a trans block) have no messages
+    candidates = prefilter(
+        list(pending), marker_pattern(keywords, [JINJA_TRANS_BLOCK]), "babel"
+    )
+    extracted_messages = {source_file: [] for source_file in pending}
+    shards = extraction_shards(candidates, jobs, PARALLEL_EXTRACTION_MIN_FILES)
+    for shard_messages in parallel_map(
+        _extract_files,
+        shards,
+        jobs=jobs,
+        shared_data=(str(base_dir), method_map, options_map, keywords),
+    ):
+        extracted_messages.update(shard_messages)
+    extracted = len(candidates)
+
+    # babel catalogue merges occurrences of the same message and sets format flags,
+    # messages are added in file order regardless of how the extraction was sharded
+    catalogue = Catalog(charset="utf-8")
+    for relative_path, source_file, messages in sources:
+        if messages is None:
+            messages = extracted_messages[source_file]
+            if cache is not None:
+                cache.put(pending[source_file], messages)
+
+        for lineno, message, comments, context in messages:
+            catalogue.add(
+                message,
+                None,
+                [(relative_path, lineno)],
+                auto_comments=comments,
+                context=context,
+            )
 
+    if cache is not None:
+        cache.prune()
+    add_counters(files_extracted=extracted)
     click.secho(
-        f"Extracting babel messages from {', '.join([str(p) for p in babel_source_paths])} -> {str(messages_pot)}"
+        f"Extracted {extracted} files, {len(sources) - len(pending)} unchanged files taken from cache"
     )
 
-    jinjax_code = ""
-    i18string_regex = re.compile(r"([^\{]|^)(\{\s*_\(.*?\)\s*\})[^\}]")
-
-    for source_path in babel_source_paths:
-        for fpath in Path(source_path).glob("**/*.jinja"):
-            jinjax_code += fpath.read_text().replace("\n", " ")
-
-    with open(str(jinjax_extra_source), mode="w+") as jinjax_trans:
-        for match in re.finditer(i18string_regex, jinjax_code):
-            i18str = f"{{{match.group(match.lastindex)}}}"
-            jinjax_trans.write(f"{i18str}\n")
-
-    CommandLineInterface().run(
-        [
-            "pybabel",
-            "extract",
-            "-F",
-            str(babel_ini_file),
-            "-k",
-            "lazy_gettext",
-            "-o",
-            str(messages_pot),
-            *[str(s) for s in babel_source_paths],
-        ]
+    return _to_pofile(catalogue)
+
+
+def _to_pofile(catalogue: Catalog) -> polib.POFile:
+    result = Catalogue()
+    result.header = "\n".join(
+        line[2:] if line.startswith("# ") else line.lstrip("#")
+        for line in catalogue.header_comment.splitlines()
     )
+    result.metadata = {name: value.strip() for name, value in catalogue.mime_headers}
+    # `#, fuzzy` of the header, as written by `pybabel extract`
+    result.metadata_is_fuzzy = ["fuzzy"] if catalogue.fuzzy else []
+    for message in catalogue:
+        if not message.id:
+            continue
+        entry = Entry(
+            msgid=message.id[0] if message.pluralizable else message.id,
+            msgctxt=message.context,
+            occurrences=[(path, str(lineno)) for path, lineno in message.locations],
+            flags=sorted(message.flags),
+            comment="\n".join(message.auto_comments),
+        )
+        if message.pluralizable:
+            entry.msgid_plural = message.id[1]
+            entry.msgstr_plural = {0: "", 1: ""}
+        result.append(entry)
+    return result
 
-    # Cleanup helper file for special JinjaX translation keys
-    Path(jinjax_extra_source).unlink()
 
+def extract_babel_messages(
+    base_dir: Path,
+    babel_ini_file: Path,
+    output_dir: Path,
+    i18n_configuration: dict,
+    source_files=None,
+    cache_dir: Path = None,
+    jobs=None,
+):
+    """
+    Collects all gettext translation keys from `babel_source_paths` and
+    stores it in a `messages.pot` catalogue in the root of `output_dir`.
+
+    See :func:`extract_babel_catalogue` for the parameters, use it directly when
+    the catalogue is not needed on disk.
+
+    :param output_dir: path to a directory, where `messages.pot` should be created
+    :return: returns a path to the resulting `messages.pot` catalogue
+    """
+    catalogue = extract_babel_catalogue(
+        base_dir,
+        babel_ini_file,
+        i18n_configuration,
+        source_files=source_files,
+        cache_dir=cache_dir,
+        jobs=jobs,
+    )
+    if catalogue is None:
+        return None
+
+    messages_pot = output_dir / "messages.pot"
+    save_template(catalogue, messages_pot)
     return messages_pot
 
 
-def update_babel_translations(messages_pot: Path, translations_dir: Path):
+def update_babel_translations(
+    messages_pot: Path, translations_dir: Path, input_translations_dirs=(), jobs=None
+):
     """
     Updates message catalogues with entries from `messages_pot` file
-    for each language messages catalogue in `translation_dir`.
+    for each language messages catalogue in `translation_dir` and merges in
+    catalogues of the same language from `input_translations_dirs` (in the given order).
 
-    :param messages_pot: path to the source `messages.pot` file
+    Languages are processed in parallel by a pool of worker processes. `messages_pot`
+    is parsed only once and loaded by each worker only once. Every language catalogue
+    is parsed and written only once, use :func:`compile_babel_translations` to compile
+    the updated catalogues to `.mo` files.
+
+    :param messages_pot: path to the source `messages.pot` file or an already parsed catalogue
     :param translations_dir: path to a directory with babel translations catalogues
+    :param input_translations_dirs: paths to directories with extra babel translations catalogues
+    :param jobs: maximum number of worker processes
     """
     if translations_dir.exists():
         click.secho(f"Updating messages in {translations_dir}", fg="green")
-        for catalogue_file in translations_dir.glob("*/LC_MESSAGES/*.po"):
-            merge_babel_catalogues(
-                messages_pot,
-                translations_dir / catalogue_file.relative_to(translations_dir),
-            )
+        tasks = []
+        for catalogue_file in sorted(translations_dir.glob("*/LC_MESSAGES/*.po")):
+            relative_path = catalogue_file.relative_to(translations_dir)
+            input_catalogue_files = []
+            for input_translations_dir in input_translations_dirs:
+                input_catalogue_file = input_translations_dir / relative_path
+                if input_catalogue_file.exists():
+                    click.secho(
+                        f"Merging {input_catalogue_file} into {translations_dir}",
+                        fg="yellow",
+                    )
+                    input_catalogue_files.append(input_catalogue_file)
+            tasks.append((catalogue_file, input_catalogue_files))
+
+        for record in parallel_map(
+            _update_babel_catalogue,
+            tasks,
+            jobs=jobs,
+            shared_data=load_catalogue(messages_pot),
+        ):
+            add_record(record)
     else:
         click.secho(
             f"Cannot update babel translations. Target directory {str(translations_dir)} missing.",
@@ -181,25 +412,157 @@ def update_babel_translations(messages_pot: Path, translations_dir: Path):
         sys.exit()
 
 
-def compile_babel_translations(translations_dir):
+def _update_babel_catalogue(messages_template, task):
+    catalogue_file, input_catalogue_files = task
+    with measure(
+        f"update[{catalogue_file.parent.parent.name}]",
+        entries_merged=len(messages_template),
+    ) as record:
+        input_catalogues = [
+            load_cached_catalogue(input_catalogue_file)
+            for input_catalogue_file in input_catalogue_files
+        ]
+        # the .mo file is written by compile_babel_translations
+        merge_babel_catalogue_files(
+            [messages_template, *input_catalogues], catalogue_file, compile_mo=False
+        )
+        record["entries_merged"] += sum(map(len, input_catalogues))
+    return record
+
+
+def compile_babel_translations(translations_dir, jobs=None):
+    """Compiles `messages.po` catalogues of all languages in `translations_dir` to `.mo` files.
+
+    Languages are compiled in parallel by a pool of worker processes.
+
+    :param translations_dir: path to a directory with babel translations catalogues
+    :param jobs: maximum number of worker processes
+    """
     click.secho(f"Compiling messages in {translations_dir}", fg="green")
 
-    CommandLineInterface().run(["pybabel", "compile", "-f", "-d", translations_dir])
+    catalogue_files = sorted(Path(translations_dir).glob("*/LC_MESSAGES/messages.po"))
+    for catalogue_file, record in parallel_map(
+        _compile_babel_catalogue, catalogue_files, jobs=jobs
+    ):
+        add_record(record)
+        click.secho(
+            f"compiling catalog {catalogue_file} to {catalogue_file.with_suffix('.mo')}"
+        )
     click.secho(f"Done", fg="green")
 
 
-def merge_babel_catalogues(source_catalogue_file: Path, target_catalogue_file: Path):
+def _compile_babel_catalogue(_, catalogue_file: Path):
+    # equivalent of `pybabel compile -f` for a single catalogue
+    language = catalogue_file.parent.parent.name
+    with measure(f"compile_babel[{language}]") as record:
+        with catalogue_file.open("rb") as po_file:
+            catalogue = read_po(po_file, locale=language)
+        mo_file = io.BytesIO()
+        write_mo(mo_file, catalogue, use_fuzzy=True)
+        write_output(catalogue_file.with_suffix(".mo"), mo_file.getvalue())
+        record["entries"] = len(catalogue)
+    return catalogue_file, record
+
+
+def load_catalogue(catalogue) -> polib.POFile:
+    """Returns a parsed PO catalogue.
+
+    :param catalogue: path to a PO/POT file or an already parsed `polib.POFile`,
+                      which is returned as is
+    :return: parsed catalogue
+    """
+    if isinstance(catalogue, polib.POFile):
+        return catalogue
+    return pofile(catalogue)
+
+
+# path -> (mtime in ns, size, catalogue) of read-only catalogues, e.g. babel input translations
+# shared by several packages
+_catalogue_cache = {}
+
+
+def load_cached_catalogue(catalogue_file: Path) -> polib.POFile:
+    """Parses a PO catalogue that is only read from, reusing the result while the file is unchanged.
+
+    The returned catalogue may be shared, it must not be modified.
+
+    :param catalogue_file: path to a PO file
+    :return: parsed catalogue
+    """
+    key = os.path.realpath(catalogue_file)
+    stat = os.stat(key)
+    cached = _catalogue_cache.get(key)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    catalogue = pofile(key)
+    _catalogue_cache[key] = (stat.st_mtime_ns, stat.st_size, catalogue)
+    return catalogue
+
+
+def merge_babel_catalogues(source_catalogue_file, target_catalogue_file):
     """Merges all entries from a source PO catalogue with entries in a target PO catalogue.
 
-    :param source_catalogue_file: source catalogue pofile
-    :param target_catalogue_file: target catalogue pofile
+    Both catalogues can be passed either as paths or as already parsed `polib.POFile`
+    objects. A target passed as a path is saved together with its `.mo` file (files whose
+    content did not change are not rewritten), a parsed target is only updated in memory.
+
+    :param source_catalogue_file: source catalogue pofile or an already parsed catalogue
+    :param target_catalogue_file: target catalogue pofile or an already parsed catalogue
+    :return: the merged target catalogue
+    """
+    target_catalogue = load_catalogue(target_catalogue_file)
+    _merge_entries(
+        load_catalogue(source_catalogue_file),
+        target_catalogue,
+        {entry.msgid: entry for entry in target_catalogue},
+    )
+
+    if not isinstance(target_catalogue_file, polib.POFile):
+        save_catalogue(
+            target_catalogue,
+            target_catalogue_file,
+            mofile=Path(target_catalogue_file).with_suffix(".mo"),
+        )
+
+    return target_catalogue
+
+
+def merge_babel_catalogue_files(
+    source_catalogues, target_catalogue_file: Path, compile_mo=True
+) -> polib.POFile:
+    """Merges several source catalogues into a target PO catalogue in a single pass.
+
+    The result is the same as of calling :func:`merge_babel_catalogues` for every source
+    in the given order (later sources take precedence), but the target is parsed
+    and written only once and its msgid index is shared by all the sources.
+
+    :param source_catalogues: paths to source PO catalogues or already parsed catalogues
+    :param target_catalogue_file: path to the target PO catalogue
+    :param compile_mo: write the `.mo` file as well, not needed when the catalogue
+                       is compiled afterwards
+    :return: the merged target catalogue
     """
-    source_catalogue = polib.pofile(str(source_catalogue_file))
-    target_catalogue = polib.pofile(str(target_catalogue_file))
+    target_catalogue = load_catalogue(target_catalogue_file)
     target_catalogue_by_msgid = {entry.msgid: entry for entry in target_catalogue}
+    for source_catalogue in source_catalogues:
+        if not isinstance(source_catalogue, polib.POFile):
+            source_catalogue = load_cached_catalogue(source_catalogue)
+        _merge_entries(source_catalogue, target_catalogue, target_catalogue_by_msgid)
+
+    save_catalogue(
+        target_catalogue,
+        target_catalogue_file,
+        mofile=Path(target_catalogue_file).with_suffix(".mo") if compile_mo else None,
+    )
+    return target_catalogue
+
 
+def _merge_entries(source_catalogue, target_catalogue, target_catalogue_by_msgid):
     for entry in source_catalogue:
         if entry.msgid not in target_catalogue_by_msgid:
+            # source catalogue may be shared by several merges, do not alias its entries
+            entry = copy.copy(entry)
             target_catalogue.append(entry)
             target_catalogue_by_msgid[entry.msgid] = entry
         elif (
@@ -208,16 +571,32 @@ def merge_babel_catalogues(source_catalogue_file: Path, target_catalogue_file: P
         ):
             target_catalogue_by_msgid[entry.msgid].msgstr = entry.msgstr
 
-    target_catalogue.save(str(target_catalogue_file))
-    target_catalogue.save_as_mofile(str(target_catalogue_file.with_suffix(".mo")))
 
+def merge_catalogue_dirs(source_translation_dirs, target_translation_dir: Path):
+    """Merges catalogues of all languages from one or more source directories into
+    the catalogues of the same languages in `target_translation_dir`.
 
-def merge_catalogue_dirs(source_translation_dir: Path, target_translation_dir: Path):
-    for catalogue_file in source_translation_dir.glob("*/LC_MESSAGES/*.po"):
-        click.secho(
-            f"Merging {catalogue_file} into {target_translation_dir}", fg="yellow"
-        )
-        merge_babel_catalogues(
-            catalogue_file,
-            target_translation_dir / catalogue_file.relative_to(source_translation_dir),
+    Every target catalogue is loaded and written only once, sources are applied
+    in the given order.
+
+    :param source_translation_dirs: path to a babel translations directory or a list of them
+    :param target_translation_dir: path to the target babel translations directory
+    """
+    if isinstance(source_translation_dirs, (str, Path)):
+        source_translation_dirs = [source_translation_dirs]
+
+    # relative path of the catalogue -> source catalogue files in the order of their directories
+    catalogue_files = {}
+    for source_translation_dir in map(Path, source_translation_dirs):
+        for catalogue_file in sorted(source_translation_dir.glob("*/LC_MESSAGES/*.po")):
+            click.secho(
+                f"Merging {catalogue_file} into {target_translation_dir}", fg="yellow"
+            )
+            catalogue_files.setdefault(
+                catalogue_file.relative_to(source_translation_dir), []
+            ).append(catalogue_file)
+
+    for relative_path, source_catalogue_files in catalogue_files.items():
+        merge_babel_catalogue_files(
+            source_catalogue_files, target_translation_dir / relative_path
         )
@@ -0,0 +1,130 @@
+import io
+
+from jinja2 import TemplateSyntaxError
+from jinja2.ext import babel_extract
+
+# openings of jinja2 blocks -> their closings
+JINJA_BLOCKS = {"{{": "}}", "{%": "%}", "{#": "#}"}
+
+
+def jinjax_attribute_expressions(source: str):
+    """Finds expressions of JinjaX component attributes, e.g. `<Field label={ _("Title") }>`.
+
+    Braces nested in the expression and braces inside string literals are handled,
+    jinja2 blocks (`{{ ... }}`, `{% ... %}`, `{# ... #}`) are skipped.
+
+    :param source: template source
+    :return: iterator of (line number, expression) with the line the expression starts on
+    """
+    position = 0
+    lineno = 1
+    length = len(source)
+    while True:
+        start = source.find("{", position)
+        if start < 0:
+            return
+        lineno += source.count("\n", position, start)
+        position = start
+
+        block_end = JINJA_BLOCKS.get(source[start : start + 2])
+        if block_end:
+            end = source.find(block_end, start + 2)
+            if end < 0:
+                return
+            lineno += source.count("\n", start, end)
+            position = end + 2
+            continue
+
+        # only attribute values (`name={...}`) are expressions
+        before = start - 1
+        while before >= 0 and source[before].isspace():
+            before -= 1
+        if before < 0 or source[before] != "=":
+            position = start + 1
+            continue
+
+        # find the matching closing brace
+        depth = 0
+        quote = None
+        end = start
+        while end < length:
+            char = source[end]
+            if quote:
+                if char == "\\":
+                    end += 1
+                elif char == quote:
+                    quote = None
+            elif char in "'\"":
+                quote = char
+            elif char == "{":
+                depth += 1
+            elif char == "}":
+                depth -= 1
+                if depth == 0:
+                    break
+            end += 1
+        else:
+            return
+
+        yield lineno, source[start + 1 : end]
+        lineno += source.count("\n", start, end)
+        position = end + 1
+
+
+def extract_jinjax(fileobj, keywords, comment_tags, options):
+    """Babel extractor of JinjaX templates.
+
+    Extracts messages from jinja2 blocks (the same as `jinja2.ext:babel_extract`)
+    and from expressions of JinjaX component attributes, which are not seen by the jinja2
+    extractor. Messages are reported with their real line numbers in the template.
+
+    Usage in `babel.ini`::
+
+        [extractors]
+        jinjax = oarepo_tools.babel.extractors:extract_jinjax
+
+        [jinjax: **.jinja]
+        encoding = utf-8
+        extensions = jinjax.jinjax.JinjaX
+    """
+    encoding = options.get("encoding", "utf-8")
+    source = fileobj.read().decode(encoding)
+
+    messages = list(
+        babel_extract(
+            io.BytesIO(source.encode(encoding)), keywords, comment_tags, options
+        )
+    )
+    expressions = list(jinjax_attribute_expressions(source))
+    if expressions:
+        # all expressions are extracted at once from a template that has each of them
+        # on the line it has in the source
+        template = []
+        template_lineno = 1
+        for lineno, expression in expressions:
+            template.append("\n" * (lineno - template_lineno))
+            template.append(f"{{{{ {expression} }}}}")
+            template_lineno = lineno + expression.count("\n")
+        try:
+            messages += babel_extract(
+                io.BytesIO("".join(template).encode(encoding)),
+                keywords,
+                comment_tags,
+                {**options, "silent": "false"},
+            )
+        except TemplateSyntaxError:
+            # an invalid expression spoils the whole template, extract them one by one
+            for lineno, expression in expressions:
+                for message_lineno, funcname, message, comments in babel_extract(
+                    io.BytesIO(f"{{{{ {expression} }}}}".encode(encoding)),
+                    keywords,
+                    comment_tags,
+                    options,
+                ):
+                    messages.append(
+                        (lineno + message_lineno - 1, funcname, message, comments)
+                    )
+
+    # in the order of appearance in the template
+    messages.sort(key=lambda message: message[0])
+    yield from messages
@@ -0,0 +1,62 @@
+from typing import Optional
+
+import polib
+
+# Maximum number of msgids listed per kind of drift in the report
+REPORT_LIMIT = 10
+
+
+def catalogue_drift(
+    expected: polib.POFile,
+    actual: Optional[polib.POFile],
+) -> dict:
+    """Compares the expected content of a catalogue with the catalogue on disk.
+
+    Entries of `actual` that `make-translations` would not write any more are obsolete.
+    Language catalogues keep entries that are no longer extracted, so only `messages.pot`,
+    which is written from scratch, can have obsolete entries.
+
+    :param expected: catalogue as it would be written by `make-translations`
+    :param actual: catalogue on disk or None if it does not exist
+    :return: dictionary with non-empty lists of `missing`, `obsolete` and `changed` msgids
+    """
+    expected_translations = {entry.msgid: entry.msgstr for entry in expected}
+    actual_translations = (
+        {} if actual is None else {entry.msgid: entry.msgstr for entry in actual}
+    )
+
+    drift = {
+        "missing": [
+            msgid for msgid in expected_translations if msgid not in actual_translations
+        ],
+        "obsolete": [
+            msgid
+            for msgid in actual_translations
+            if msgid and msgid not in expected_translations
+        ],
+        "changed": [
+            msgid
+            for msgid, msgstr in expected_translations.items()
+            if msgid in actual_translations and actual_translations[msgid] != msgstr
+        ],
+    }
+    return {kind: msgids for kind, msgids in drift.items() if msgids}
+
+
+def format_drift(name: str, drift: dict, limit=REPORT_LIMIT) -> str:
+    """Formats the drift of a single catalogue as a compact, human-readable list.
+
+    :param name: catalogue name (language or `messages.pot`)
+    :param drift: result of :func:`catalogue_drift`
+    :param limit: maximum number of msgids listed per kind of drift
+    """
+    lines = [
+        f"{name}: "
+        + ", ".join(f"{len(msgids)} {kind}" for kind, msgids in drift.items())
+    ]
+    for kind, msgids in drift.items():
+        for msgid in msgids[:limit]:
+            lines.append(f"    {kind}: {msgid!r}")
+        if len(msgids) > limit:
+            lines.append(f"    ... and {len(msgids) - limit} more {kind}")
+    return "\n".join(lines)
@@ -0,0 +1,78 @@
+import hashlib
+import heapq
+import json
+import os
+from pathlib import Path
+
+from oarepo_tools.manifest import hash_file, tool_versions
+
+
+class ExtractionCache:
+    """On-disk cache of messages extracted from single source files.
+
+    Entries are keyed by the content of the file, the extraction method, its options
+    and the versions of the tools, so a file is extracted again only when any of them
+    changes. Entries that were not used
+    by the last extraction are removed by :meth:`prune`.
+
+    :param cache_dir: directory keeping one JSON file per entry
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.used = set()
+
+    @staticmethod
+    def key(source_file: Path, *extraction_options) -> str:
+        digest = hashlib.sha256(hash_file(source_file).encode())
+        digest.update(
+            json.dumps(
+                [tool_versions(), extraction_options], sort_keys=True, default=str
+            ).encode()
+        )
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """Returns cached messages (see :meth:`put`) or None when not cached."""
+        try:
+            messages = json.loads((self.cache_dir / f"{key}.json").read_text("utf-8"))
+        except (OSError, ValueError):
+            return None
+        self.used.add(key)
+        return messages
+
+    def put(self, key: str, messages):
+        """Stores messages of a file, they must be serializable to JSON."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        (self.cache_dir / f"{key}.json").write_text(json.dumps(messages), "utf-8")
+        self.used.add(key)
+
+    def prune(self):
+        """Removes entries that were not used since the cache was created."""
+        for entry in self.cache_dir.glob("*.json"):
+            if entry.stem not in self.used:
+                entry.unlink(missing_ok=True)
+
+
+def extraction_shards(source_files: list, jobs=None, min_files=0) -> list:
+    """Splits source files to shards extracted by parallel workers.
+
+    :param source_files: files to extract
+    :param jobs: number of workers, defaults to the number of cpus
+    :param min_files: fewer files are extracted in a single shard
+    :return: list of lists of files
+    """
+    # files are distributed among several shards per worker, so that one large template
+    # does not keep a worker busy while the others are idle; the largest files go first,
+    # each to the shard with the least bytes so far
+    if len(source_files) < min_files:
+        return [source_files] if source_files else []
+    count = min(len(source_files), (jobs or os.cpu_count() or 1) * 4)
+    shards = [(0, index, []) for index in range(count)]
+    for size, source_file in sorted(
+        ((os.path.getsize(path), path) for path in source_files), reverse=True
+    ):
+        shard_size, index, files = heapq.heappop(shards)
+        files.append(source_file)
+        heapq.heappush(shards, (shard_size + size, index, files))
+    return [files for _, _, files in sorted(shards, key=lambda shard: shard[1])]
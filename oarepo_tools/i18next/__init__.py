@@ -1,19 +1,134 @@
+import atexit
+import functools
+import hashlib
 import inspect
 import json
 import os
-import shutil
+import re
 import sys
+import threading
 from pathlib import Path
 from subprocess import check_call
+from typing import Optional
 
 import click
 import polib
 
-from oarepo_tools import validate_output_translations_dir, validate_source_paths
+from oarepo_tools import (
+    configured_choice,
+    parallel_map,
+    validate_output_translations_dir,
+    validate_source_paths,
+)
+from oarepo_tools.extraction import ExtractionCache, extraction_shards
+from oarepo_tools.i18next.compiler import (
+    catalogue_to_i18next,
+    dumps_i18next,
+    i18next_to_catalogue,
+    messages_index,
+)
+from oarepo_tools.i18next.scanner import scan_file
+from oarepo_tools.i18next.worker import NodeWorker
+from oarepo_tools.index import I18NEXT_FILE_KINDS, FileIndex, classify
+from oarepo_tools.manifest import hash_file, write_output
+from oarepo_tools.po import Entry, pofile, save_catalogue
+from oarepo_tools.prefilter import marker_pattern, prefilter
+from oarepo_tools.profiling import add_counters
 
 npm_proj_cwd = os.path.dirname(inspect.getfile(inspect.currentframe()))
 npm_proj_env = dict(os.environ)
 
+# Configuration of i18next-scanner, the translation functions are taken from there as well
+I18NEXT_SCANNER_CONFIG = Path(npm_proj_cwd) / "i18next-scanner.config.js"
+
+# Glob patterns of source files that are scanned by i18next-scanner
+I18NEXT_SOURCE_PATTERNS = ("**/*.js", "**/*.jsx", "**/*.ts", "**/*.tsx")
+
+
+# Engines of the i18next stages: i18next-scanner and i18next-conv running in node (`node`),
+# which need the node toolchain, or their Python counterparts (`native`). The first one
+# is the default. The Python ones are tested against golden files of the node tools in
+# tests/golden; `node` stays the default until they are regenerated by the node tools
+# (`python -m tests.golden`) and still match
+I18NEXT_ENGINES = ("node", "native")
+
+# Fewer files are scanned in the current process
+PARALLEL_EXTRACTION_MIN_FILES = 100
+
+
+# node toolchain is installed only once per process, even when building several packages
+_node_toolchain_lock = threading.Lock()
+_node_toolchain_ready = False
+
+# Files describing the bundled NPM project, `npm install` runs only when they change
+NODE_TOOLCHAIN_FILES = ("package.json", "package-lock.json")
+
+# Fingerprint of NODE_TOOLCHAIN_FILES the current `node_modules` were installed from
+NODE_TOOLCHAIN_FINGERPRINT = ".oarepo-tools-fingerprint"
+
+
+def node_toolchain_fingerprint() -> str:
+    """Hash of the `package.json` and of the lockfile of the bundled NPM project."""
+    digest = hashlib.sha256()
+    for name in NODE_TOOLCHAIN_FILES:
+        path = Path(npm_proj_cwd) / name
+        if path.exists():
+            digest.update(f"{name}:{hash_file(path)}\n".encode())
+    return digest.hexdigest()
+
+
+def ensure_node_toolchain(force=False):
+    """Makes sure the bundled NPM project (i18next-scanner, i18next-conv, ...) is installed & up-to-date.
+
+    `npm install` runs only when `node_modules` are missing or were installed from another
+    `package.json` or lockfile, see :func:`node_toolchain_fingerprint`. Runs at most once
+    per process.
+
+    :param force: run `npm install` even when the toolchain is up to date
+    """
+    global _node_toolchain_ready
+    with _node_toolchain_lock:
+        if _node_toolchain_ready and not force:
+            return
+
+        fingerprint_file = (
+            Path(npm_proj_cwd) / "node_modules" / NODE_TOOLCHAIN_FINGERPRINT
+        )
+        try:
+            installed = fingerprint_file.read_text("utf-8")
+        except OSError:
+            installed = None
+        if force or installed != node_toolchain_fingerprint():
+            click.secho("Installing / updating React-i18next dependencies", fg="green")
+            check_call(
+                ["npm", "install"],
+                env=npm_proj_env,
+                cwd=npm_proj_cwd,
+            )
+            # npm may have written the lockfile, so the fingerprint is taken afterwards
+            fingerprint_file.write_text(node_toolchain_fingerprint(), "utf-8")
+        _node_toolchain_ready = True
+
+
+# node worker shared by all stages and packages built in this process
+_node_worker = None
+_node_worker_lock = threading.Lock()
+
+
+def node_worker() -> NodeWorker:
+    """Returns the node worker (with i18next-scanner and i18next-conv loaded) shared by
+    the whole process, installing the node toolchain first if needed.
+
+    The worker process is started with the first request and stopped when Python exits.
+    """
+    global _node_worker
+    ensure_node_toolchain()
+    with _node_worker_lock:
+        if _node_worker is None:
+            _node_worker = NodeWorker(cwd=npm_proj_cwd, env=npm_proj_env)
+            atexit.register(_node_worker.close)
+        return _node_worker
+
 
 def ensure_i18next_output_translations(
     base_dir: Path, i18n_configuration: dict
@@ -22,7 +137,8 @@ def ensure_i18next_output_translations(
     Checks if i18next output directory exists and contains the necessary `i18next.js` entrypoint.
     When missing, this function will createit.
 
-    This will also install any necessary `react-i18next` dev dependencies from `package.json`.
+    When messages are extracted by the node scanner, this will also install any necessary
+    `react-i18next` dev dependencies from `package.json`.
 
     :param base_dir: Python package root directory (containing `setup.cfg` or `oarepo.yaml`)
     :param i18n_configuration:
@@ -53,20 +169,17 @@ def ensure_i18next_output_translations(
     if not messages_index.exists():
         messages_index.touch()
 
-    if not i18next_entrypoint.exists():
-        shutil.copy(Path(__file__).parent / "i18next.js", i18next_entrypoint)
-        click.secho(f"Created i18next.js in {i18next_entrypoint}", fg="green")
-    else:
-        shutil.copy(Path(__file__).parent / "i18next.js", i18next_entrypoint)
-        click.secho(f"Updated i18next.js in {i18next_entrypoint}", fg="yellow")
-
-    # Make sure NPM project is installed & up-to-date
-    click.secho("Installing / updating React-i18next dependencies", fg="green")
-    check_call(
-        ["npm", "install"],
-        env=npm_proj_env,
-        cwd=npm_proj_cwd,
-    )
+    exists = i18next_entrypoint.exists()
+    if write_output(
+        i18next_entrypoint, (Path(__file__).parent / "i18next.js").read_bytes()
+    ):
+        if exists:
+            click.secho(f"Updated i18next.js in {i18next_entrypoint}", fg="yellow")
+        else:
+            click.secho(f"Created i18next.js in {i18next_entrypoint}", fg="green")
+
+    if needs_node_toolchain(i18n_configuration):
+        ensure_node_toolchain()
 
     for language in i18n_configuration.get("languages", ("cs", "en")):
         catalogue_dir = output_dir / "messages" / language / "LC_MESSAGES"
@@ -81,127 +194,335 @@ def ensure_i18next_output_translations(
     return output_dir
 
 
-def _json_to_pot(input_path: Path, output_path: Path) -> Path:
-    # Generate gettext POT file from extracted JS translation strings
-    check_call(
-        ["npm", "run", "generate_pot", "--", input_path, output_path],
-        env=npm_proj_env,
-        cwd=npm_proj_cwd,
+def configured_i18next_scanner(i18n_configuration: dict) -> str:
+    """Returns the engine reading i18next keys from the sources, set by `i18next_scanner`
+    of the i18n configuration (`node` by default).
+    """
+    return configured_choice(i18n_configuration, "i18next_scanner", I18NEXT_ENGINES)
+
+
+def configured_i18next_converter(i18n_configuration: dict) -> str:
+    """Returns the engine converting catalogues and templates, set by `i18next_converter`
+    of the i18n configuration (`node` by default).
+    """
+    return configured_choice(i18n_configuration, "i18next_converter", I18NEXT_ENGINES)
+
+
+def needs_node_toolchain(i18n_configuration: dict) -> bool:
+    """Returns True if the i18next messages are scanned or converted in node."""
+    return "node" in (
+        configured_i18next_scanner(i18n_configuration),
+        configured_i18next_converter(i18n_configuration),
     )
 
-    return output_path
 
+@functools.lru_cache
+def i18next_scanner_options():
+    """Translation functions (`funcList`), components (e.g. `<Trans>`) and the extensions
+    of scanned files configured in `i18next-scanner.config.js`.
+
+    :return: tuple of (functions, components, extensions)
+    """
+    config = I18NEXT_SCANNER_CONFIG.read_text("utf-8")
+    functions = re.search(r"funcList\s*=\s*\[(.*?)\]", config, re.S)
+    extensions = re.search(r"extensions\s*=\s*\[(.*?)\]", config, re.S)
+    return (
+        (
+            tuple(re.findall(r"['\"]([\w.$]+)['\"]", functions.group(1)))
+            if functions
+            else ()
+        ),
+        tuple(re.findall(r"component:\s*['\"]([\w.]+)['\"]", config)),
+        (
+            tuple(re.findall(r"['\"](\.\w+)['\"]", extensions.group(1)))
+            if extensions
+            else (".js", ".jsx")
+        ),
+    )
 
-def extract_i18next_messages(base_dir: Path, temp_dir: Path, i18n_configuration):
+
+@functools.lru_cache
+def i18next_marker_pattern():
+    """Pattern of the translation functions (`funcList`) and of the `<Trans>` component
+    configured in `i18next-scanner.config.js`, see :func:`oarepo_tools.prefilter.marker_pattern`.
+    """
+    functions, components, _ = i18next_scanner_options()
+    return marker_pattern(
+        functions,
+        [rb"<" + re.escape(component.encode()) + rb"\b" for component in components],
+    )
+
+
+def _scan_files(scanner_options, source_files: list) -> dict:
+    return {
+        source_file: scan_file(source_file, *scanner_options)
+        for source_file in source_files
+    }
+
+
+def extract_i18next_catalogue(
+    base_dir: Path,
+    temp_dir: Path,
+    i18n_configuration,
+    source_files=None,
+    cache_dir: Path = None,
+    jobs=None,
+) -> Optional[polib.POFile]:
     """
     Extracts all JS(X) i18next translation keys from `i18next_source_paths`
-    using `i18next-scanner` and stores it in a `messages.pot` catalogue in the root of `temp_dir`.
+    into an in-memory messages template.
+
+    The keys are read by `i18next-scanner` (or by :mod:`oarepo_tools.i18next.scanner`
+    when `i18next_scanner` is `native`, see :func:`configured_i18next_scanner`) and converted to the template by
+    i18next-conv in the node worker (or in Python, the same way as i18next-conv does,
+    when `i18next_converter` is `native`, see :func:`configured_i18next_converter`).
 
     :param base_dir: Python package root directory (containing `setup.cfg` or `oarepo.yaml`)
     :param temp_dir: a temporary directory to store results (to not to overwrite ones from babel)
     :param i18n_configuration:
-    :return: path to the resulting `messages.pot` catalogue
+    :param source_files: files to extract the messages from (e.g. taken from
+                         a :class:`oarepo_tools.index.FileIndex`), when not given
+                         `i18next_source_paths` are walked
+    :param cache_dir: directory of the :class:`oarepo_tools.extraction.ExtractionCache`,
+                      when given only files changed since the last extraction are scanned
+    :param jobs: number of processes scanning the files
+    :return: catalogue of the extracted messages or None if no source file
+             contains a translatable message
     """
 
-    i18next_source_paths = validate_source_paths(
-        base_dir, i18n_configuration, "i18next_source_paths"
-    )
+    if source_files is None:
+        i18next_source_paths = validate_source_paths(
+            base_dir, i18n_configuration, "i18next_source_paths"
+        )
+        source_files = (
+            FileIndex(base_dir=base_dir).files(
+                i18next_source_paths, I18NEXT_SOURCE_PATTERNS
+            )
+            if i18next_source_paths
+            else []
+        )
+    source_files = [
+        str(path) for path in source_files if classify(path) in I18NEXT_FILE_KINDS
+    ]
 
-    if not i18next_source_paths:
+    if not source_files:
         click.secho(
             f"Skipping i18next extraction: no valid source paths",
             fg="yellow",
         )
         return
 
-    npm_proj_env["LANGUAGES"] = ",".join(i18n_configuration["languages"] or ["en"])
+    # only files calling one of the translation functions or using <Trans> are scanned
+    source_files = prefilter(source_files, i18next_marker_pattern(), "i18next")
+    if not source_files:
+        click.secho(
+            f"Skipping i18next extraction: no translation markers in the sources",
+            fg="yellow",
+        )
+        return
 
-    source_path_patterns = [
-        os.path.join(str(source_path), "**/*.{js,jsx,ts,tsx}")
-        for source_path in i18next_source_paths
-    ]
+    converter = configured_i18next_converter(i18n_configuration)
+    if configured_i18next_scanner(i18n_configuration) != "node":
+        return _i18next_template(
+            dict.fromkeys(_scan_i18next_keys(source_files, cache_dir, jobs), ""),
+            temp_dir,
+            converter,
+        )
 
     # Extract JS translations strings
     click.secho(
-        f"Extracting i18next messages from sources matching {source_path_patterns} -> {temp_dir}",
+        f"Extracting i18next messages from {len(source_files)} files by i18next-scanner",
         fg="green",
     )
-    check_call(
-        [
-            "npm",
-            "run",
-            "extract_messages",
-            "--",
-            "--output",
-            temp_dir,
-            *source_path_patterns,
-        ],
-        env=npm_proj_env,
-        cwd=npm_proj_cwd,
+    # values (e.g. the content of <Trans> components) are not used, templates are empty
+    extracted_data = node_worker().request(
+        "extract",
+        files=source_files,
+        languages=i18n_configuration["languages"] or ["en"],
     )
+    return _i18next_template(extracted_data, temp_dir, converter)
+
+
+def _i18next_template(
+    extracted_data: dict, temp_dir: Path, converter: str
+) -> polib.POFile:
+    # messages template of the extracted keys, values are not used
+    if converter != "node":
+        return i18next_to_catalogue(extracted_data)
+
+    messages_pot = Path(temp_dir) / "extracted-messages.pot"
+    messages_pot.write_text(
+        node_worker().request(
+            "json_to_pot", resources=dict.fromkeys(extracted_data, "")
+        ),
+        "utf-8",
+    )
+    try:
+        return pofile(messages_pot)
+    finally:
+        # Cleanup helper file
+        messages_pot.unlink()
+
+
+def _scan_i18next_keys(source_files: list, cache_dir=None, jobs=None) -> list:
+    # keys of all files, in file order
+    scanner_options = i18next_scanner_options()
+    cache = ExtractionCache(cache_dir) if cache_dir is not None else None
+    file_keys = {}
+    pending = {}
+    for source_file in source_files:
+        keys = None
+        if cache is not None:
+            key = ExtractionCache.key(source_file, "i18next", *scanner_options)
+            keys = cache.get(key)
+            if keys is None:
+                pending[source_file] = key
+        else:
+            pending[source_file] = None
+        file_keys[source_file] = keys
 
-    translations_file = temp_dir / "extracted-messages.json"
-    extracted_data = json.loads(translations_file.read_text("utf-8"))
-
-    # Fix any incorrectly extracted (e.g. by <Trans>) values, set all to ""
-    for key in extracted_data.keys():
-        extracted_data[key] = ""
-
-    translations_file.write_text(json.dumps(extracted_data), "utf-8")
+    click.secho(
+        f"Extracting i18next messages from {len(pending)} files, "
+        f"{len(source_files) - len(pending)} unchanged files taken from cache",
+        fg="green",
+    )
+    shards = extraction_shards(list(pending), jobs, PARALLEL_EXTRACTION_MIN_FILES)
+    for shard_keys in parallel_map(
+        _scan_files, shards, jobs=jobs, shared_data=scanner_options
+    ):
+        file_keys.update(shard_keys)
+    if cache is not None:
+        for source_file, key in pending.items():
+            cache.put(key, file_keys[source_file])
+        cache.prune()
+    add_counters(files_extracted=len(pending))
+
+    return [key for keys in file_keys.values() for key in keys]
+
+
+def extract_i18next_messages(
+    base_dir: Path, temp_dir: Path, i18n_configuration, source_files=None
+):
+    """
+    Extracts all JS(X) i18next translation keys from `i18next_source_paths`
+    and stores them in a `messages.pot` catalogue in the root of `temp_dir`.
 
-    messages_pot = temp_dir / "messages.pot"
-    _json_to_pot(translations_file, messages_pot)
+    See :func:`extract_i18next_catalogue` for the parameters.
 
-    # Cleanup helper json file
-    translations_file.unlink()
+    :return: path to the resulting `messages.pot` catalogue or None if no source file
+             contains a translatable message
+    """
+    catalogue = extract_i18next_catalogue(
+        base_dir, temp_dir, i18n_configuration, source_files=source_files
+    )
+    if catalogue is None:
+        return None
 
+    messages_pot = Path(temp_dir) / "messages.pot"
+    save_catalogue(catalogue, messages_pot)
     return messages_pot
 
 
-def merge_i18next_messages_to_po(
-    source_messages_file: Path, target_catalogue_file: Path
-):
+def merge_i18next_messages_to_po(source_messages_file, target_catalogue_file):
     """Merges messages from i18next formatted json with a target catalogue PO file entries.
 
     :param source_messages_file: path to a source i18next JSON messages file
-    :param target_catalogue_file: path to a target catalogue PO file
+                                 or an already loaded dictionary of messages
+    :param target_catalogue_file: path to a target catalogue PO file or an already
+                                  parsed `polib.POFile`, which is only updated in memory
+    :return: the merged target catalogue
     """
-    source_messages = json.loads(source_messages_file.read_text("utf-8"))
-    target_catalogue = polib.pofile(str(target_catalogue_file))
+    return merge_i18next_messages_to_catalogue(
+        [source_messages_file], target_catalogue_file
+    )
+
+
+def merge_i18next_messages_to_catalogue(source_messages_files, target_catalogue_file):
+    """Merges messages from several i18next formatted json files with a target catalogue
+    in a single pass.
+
+    The result is the same as of calling :func:`merge_i18next_messages_to_po` for every
+    source in the given order, but the target is parsed and written only once
+    and its msgid index is shared by all the sources.
 
+    :param source_messages_files: paths to source i18next JSON messages files
+                                  or already loaded dictionaries of messages
+    :param target_catalogue_file: path to a target catalogue PO file or an already
+                                  parsed `polib.POFile`, which is only updated in memory
+    :return: the merged target catalogue
+    """
+    target_catalogue = (
+        target_catalogue_file
+        if isinstance(target_catalogue_file, polib.POFile)
+        else pofile(target_catalogue_file)
+    )
     target_catalogue_by_msgid = {entry.msgid: entry for entry in target_catalogue}
 
-    for key, value in source_messages.items():
-        if key in target_catalogue_by_msgid:
-            if value:
-                target_catalogue_by_msgid[key].msgstr = value
-        else:
-            target_catalogue.append(polib.POEntry(msgid=key, msgstr=value))
+    for source_messages in source_messages_files:
+        if not isinstance(source_messages, dict):
+            # parsed from the file object, without an intermediate string
+            with open(source_messages, "rb") as f:
+                source_messages = json.load(f)
 
-    target_catalogue.save(str(target_catalogue_file))
+        for key, value in source_messages.items():
+            entry = target_catalogue_by_msgid.get(key)
+            if entry is None:
+                entry = Entry(msgid=key, msgstr=value)
+                target_catalogue.append(entry)
+                target_catalogue_by_msgid[key] = entry
+            elif value:
+                entry.msgstr = value
+
+    if not isinstance(target_catalogue_file, polib.POFile):
+        save_catalogue(target_catalogue, target_catalogue_file)
+
+    return target_catalogue
 
 
 def merge_catalogues_from_i18next_translation_dir(
-    source_translation_dir, target_translation_dir
+    source_translation_dirs, target_translation_dir
 ):
-    for source_catalogue_file in source_translation_dir.glob("*/translations.json"):
-        click.secho(
-            f"Merging i18next {source_catalogue_file} into {target_translation_dir}",
-            fg="yellow",
-        )
-        language = source_catalogue_file.parent.name
+    """Merges i18next messages of all languages from one or more source directories into
+    the babel catalogues of the same languages in `target_translation_dir`.
+
+    Every target catalogue is loaded and written only once, sources are applied
+    in the given order.
+
+    :param source_translation_dirs: path to an i18next translations directory or a list of them
+    :param target_translation_dir: path to the target babel translations directory
+    """
+    if isinstance(source_translation_dirs, (str, Path)):
+        source_translation_dirs = [source_translation_dirs]
+
+    # language -> source messages files in the order of their directories
+    source_catalogue_files = {}
+    for source_translation_dir in map(Path, source_translation_dirs):
+        for source_catalogue_file in sorted(
+            source_translation_dir.glob("*/translations.json")
+        ):
+            click.secho(
+                f"Merging i18next {source_catalogue_file} into {target_translation_dir}",
+                fg="yellow",
+            )
+            source_catalogue_files.setdefault(
+                source_catalogue_file.parent.name, []
+            ).append(source_catalogue_file)
 
+    for language, source_messages_files in source_catalogue_files.items():
         target_catalogue_file = (
             target_translation_dir / language / "LC_MESSAGES" / "messages.po"
         )
         if target_catalogue_file.exists():
-            merge_i18next_messages_to_po(source_catalogue_file, target_catalogue_file)
-        else:
-            click.secho(
-                f"Target catalogue file {target_catalogue_file} does not exist, "
-                f"can not merge {source_catalogue_file}",
-                fg="red",
+            merge_i18next_messages_to_catalogue(
+                source_messages_files, target_catalogue_file
             )
+        else:
+            for source_catalogue_file in source_messages_files:
+                click.secho(
+                    f"Target catalogue file {target_catalogue_file} does not exist, "
+                    f"can not merge {source_catalogue_file}",
+                    fg="red",
+                )
 
 
 def compile_i18next_translations(
@@ -209,29 +530,81 @@ def compile_i18next_translations(
     output_translations_dir,
     i18n_configuration,
     skip_untranslated=True,
+    catalogues=None,
 ):
     """
     Compiles entries from source babel catalogue directory into
     i18next-compatible JSON format messages catalogue and updates
     messages module `index.js` to import all language-specific messages.
 
+    The catalogues are converted by i18next-conv in the node worker or, when
+    `i18next_converter` is `native`, in Python by :mod:`oarepo_tools.i18next.compiler`
+    with the same keys, plural forms and formatting, without node.
+
     :param source_translations_dir: path to a babel catalogue directory
     :param output_translations_dir: path to an i18next messages entrypoint directory
     :param i18n_configuration:
+    :param skip_untranslated: leave out untranslated messages and fuzzy entries
+    :param catalogues: already parsed catalogues (language -> `polib.POFile`),
+                       catalogues of other languages are read from `source_translations_dir`.
+                       Used by the Python converter only.
     """
-    npm_proj_env["LANGUAGES"] = ",".join(i18n_configuration["languages"] or ["en"])
+    languages = i18n_configuration["languages"] or ["en"]
+    catalogues = catalogues or {}
+    messages_dir = Path(output_translations_dir) / "messages"
 
     click.secho(f"Compiling i18next messages in {source_translations_dir}", fg="green")
-    check_call(
-        [
-            "npm",
-            "run",
-            "compile_catalog",
-            "--",
-            str(source_translations_dir),
-            str(output_translations_dir),
-            "--skip-untranslated" if skip_untranslated else "",
-        ],
-        env=npm_proj_env,
-        cwd=npm_proj_cwd,
-    )
+    if configured_i18next_converter(i18n_configuration) == "node":
+        _compile_i18next_translations_node(
+            source_translations_dir,
+            output_translations_dir,
+            languages,
+            skip_untranslated,
+        )
+        return
+
+    for language in languages:
+        catalogue = catalogues.get(language) or pofile(
+            Path(source_translations_dir) / language / "LC_MESSAGES" / "messages.po"
+        )
+        translations_file = (
+            messages_dir / language / "LC_MESSAGES" / "translations.json"
+        )
+        translations_file.parent.mkdir(parents=True, exist_ok=True)
+        write_output(
+            translations_file,
+            dumps_i18next(
+                catalogue_to_i18next(catalogue, language, skip_untranslated),
+                compact=skip_untranslated,
+            ).encode("utf-8"),
+        )
+
+    write_output(messages_dir / "index.js", messages_index(languages).encode("utf-8"))
+
+
+def _compile_i18next_translations_node(
+    source_translations_dir, output_translations_dir, languages, skip_untranslated
+):
+    # the same outputs as written by `compileCatalog.js`, converted by the node worker
+    messages_dir = Path(output_translations_dir) / "messages"
+    for language in languages:
+        catalogue_file = (
+            Path(source_translations_dir) / language / "LC_MESSAGES" / "messages.po"
+        )
+        translations_file = (
+            messages_dir / language / "LC_MESSAGES" / "translations.json"
+        )
+        translations_file.parent.mkdir(parents=True, exist_ok=True)
+        write_output(
+            translations_file,
+            node_worker()
+            .request(
+                "po_to_json",
+                language=language,
+                catalogue=catalogue_file.read_text("utf-8"),
+                skipUntranslated=skip_untranslated,
+            )
+            .encode("utf-8"),
+        )
+
+    write_output(messages_dir / "index.js", messages_index(languages).encode("utf-8"))
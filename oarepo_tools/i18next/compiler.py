@@ -0,0 +1,193 @@
+import json
+import re
+
+import polib
+
+from oarepo_tools.po import Catalogue, Entry
+
+# Languages with two plural forms, whose plurals get `key` and `key_plural` keys
+# (as in the plural rules of i18next-conv), other languages get `key_0`, `key_1`, ...
+TWO_PLURAL_FORMS_LANGUAGES = frozenset(
+    # singular for 0 and 1
+    "ach ak am arn br fil fr gun is jv ln mfe mg mi mk oc or pt tg ti tl tr uz wa".split()
+    # singular for 1
+    + "af an ast az bg bn ca da de dev el en eo es et eu fi fo fur fy gl gu ha hi hu hy ia "
+    "it kk kn ku lb mai ml mn mr nah nap nb ne nl nn no nso pa pap pms ps rm sco se si "
+    "so son sq sv sw ta te tk ur yo".split()
+)
+
+# i18next-conv defaults: `--keyseparator ##` splits keys to nested objects, contexts are
+# appended to the key with `--ctxSeparator _`
+KEY_SEPARATOR = "##"
+CONTEXT_SEPARATOR = "_"
+
+_ARRAY_INDEX = re.compile(r"0|[1-9][0-9]*")
+
+
+def catalogue_to_i18next(
+    catalogue: polib.POFile, language: str, skip_untranslated=False
+) -> dict:
+    """Converts a PO catalogue to i18next resources, the same way as `gettextToI18next`
+    of i18next-conv does.
+
+    :param catalogue: parsed catalogue
+    :param language: language of the catalogue, selects the suffixes of plural forms
+    :param skip_untranslated: leave out untranslated forms and fuzzy entries
+    :return: dictionary of i18next keys -> translations (or nested dictionaries)
+    """
+    two_plural_forms = (
+        language.replace("_", "-").split("-")[0] in TWO_PLURAL_FORMS_LANGUAGES
+    )
+
+    # entries grouped by context as gettext-parser does, a later entry replaces
+    # an earlier one with the same msgid
+    contexts = {}
+    for entry in catalogue:
+        if not entry.obsolete:
+            contexts.setdefault(entry.msgctxt or "", {})[entry.msgid] = entry
+
+    resources = {}
+    for context, entries in _js_items(contexts):
+        for msgid, entry in _js_items(entries):
+            if not msgid:
+                continue
+            if skip_untranslated and "fuzzy" in entry.flags:
+                continue
+
+            target = resources
+            key = msgid
+            if KEY_SEPARATOR in msgid:
+                parts = msgid.split(KEY_SEPARATOR)
+                for index, part in enumerate(parts):
+                    if not part or not isinstance(target, dict):
+                        # node stops at an empty part, keeping the whole msgid as the key
+                        break
+                    if index < len(parts) - 1:
+                        target[part] = target.get(part) or {}
+                        target = target[part]
+                    else:
+                        key = part
+                if not isinstance(target, dict):
+                    # a key nested in a translation string, dropped by node as well
+                    continue
+            if context:
+                key = f"{key}{CONTEXT_SEPARATOR}{context}"
+
+            if entry.msgid_plural:
+                values = [
+                    entry.msgstr_plural[index] for index in sorted(entry.msgstr_plural)
+                ]
+            else:
+                values = [entry.msgstr]
+            if len(values) == 1:
+                suffixes = [""]
+            elif two_plural_forms:
+                suffixes = ["", *["_plural"] * (len(values) - 1)]
+            else:
+                suffixes = [f"_{index}" for index in range(len(values))]
+            for suffix, value in zip(suffixes, values):
+                if value or not skip_untranslated:
+                    target[key + suffix] = value
+    return resources
+
+
+def dumps_i18next(resources: dict, compact=False) -> str:
+    """Serializes i18next resources exactly as `JSON.stringify` does.
+
+    :param resources: resources of :func:`catalogue_to_i18next`
+    :param compact: no indentation, as written with `skip_untranslated`
+    """
+    resources = _js_object(resources)
+    if compact:
+        return json.dumps(resources, ensure_ascii=False, separators=(",", ":"))
+    return json.dumps(resources, ensure_ascii=False, indent=4)
+
+
+def messages_index(languages) -> str:
+    """Content of the `messages/index.js` module importing translations of all languages."""
+    content = "// This file was autogenerated with oarepo-tools\n"
+    for language in languages:
+        content += (
+            f"import TRANSLATE_{language.upper()} from "
+            f'"./{language}/LC_MESSAGES/translations.json"\n'
+        )
+    translations = "\n    ".join(
+        f"{language}: {{ translation: TRANSLATE_{language.upper()} }},"
+        for language in languages
+    )
+    return f"{content}export const translations = {{\n    {translations}\n}}\n"
+
+
+def _js_items(obj: dict):
+    # javascript objects iterate integer-like keys first, in ascending order
+    indices = sorted(
+        (key for key in obj if _is_array_index(key)),
+        key=int,
+    )
+    return [(key, obj[key]) for key in indices] + [
+        (key, value) for key, value in obj.items() if not _is_array_index(key)
+    ]
+
+
+def _is_array_index(key):
+    return bool(_ARRAY_INDEX.fullmatch(key)) and int(key) < 2**32 - 1
+
+
+def _js_object(obj):
+    if not isinstance(obj, dict):
+        return obj
+    return {key: _js_object(value) for key, value in _js_items(obj)}
+
+
+# header of templates written by i18next-conv (`i18nextToPot` with the `en` locale)
+POT_METADATA = {
+    "Project-Id-Version": "i18next-conv",
+    "mime-version": "1.0",
+    "Content-Type": "text/plain; charset=utf-8",
+    "Content-Transfer-Encoding": "8bit",
+    "Plural-Forms": "nplurals=2; plural=(n != 1)",
+}
+
+_PLURAL_SUFFIX = re.compile(r"(.+)_(plural|\d+)")
+
+
+def i18next_to_catalogue(resources: dict) -> Catalogue:
+    """Converts i18next resources (e.g. messages extracted by i18next-scanner) to a messages
+    template, the same way as `i18nextToPot` of i18next-conv does.
+
+    Nested keys are joined with `##`, `_plural` and `_<number>` suffixes are plural forms
+    of the same message and the part after the last `_` is the context of the message.
+
+    :param resources: dictionary of i18next keys -> translations (or nested dictionaries)
+    :return: template with empty translations
+    """
+    catalogue = Catalogue()
+    catalogue.metadata = dict(POT_METADATA)
+    entries = {}
+    for key in _flatten(resources):
+        plural = _PLURAL_SUFFIX.fullmatch(key)
+        if plural:
+            key = plural.group(1)
+        msgid, context = key, None
+        if CONTEXT_SEPARATOR in key:
+            msgid, context = key.rsplit(CONTEXT_SEPARATOR, 1)
+
+        entry = entries.get((context, msgid))
+        if entry is None:
+            entry = Entry(msgid=msgid, msgctxt=context)
+            entries[(context, msgid)] = entry
+            catalogue.append(entry)
+        if plural and not entry.msgid_plural:
+            entry.msgid_plural = msgid
+            entry.msgstr_plural = {0: "", 1: ""}
+    return catalogue
+
+
+def _flatten(resources: dict, prefix=""):
+    for key, value in _js_items(resources):
+        if prefix:
+            key = f"{prefix}{KEY_SEPARATOR}{key}"
+        if isinstance(value, dict):
+            yield from _flatten(value, key)
+        else:
+            yield key
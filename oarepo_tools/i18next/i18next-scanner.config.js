@@ -6,7 +6,7 @@
 // list of func used to
 // mark the strings for translation
 const funcList = ['i18next.t']
-const extensions = ['.js', '.jsx']
+const extensions = ['.js', '.jsx', '.ts', '.tsx']
 
 module.exports = {
   options: {
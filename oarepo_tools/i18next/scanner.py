@@ -0,0 +1,506 @@
+import os
+import re
+from html.entities import html5
+
+from oarepo_tools.i18next.compiler import CONTEXT_SEPARATOR
+
+# i18next-scanner defaults: plural keys are generated for the `en` language
+PLURAL_SUFFIXES = ("", "_plural")
+
+# keywords after which `/` starts a regular expression and `<` a JSX element
+_EXPRESSION_KEYWORDS = frozenset(
+    "return typeof instanceof in of new delete void throw case do else yield await".split()
+)
+
+_TOKEN = re.compile(
+    r"""
+    (?P<ws>\s+)
+  | (?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))
+  | (?P<ident>(?:[^\W\d]|\$)[\w$]*)
+  | (?P<number>\d[\w.]*|\.\d[\w.]*)
+  | (?P<string>"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')
+  | (?P<punct>=>|\.\.\.|.)
+    """,
+    re.S | re.X,
+)
+_REGEX = re.compile(r"/(?![*/])(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[\w$]*")
+_TEMPLATE_CHUNK = re.compile(r"(?:[^`\\$]|\\.|\$(?!\{))+", re.S)
+
+_JSX_OPEN = re.compile(r"<\s*((?:[^\W\d]|\$)[\w$.:\-]*|(?=>))")
+_JSX_CLOSE = re.compile(r"</\s*([\w$.:\-]*)\s*>")
+_JSX_ATTRIBUTE = re.compile(r"(?:[^\W\d]|\$)[\w$:\-]*")
+_JSX_STRING = re.compile(r"\"([^\"]*)\"|'([^']*)'")
+_JSX_TEXT = re.compile(r"[^{<]+")
+_JSX_SPACE = re.compile(r"(?:\s+|//[^\n]*|/\*.*?\*/)*", re.S)
+_ENTITY = re.compile(r"&(#x[0-9a-fA-F]+|#[0-9]+|\w+);")
+
+_ESCAPE = re.compile(
+    r"\\(u\{[0-9a-fA-F]+\}|u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|[0-7]{1,3}|\r\n|.)", re.S
+)
+_ESCAPES = {
+    "n": "\n",
+    "t": "\t",
+    "r": "\r",
+    "b": "\b",
+    "f": "\f",
+    "v": "\v",
+    "\n": "",
+    "\r": "",
+    "\r\n": "",
+    "\u2028": "",
+    "\u2029": "",
+}
+
+# whitespace of JSX text around line breaks, as in `nodesToString` of i18next-scanner
+_LEADING_NEWLINES = re.compile(r"^[\r\n]+\s*")
+_TRAILING_NEWLINES = re.compile(r"[\r\n]+\s*\Z")
+_NEWLINES = re.compile(r"[\r\n]+\s*")
+
+
+class _NotJSX(Exception):
+    pass
+
+
+def scan_file(source_file, functions, components, extensions) -> list:
+    """Reads i18next keys from a source file, see :func:`scan_source`.
+
+    :param extensions: suffixes of the files that are scanned (`.js`, `.jsx`, ...),
+                       other files have no keys
+    """
+    suffix = os.path.splitext(source_file)[1]
+    if suffix not in extensions:
+        return []
+    with open(source_file, encoding="utf-8", errors="replace") as f:
+        source = f.read()
+    return scan_source(source, functions, components, jsx=suffix != ".ts")
+
+
+def scan_source(source: str, functions, components, jsx=True) -> list:
+    """Reads i18next keys from a javascript (or typescript) source, the same way as
+    i18next-scanner with the bundled configuration does.
+
+    Keys are the string literals passed to the translation functions and the keys
+    (or contents) of the translation components. Plural forms (a `count` option)
+    and contexts (a `context` option) get their own keys.
+
+    :param source: content of the source file
+    :param functions: names of the translation functions, e.g. `i18next.t`
+    :param components: names of the translation components, e.g. `Trans`
+    :param jsx: the source may contain JSX elements
+    :return: unique keys, in the order of the calls followed by the components
+    """
+    scanner = _Scanner(source, frozenset(components), jsx)
+    scanner.scan()
+
+    keys = []
+    calls = {tuple(_FUNCTION_PARTS.findall(function)) for function in functions}
+    tokens = scanner.tokens
+    for index, (kind, value) in enumerate(tokens):
+        if kind != "ident":
+            continue
+        for call in calls:
+            if call[0] == value and _matches(tokens, index, call):
+                keys.extend(_call_keys(tokens, index + len(call)))
+    for element in scanner.elements:
+        keys.extend(_component_keys(element))
+    return list(dict.fromkeys(keys))
+
+
+_FUNCTION_PARTS = re.compile(r"[^.\s]+|\.")
+
+
+def _matches(tokens, index, call):
+    if index + len(call) >= len(tokens):
+        return False
+    for offset, part in enumerate(call):
+        if tokens[index + offset][1] != part:
+            return False
+    return tokens[index + len(call)] == ("punct", "(")
+
+
+def _call_keys(tokens, index):
+    # arguments of a call: `(key[, defaultValue][, options])`
+    index += 1
+    key = _literal(tokens[index : index + 1], quoted=True)
+    if key is None or index + 1 >= len(tokens):
+        return []
+    index += 1
+    if tokens[index] == ("punct", ")"):
+        return _keys(key, {})
+    if tokens[index] != ("punct", ","):
+        return []
+
+    index += 1
+    options = {}
+    if _literal(tokens[index : index + 1], quoted=True) is not None:
+        index += 1
+        if index < len(tokens) and tokens[index] == ("punct", ","):
+            index += 1
+    if index < len(tokens) and tokens[index] == ("punct", "{"):
+        options = _object_literal(tokens, index)
+    return _keys(key, options)
+
+
+def _keys(key, options):
+    if not key:
+        return []
+    keys = [key]
+    context = options.get("context")
+    if context:
+        keys.append(f"{key}{CONTEXT_SEPARATOR}{context}")
+    if "count" in options:
+        keys = [key + suffix for key in keys for suffix in PLURAL_SUFFIXES]
+    return keys
+
+
+def _literal(tokens, quoted=False):
+    # value of a single literal token, None for any other expression
+    if len(tokens) != 1:
+        return None
+    kind, value = tokens[0]
+    if kind == "string":
+        return _unescape(value[1:-1])
+    if kind == "template":
+        return value
+    if kind == "number" and not quoted:
+        return value
+    return None
+
+
+def _object_literal(tokens, index):
+    # properties of an object literal starting at `index`, values that are not literals
+    # are empty strings (as they are unknown to i18next-scanner as well)
+    properties = {}
+    index += 1
+    while index < len(tokens) and tokens[index] != ("punct", "}"):
+        name = None
+        kind, value = tokens[index]
+        if kind in ("ident", "number"):
+            name = value
+        elif kind == "string":
+            name = _unescape(value[1:-1])
+
+        start = index
+        depth = 0
+        while index < len(tokens):
+            token = tokens[index]
+            if token[0] == "punct":
+                if token[1] in ("(", "[", "{"):
+                    depth += 1
+                elif token[1] in (")", "]", "}"):
+                    if not depth:
+                        break
+                    depth -= 1
+                elif token[1] == "," and not depth:
+                    break
+            index += 1
+
+        if name is not None:
+            if tokens[start + 1 : start + 2] == [("punct", ":")]:
+                value = _literal(tokens[start + 2 : index])
+                properties[name] = "" if value is None else value
+            else:
+                # shorthand property or a method
+                properties[name] = ""
+        if index < len(tokens) and tokens[index] == ("punct", ","):
+            index += 1
+    return properties
+
+
+def _component_keys(element):
+    name, attributes, children = element
+    key = (_attribute_literal(attributes.get("i18nKey")) or "").strip()
+    if not key:
+        key = _attribute_literal(attributes.get("defaults")) or _nodes_to_string(
+            children
+        )
+    options = {
+        option: _attribute_literal(attributes[option]) or ""
+        for option in ("count", "context")
+        if option in attributes
+    }
+    return _keys(key, options)
+
+
+def _attribute_literal(value):
+    if value is None:
+        return None
+    kind, value = value
+    if kind == "string":
+        return value
+    if kind == "expression":
+        return _literal(value)
+    return None
+
+
+def _nodes_to_string(children) -> str:
+    # content of a component as the key of react-i18next: text, values of string
+    # expressions, `{{name}}` for interpolated objects and `<index>...</index>` for
+    # nested elements
+    memo = ""
+    index = 0
+    for kind, value in children:
+        if kind == "text":
+            value = _LEADING_NEWLINES.sub("", value)
+            value = _TRAILING_NEWLINES.sub("", value)
+            value = _NEWLINES.sub(" ", value)
+            if not value:
+                continue
+            memo += value
+        elif kind == "expression":
+            literal = _literal(value)
+            if literal is not None and value[0][0] != "number":
+                memo += literal
+            elif (
+                len(value) >= 3
+                and value[0] == ("punct", "{")
+                and value[1][0] == "ident"
+                and value[2][1] in (",", ":", "}")
+            ):
+                memo += f"{{{{{value[1][1]}}}}}"
+        else:
+            memo += f"<{index}>{_nodes_to_string(value[2])}</{index}>"
+        index += 1
+    return memo
+
+
+class _Scanner:
+    """Tokenizer of javascript sources, recognizing regular expressions, template
+    literals and JSX elements well enough to find string literals and components.
+
+    :ivar tokens: (kind, value) of all tokens except whitespace and comments,
+                  including those in template literals and JSX expressions
+    :ivar elements: (name, attributes, children) of the components, an element is
+                    added when it is closed
+    """
+
+    def __init__(self, source, components, jsx):
+        self.source = source
+        self.components = components
+        self.jsx = jsx
+        self.pos = 0
+        self.tokens = []
+        self.elements = []
+
+    def scan(self):
+        self._scan_tokens()
+
+    def _expression_start(self):
+        if not self.tokens:
+            return True
+        kind, value = self.tokens[-1]
+        if kind == "punct":
+            return value not in (")", "]", "}")
+        return kind == "ident" and value in _EXPRESSION_KEYWORDS
+
+    def _scan_tokens(self, closing=False) -> bool:
+        # reads tokens up to the end of the source or, when `closing`, up to (and including)
+        # the `}` closing an already open brace; tells if the brace was closed
+        source = self.source
+        depth = 0
+        while self.pos < len(source):
+            char = source[self.pos]
+            if char == "`":
+                self._scan_template()
+                continue
+            if char == "/" and self._expression_start():
+                match = _REGEX.match(source, self.pos)
+                if match:
+                    self.pos = match.end()
+                    self.tokens.append(("regex", match.group()))
+                    continue
+            if char == "<" and self.jsx and self._expression_start():
+                element = self._scan_jsx()
+                if element is not None:
+                    self.tokens.append(("jsx", element[0]))
+                    continue
+
+            match = _TOKEN.match(source, self.pos)
+            self.pos = match.end()
+            kind = match.lastgroup
+            if kind in ("ws", "comment"):
+                continue
+            value = match.group()
+            if kind == "punct":
+                if value == "{":
+                    depth += 1
+                elif value == "}":
+                    if closing and not depth:
+                        return True
+                    depth -= 1
+            self.tokens.append((kind, value))
+        return False
+
+    def _scan_template(self):
+        # the template token is replaced once the template ends, nested tokens follow it
+        index = len(self.tokens)
+        self.tokens.append(("punct", "`"))
+        source = self.source
+        self.pos += 1
+        chunks = []
+        substitutions = False
+        while self.pos < len(source):
+            if source[self.pos] == "`":
+                self.pos += 1
+                break
+            if source.startswith("${", self.pos):
+                substitutions = True
+                self.pos += 2
+                self._scan_tokens(closing=True)
+                continue
+            match = _TEMPLATE_CHUNK.match(source, self.pos)
+            if not match:
+                # a lone backslash at the end of the source
+                self.pos = len(source)
+                break
+            chunks.append(match.group())
+            self.pos = match.end()
+        self.tokens[index] = (
+            "template",
+            None if substitutions else _unescape("".join(chunks)),
+        )
+
+    def _scan_jsx(self):
+        # returns (element,) or None (with nothing consumed) when `<` does not start
+        # a JSX element, e.g. in a typescript type assertion
+        start, tokens, elements = self.pos, len(self.tokens), len(self.elements)
+        try:
+            return (self._scan_jsx_element(),)
+        except _NotJSX:
+            self.pos = start
+            del self.tokens[tokens:]
+            del self.elements[elements:]
+            return None
+
+    def _scan_jsx_element(self):
+        source = self.source
+        match = _JSX_OPEN.match(source, self.pos)
+        if not match:
+            raise _NotJSX()
+        name = match.group(1)
+        self.pos = match.end()
+
+        attributes = {}
+        while True:
+            self._skip_jsx_space()
+            if source.startswith("/>", self.pos):
+                self.pos += 2
+                children = []
+                break
+            if source.startswith(">", self.pos):
+                self.pos += 1
+                children = self._scan_jsx_children(name)
+                break
+            if source.startswith("{", self.pos):
+                # spread attributes
+                self._scan_jsx_expression()
+                continue
+
+            match = _JSX_ATTRIBUTE.match(source, self.pos)
+            if not match:
+                raise _NotJSX()
+            self.pos = match.end()
+            self._skip_jsx_space()
+            value = ("true", None)
+            if source.startswith("=", self.pos):
+                self.pos += 1
+                self._skip_jsx_space()
+                value = self._scan_jsx_attribute_value()
+            attributes[match.group()] = value
+
+        element = (name, attributes, children)
+        if name in self.components:
+            self.elements.append(element)
+        return element
+
+    def _scan_jsx_attribute_value(self):
+        source = self.source
+        string = _JSX_STRING.match(source, self.pos)
+        if string:
+            self.pos = string.end()
+            return (
+                "string",
+                _decode_entities(string.group(1) or string.group(2) or ""),
+            )
+        if source.startswith("{", self.pos):
+            return self._scan_jsx_expression()
+        if source.startswith("<", self.pos):
+            return ("jsx", self._scan_jsx_element())
+        raise _NotJSX()
+
+    def _scan_jsx_children(self, name):
+        source = self.source
+        children = []
+        while self.pos < len(source):
+            if source.startswith("</", self.pos):
+                match = _JSX_CLOSE.match(source, self.pos)
+                if not match or match.group(1) != name:
+                    raise _NotJSX()
+                self.pos = match.end()
+                return children
+            char = source[self.pos]
+            if char == "{":
+                children.append(self._scan_jsx_expression())
+            elif char == "<":
+                children.append(("jsx", self._scan_jsx_element()))
+            else:
+                match = _JSX_TEXT.match(source, self.pos)
+                self.pos = match.end()
+                children.append(("text", _decode_entities(match.group())))
+        raise _NotJSX()
+
+    def _scan_jsx_expression(self):
+        self.pos += 1
+        start = len(self.tokens)
+        self.tokens.append(("punct", "{"))
+        if not self._scan_tokens(closing=True):
+            raise _NotJSX()
+        self.tokens.append(("punct", "}"))
+        return "expression", self.tokens[start + 1 : -1]
+
+    def _skip_jsx_space(self):
+        self.pos = _JSX_SPACE.match(self.source, self.pos).end()
+
+
+def _unescape(value: str) -> str:
+    # javascript escape sequences of string and template literals
+    if "\\" not in value:
+        return value
+
+    def replace(match):
+        escape = match.group(1)
+        if escape in _ESCAPES:
+            return _ESCAPES[escape]
+        try:
+            if escape[0] == "u" and len(escape) > 1:
+                return chr(int(escape.strip("u{}"), 16))
+            if escape[0] == "x" and len(escape) > 1:
+                return chr(int(escape[1:], 16))
+            if escape[0] in "01234567":
+                return chr(int(escape, 8))
+        except (ValueError, OverflowError):
+            pass
+        return escape
+
+    value = _ESCAPE.sub(replace, value)
+    # surrogate pairs written as two `\uXXXX` escapes
+    return value.encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+
+
+def _decode_entities(text: str) -> str:
+    # JSX text and attributes may contain html entities (terminated by `;`)
+    if "&" not in text:
+        return text
+
+    def replace(match):
+        entity = match.group(1)
+        try:
+            if entity.startswith("#x"):
+                return chr(int(entity[2:], 16))
+            if entity.startswith("#"):
+                return chr(int(entity[1:]))
+        except (ValueError, OverflowError):
+            return match.group()
+        return html5.get(f"{entity};", match.group())
+
+    return _ENTITY.sub(replace, text)
@@ -4,7 +4,7 @@
 // Invenio-app-rdm is free software; you can redistribute it and/or modify it
 // under the terms of the MIT License; see LICENSE file for more details.
 
-const { readFileSync, writeFileSync, unlinkSync } = require("fs");
+const { existsSync, readFileSync, renameSync, writeFileSync } = require("fs");
 const { gettextToI18next } = require("i18next-conv");
 const TRANSLATIONS_BASE_PATH = process.argv[2] || './';
 const PACKAGE_JSON_BASE_PATH = process.argv[3] || './';
@@ -17,6 +17,18 @@ const options = {
     skipUntranslated: SKIP_UNTRANSLATED
 };
 
+// Write a file only if its content changed, so that its mtime does not trigger webpack rebuilds.
+// The file is replaced atomically, readers never see a partially written file.
+const writeOutput = (path, content) => {
+    if (existsSync(path) && readFileSync(path, "utf-8") === content) {
+        return false;
+    }
+    const tmpPath = `${path}.${process.pid}.tmp`;
+    writeFileSync(tmpPath, content);
+    renameSync(tmpPath, path);
+    return true;
+};
+
 // Compile to JSON translations for each language
 for (const lang of languages) {
     gettextToI18next(
@@ -24,7 +36,7 @@ for (const lang of languages) {
         readFileSync(`${TRANSLATIONS_BASE_PATH}/${lang}/LC_MESSAGES/messages.po`),
         options
     ).then((result) => {
-        writeFileSync(`${PACKAGE_JSON_BASE_PATH}/messages/${lang}/LC_MESSAGES/translations.json`, SKIP_UNTRANSLATED ? JSON.stringify(JSON.parse(result), 0) : result);
+        writeOutput(`${PACKAGE_JSON_BASE_PATH}/messages/${lang}/LC_MESSAGES/translations.json`, SKIP_UNTRANSLATED ? JSON.stringify(JSON.parse(result), 0) : result);
     });
 }
 
@@ -39,4 +51,4 @@ index_content += `export const translations = {
 }
 `
 
-writeFileSync(`${PACKAGE_JSON_BASE_PATH}/messages/index.js`, index_content)
+writeOutput(`${PACKAGE_JSON_BASE_PATH}/messages/index.js`, index_content)
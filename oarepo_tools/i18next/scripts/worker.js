@@ -0,0 +1,80 @@
+// Long-running worker keeping i18next-scanner and i18next-conv loaded, see
+// `oarepo_tools.i18next.worker.NodeWorker`.
+//
+// Reads one JSON request per line from stdin and writes one JSON response per line
+// to stdout: {"id": 1, "command": "extract", ...} -> {"id": 1, "result": ...}
+// or {"id": 1, "error": "message"}. Anything logged goes to stderr.
+
+const { readFileSync } = require("fs");
+const { extname } = require("path");
+const readline = require("readline");
+
+// the scanner configuration reads the languages when it is loaded, they are passed
+// with every extract request instead
+process.env.LANGUAGES = process.env.LANGUAGES || "en";
+const { options: scannerOptions } = require("../i18next-scanner.config.js");
+const { Parser } = require("i18next-scanner");
+const { gettextToI18next, i18nextToPot } = require("i18next-conv");
+
+// stdout carries the protocol only
+console.log = console.info = console.debug = console.warn = console.error;
+
+const commands = {
+  // i18next resources of the source files, as written by `i18next-scanner` to
+  // `extracted-messages.json` (all languages share the file, the last one is kept)
+  extract({ files, languages }) {
+    const lngs = languages && languages.length ? languages : ["en"];
+    const parser = new Parser({ ...scannerOptions, lngs });
+    for (const file of files) {
+      const extension = extname(file);
+      const content = readFileSync(file, "utf-8");
+      if (scannerOptions.func.extensions.includes(extension)) {
+        parser.parseFuncFromString(content);
+      }
+      if (scannerOptions.trans.extensions.includes(extension)) {
+        parser.parseTransFromString(content);
+      }
+    }
+    const resources = parser.get({ sort: false });
+    return resources[lngs[lngs.length - 1]][scannerOptions.defaultNs] || {};
+  },
+
+  // messages template of i18next resources, as written by `generatePOT.sh`
+  async json_to_pot({ resources }) {
+    const body = JSON.stringify(resources);
+    const result = await i18nextToPot("en", body, {
+      keyseparator: "##",
+      ctxSeparator: "_",
+      base: body,
+    });
+    return result.toString();
+  },
+
+  // i18next translations of a PO catalogue, as written by `compileCatalog.js`
+  async po_to_json({ language, catalogue, skipUntranslated }) {
+    const result = await gettextToI18next(language, catalogue, {
+      skipUntranslated: !!skipUntranslated,
+    });
+    return skipUntranslated ? JSON.stringify(JSON.parse(result), 0) : result;
+  },
+};
+
+const respond = (response) => process.stdout.write(`${JSON.stringify(response)}\n`);
+
+// requests are answered one by one, in the order they were received
+let queue = Promise.resolve();
+readline.createInterface({ input: process.stdin }).on("line", (line) => {
+  queue = queue.then(async () => {
+    let request = {};
+    try {
+      request = JSON.parse(line);
+      const command = commands[request.command];
+      if (!command) {
+        throw new Error(`unknown command ${request.command}`);
+      }
+      respond({ id: request.id, result: await command(request) });
+    } catch (error) {
+      respond({ id: request.id, error: String((error && error.stack) || error) });
+    }
+  });
+});
@@ -0,0 +1,91 @@
+import json
+import os
+import subprocess
+import threading
+from pathlib import Path
+
+# JSON-lines worker of the bundled NPM project
+WORKER_SCRIPT = Path(__file__).parent / "scripts" / "worker.js"
+
+
+class NodeWorkerError(RuntimeError):
+    """A request failed in the node worker or the worker exited."""
+
+
+class NodeWorker:
+    """Long-running node process answering JSON-lines requests, see `scripts/worker.js`.
+
+    Node, i18next-scanner and i18next-conv are loaded only once, however many requests
+    are made. The process is started with the first request (and again if it exited)
+    and requests from several threads are serialized.
+
+    :param script: javascript file of the worker
+    :param cwd: working directory of the worker, where its `node_modules` are found
+    :param env: environment of the worker process
+    """
+
+    def __init__(self, script=WORKER_SCRIPT, cwd=None, env=None):
+        self.script = Path(script)
+        self.cwd = cwd or self.script.parent
+        self.env = env
+        self.process = None
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def request(self, command: str, **arguments):
+        """Sends a request and waits for its response.
+
+        :param command: name of the command, e.g. `extract`, `json_to_pot` or `po_to_json`
+        :param arguments: JSON serializable arguments of the command
+        :return: result of the command
+        :raises NodeWorkerError: when the command failed or the worker exited
+        """
+        with self._lock:
+            if self.process is None or self.process.poll() is not None:
+                self._start()
+            self.requests += 1
+            request_id = self.requests
+            try:
+                self.process.stdin.write(
+                    json.dumps({"id": request_id, "command": command, **arguments})
+                    + "\n"
+                )
+                self.process.stdin.flush()
+                line = self.process.stdout.readline()
+            except OSError as e:
+                raise NodeWorkerError(f"node worker failed: {e}") from e
+            if not line:
+                raise NodeWorkerError(
+                    f"node worker exited with code {self.process.wait()}"
+                )
+
+        response = json.loads(line)
+        if response.get("id") != request_id:
+            raise NodeWorkerError(f"unexpected response of the node worker: {line}")
+        if "error" in response:
+            raise NodeWorkerError(f"{command} failed: {response['error']}")
+        return response["result"]
+
+    def close(self):
+        """Stops the worker process, a later request starts it again."""
+        with self._lock:
+            if self.process is None:
+                return
+            self.process.stdin.close()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process.stdout.close()
+            self.process = None
+
+    def _start(self):
+        self.process = subprocess.Popen(
+            ["node", str(self.script)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=self.cwd,
+            env=self.env if self.env is not None else dict(os.environ),
+            encoding="utf-8",
+        )
@@ -0,0 +1,201 @@
+import fnmatch
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+# Directories and files that are never scanned, matched against the name and against
+# the trailing components of the path. Patterns starting with `/` match only paths
+# relative to the package root, so that e.g. a `build` package of the sources is
+# still scanned. Extended by `exclude` in the i18n configuration.
+DEFAULT_EXCLUDES = (
+    ".git",
+    ".hg",
+    ".svn",
+    ".tox",
+    ".nox",
+    ".venv",
+    "node_modules",
+    "__pycache__",
+    ".mypy_cache",
+    ".pytest_cache",
+    ".make-translations",
+    "/venv",
+    "/*.egg-info",
+    "/build",
+    "/dist",
+)
+
+# File suffix -> kind of the file, i.e. which extractor processes it
+FILE_KINDS = {
+    ".py": "python",
+    ".html": "jinja2",
+    ".jinja": "jinjax",
+    ".js": "javascript",
+    ".jsx": "javascript",
+    ".ts": "javascript",
+    ".tsx": "javascript",
+    ".po": "gettext",
+    ".json": "i18next",
+}
+
+BABEL_FILE_KINDS = ("python", "jinja2", "jinjax")
+I18NEXT_FILE_KINDS = ("javascript",)
+
+
+def classify(path) -> Optional[str]:
+    """Returns the kind of a file (see `FILE_KINDS`) or None if it is not scanned at all."""
+    return FILE_KINDS.get(os.path.splitext(str(path))[1])
+
+
+def _glob_regex(pattern: str):
+    # glob semantics of `Path.glob`: `**/` matches any number (including zero) of directories
+    regex = ""
+    for part in re.split(r"(\*\*/|\*|\?)", pattern):
+        if part == "**/":
+            regex += "(?:.*/)?"
+        elif part == "*":
+            regex += "[^/]*"
+        elif part == "?":
+            regex += "[^/]"
+        else:
+            regex += re.escape(part)
+    return re.compile(regex + r"\Z")
+
+
+class FileIndex:
+    """Index of files under a set of root directories.
+
+    Each root is walked only once (lazily, on the first query) with `os.scandir`. Excluded
+    directories are pruned without being entered, so vendored `node_modules` or build output
+    under the source paths cost nothing. Symlinks to directories are not followed. All stages
+    of a build are fed from the same index.
+
+    :param excludes: glob patterns of excluded directories and files, matched against
+                     the name and against the trailing components of the path
+                     (e.g. `node_modules`, `*.egg-info` or `ui/generated`). Patterns
+                     starting with `/` are matched against the path relative to `base_dir`
+                     only (e.g. `/build` or `/*.egg-info`).
+    :param base_dir: directory the anchored patterns are relative to, the package root
+                     (default: the current directory)
+    """
+
+    def __init__(self, excludes: Iterable[str] = DEFAULT_EXCLUDES, base_dir=None):
+        self.excludes = tuple(excludes)
+        self.base_dir = os.path.abspath(base_dir or os.curdir)
+        unanchored = [pattern for pattern in self.excludes if pattern[:1] != "/"]
+        anchored = [pattern[1:] for pattern in self.excludes if pattern[:1] == "/"]
+        self._excluded_name = re.compile(
+            "|".join(fnmatch.translate(pattern) for pattern in unanchored) or "$^"
+        )
+        self._excluded_path = re.compile(
+            "|".join(fnmatch.translate("*/" + pattern) for pattern in unanchored)
+            or "$^"
+        )
+        self._excluded_anchored = [_glob_regex(pattern) for pattern in anchored]
+        # root -> sorted list of (path relative to the root in posix format, path)
+        self._walked = {}
+        self._lock = threading.Lock()
+
+    def _is_excluded(self, name, path, base_path):
+        return bool(
+            self._excluded_name.match(name)
+            or self._excluded_path.match(path.replace(os.sep, "/"))
+            or (
+                base_path is not None
+                and any(regex.match(base_path) for regex in self._excluded_anchored)
+            )
+        )
+
+    def _walk(self, root: str) -> list:
+        # path of the root relative to `base_dir`, None when the root is outside of it
+        base_prefix = None
+        if self._excluded_anchored:
+            base_prefix = os.path.relpath(os.path.abspath(root), self.base_dir)
+            if base_prefix == os.pardir or base_prefix.startswith(os.pardir + os.sep):
+                base_prefix = None
+            elif base_prefix == os.curdir:
+                base_prefix = ""
+            else:
+                base_prefix = base_prefix.replace(os.sep, "/") + "/"
+        entries = []
+        stack = [(root, "")]
+        while stack:
+            directory, prefix = stack.pop()
+            try:
+                with os.scandir(directory) as iterator:
+                    children = list(iterator)
+            except OSError:
+                continue
+            for child in children:
+                relative_path = prefix + child.name
+                if self._is_excluded(
+                    child.name,
+                    child.path,
+                    None if base_prefix is None else base_prefix + relative_path,
+                ):
+                    continue
+                # symlinked directories are not followed (as by os.walk), so that
+                # a cycle of links cannot be walked forever
+                try:
+                    if child.is_dir(follow_symlinks=False):
+                        stack.append((child.path, relative_path + "/"))
+                    elif child.is_file():
+                        entries.append((relative_path, Path(child.path)))
+                except OSError:
+                    continue
+        entries.sort()
+        return entries
+
+    def _entries(self, root: Path) -> list:
+        root = os.path.normpath(root)
+        with self._lock:
+            if root not in self._walked:
+                self._walked[root] = self._walk(root)
+            return self._walked[root]
+
+    def files(
+        self,
+        paths: Iterable[Path],
+        patterns: Iterable[str] = None,
+        kinds: Iterable[str] = None,
+    ) -> list:
+        """Lists indexed files under `paths`.
+
+        :param paths: files or directories to look into, files are returned as they are
+        :param patterns: glob patterns relative to each directory (e.g. `**/*.py`),
+                         all files when not given
+        :param kinds: kinds of files to return (see `FILE_KINDS`), all when not given
+        :return: sorted list of unique file paths
+        """
+        regexes = None if patterns is None else [_glob_regex(p) for p in patterns]
+        kinds = None if kinds is None else set(kinds)
+        files = set()
+        for path in paths:
+            path = Path(path)
+            if path.is_file():
+                files.add(path)
+                continue
+            for relative_path, file in self._entries(path):
+                if kinds is not None and classify(relative_path) not in kinds:
+                    continue
+                if regexes is not None and not any(
+                    regex.match(relative_path) for regex in regexes
+                ):
+                    continue
+                files.add(file)
+        return sorted(files)
+
+    def invalidate(self):
+        """Forgets all walked roots, they are walked again on the next query."""
+        with self._lock:
+            self._walked.clear()
+
+
+def configured_excludes(i18n_configuration: dict) -> tuple:
+    """Returns exclude patterns: the defaults and `exclude` from the i18n configuration."""
+    excludes = i18n_configuration.get("exclude", [])
+    if isinstance(excludes, str):
+        excludes = excludes.split()
+    return (*DEFAULT_EXCLUDES, *excludes)
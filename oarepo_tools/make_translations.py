@@ -1,91 +1,880 @@
 import configparser
+import glob
+import json
 import os
 import sys
 import tempfile
+import time
 from pathlib import Path
 from typing import Optional
 
 import click
+import polib
 import yaml
 
+from . import configured_choice, worker_pool
 from .babel import (
+    BABEL_CONFIGURATION,
+    BABEL_SOURCE_PATTERNS,
     compile_babel_translations,
     ensure_babel_configuration,
     ensure_babel_output_translations,
-    extract_babel_messages,
+    extract_babel_catalogue,
+    load_cached_catalogue,
+    load_catalogue,
     merge_babel_catalogues,
-    merge_catalogue_dirs,
     update_babel_translations,
 )
+from .check import catalogue_drift, format_drift
 from .i18next import (
+    I18NEXT_ENGINES,
+    I18NEXT_SOURCE_PATTERNS,
     compile_i18next_translations,
     ensure_i18next_output_translations,
-    extract_i18next_messages,
+    ensure_node_toolchain,
+    extract_i18next_catalogue,
     merge_catalogues_from_i18next_translation_dir,
+    merge_i18next_messages_to_po,
+    needs_node_toolchain,
 )
+from .index import FileIndex, configured_excludes
+from .manifest import (
+    MANIFEST_DIR,
+    BuildManifest,
+    collect_files,
+    counting_outputs,
+    fingerprint,
+    tool_versions,
+)
+from .pipeline import Pipeline, Stage
+from .po import PO_ENGINES, Catalogue, po_engine, save_catalogue, save_template
+from .profiling import (
+    Profiler,
+    add_counters,
+    is_profiling,
+    profiling,
+    profiling_context,
+)
+from .watch import watch
 
 
 @click.command(
     help="Generates and compiles localization messages. "
     "Reads configuration from setup.cfg and uses it to call babel and i18next. "
     "Expects setup.cfg or oarepo.yaml in the current directory or you may pass "
-    "the path to it as an argument."
+    "the path to it as an argument. When several paths are passed (or matched by --all), "
+    "all the packages are built in one process."
+)
+@click.argument("config_paths", nargs=-1)
+@click.option(
+    "--all",
+    "all_patterns",
+    multiple=True,
+    metavar="GLOB",
+    help="Build all packages whose configuration file or directory matches the glob, "
+    "e.g. 'packages/*/setup.cfg'. Can be repeated.",
 )
-@click.argument("config_path", required=False)
 @click.option(
     "--without-ui", is_flag=True, help="Exclude UI-related i18next operations."
 )
-def main(config_path, without_ui):
-    config_path = Path(config_path or Path.cwd())
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Rebuild everything, even stages whose inputs did not change since the last run.",
+)
+@click.option(
+    "-j",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Maximum number of concurrently running stages and worker processes "
+    "(default: number of CPUs).",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running and rebuild the translations whenever sources or catalogues change.",
+)
+@click.option(
+    "--check",
+    is_flag=True,
+    help="Do not write anything, only report catalogues that are not up to date "
+    "with the sources and exit with a non-zero code if there are any.",
+)
+@click.option(
+    "--profile",
+    is_flag=True,
+    help="Record time, CPU and memory of every stage, print a summary table "
+    "and write a JSON report.",
+)
+@click.option(
+    "--profile-output",
+    type=click.Path(dir_okay=False),
+    default=str(Path(MANIFEST_DIR) / "profile.json"),
+    show_default=True,
+    help="Path of the JSON report written with --profile.",
+)
+@click.option(
+    "--setup-node",
+    is_flag=True,
+    help="Only install the node toolchain used by the i18next stages (e.g. when provisioning "
+    "CI images) and exit. npm runs only when package.json or the lockfile changed, "
+    "unless --force is given.",
+)
+@click.option(
+    "--i18next-scanner",
+    type=click.Choice(I18NEXT_ENGINES),
+    help="Read i18next keys by i18next-scanner in node or in Python, "
+    "overrides `i18next_scanner` of the configuration (default: node).",
+)
+@click.option(
+    "--i18next-converter",
+    type=click.Choice(I18NEXT_ENGINES),
+    help="Convert catalogues and templates by i18next-conv in node or in Python, "
+    "overrides `i18next_converter` of the configuration (default: node).",
+)
+@click.option(
+    "--po-engine",
+    "po_engine_name",
+    type=click.Choice(PO_ENGINES),
+    help="Parse and write catalogues by this engine, overrides `po_engine` "
+    "of the configuration (default: native).",
+)
+def main(
+    config_paths,
+    all_patterns,
+    without_ui,
+    force,
+    jobs,
+    watch,
+    check,
+    profile,
+    profile_output,
+    setup_node,
+    i18next_scanner,
+    i18next_converter,
+    po_engine_name,
+):
+    if setup_node:
+        ensure_node_toolchain(force=force)
+        return
+
+    config_paths = [Path(config_path).resolve() for config_path in config_paths]
+    for pattern in all_patterns:
+        matches = sorted(glob.glob(pattern, recursive=True))
+        if not matches:
+            click.secho(f"No configuration matches {pattern}", fg="yellow")
+        config_paths += [Path(match).resolve() for match in matches]
+
+    if watch and len(config_paths) > 1:
+        raise click.UsageError("--watch can be used with a single package only")
+    if watch and check:
+        raise click.UsageError("--watch can not be used together with --check")
+
+    # values given on the command line take precedence over the configuration of the packages
+    overrides = {
+        key: value
+        for key, value in (
+            ("i18next_scanner", i18next_scanner),
+            ("i18next_converter", i18next_converter),
+            ("po_engine", po_engine_name),
+        )
+        if value
+    }
+
+    profiler = None
+    if profile:
+        # resolve before changing into package directories
+        profile_output = Path(profile_output).resolve()
+        profiler = Profiler()
+
+    up_to_date = True
+    with profiling(profiler):
+        if check:
+            for config_path in config_paths or [Path.cwd()]:
+                if check_translations(
+                    config_path, without_ui=without_ui, overrides=overrides
+                ):
+                    up_to_date = False
+        elif len(config_paths) <= 1:
+            make_translations(
+                config_paths[0] if config_paths else Path.cwd(),
+                without_ui=without_ui,
+                force=force,
+                jobs=jobs,
+                watch=watch,
+                overrides=overrides,
+            )
+        else:
+            build_packages(
+                config_paths,
+                without_ui=without_ui,
+                force=force,
+                jobs=jobs,
+                overrides=overrides,
+            )
+
+    if profiler is not None:
+        profiler.write_report(profile_output)
+        click.secho(profiler.summary_table())
+        click.secho(f"Profile written to {profile_output}", fg="green")
+
+    if not up_to_date:
+        sys.exit(1)
+
+
+def build_packages(
+    config_paths, without_ui=False, force=False, jobs=None, overrides=None
+):
+    """Builds translations of several packages in one process and prints a summary.
+
+    See :func:`make_translations` for the parameters.
+
+    :raises SystemExit: when building any of the packages failed
+    """
+    summary = []
+    with worker_pool(jobs):
+        for config_path in config_paths:
+            click.secho(
+                f"Building translations of {config_path}", fg="green", bold=True
+            )
+            started = time.monotonic()
+            try:
+                with counting_outputs() as outputs:
+                    results = make_translations(
+                        config_path,
+                        without_ui=without_ui,
+                        force=force,
+                        jobs=jobs,
+                        overrides=overrides,
+                    )
+            except SystemExit as e:
+                click.secho(
+                    f"Building {config_path} failed: exit code {e.code}", fg="red"
+                )
+                summary.append((config_path, time.monotonic() - started, None, None))
+            except Exception as e:
+                click.secho(f"Building {config_path} failed: {e}", fg="red")
+                summary.append((config_path, time.monotonic() - started, None, None))
+            else:
+                summary.append(
+                    (config_path, time.monotonic() - started, results, outputs)
+                )
+
+    click.secho("Summary:", bold=True)
+    for config_path, duration, results, outputs in summary:
+        if results is None:
+            click.secho(f"  {config_path}: FAILED after {duration:.2f}s", fg="red")
+        else:
+            run = sum(1 for was_run in results.values() if was_run)
+            click.secho(
+                f"  {config_path}: OK in {duration:.2f}s "
+                f"({run} stages run, {len(results) - run} skipped, "
+                f"{outputs['written']} outputs updated)",
+                fg="green",
+            )
+
+    if any(results is None for _, _, results, _ in summary):
+        sys.exit(1)
+
+
+def make_translations(
+    config_path: Path,
+    without_ui=False,
+    force=False,
+    jobs=None,
+    watch=False,
+    overrides: dict = None,
+) -> dict:
+    """Builds translations of a single package.
+
+    :param config_path: path to `setup.cfg`, `oarepo.yaml` or to a directory containing them
+    :param without_ui: exclude i18next stages
+    :param force: run all stages, even those with unchanged inputs
+    :param jobs: maximum number of concurrently running stages and of worker processes
+    :param watch: keep rebuilding on changes until interrupted
+    :param overrides: values of the i18n configuration (e.g. `po_engine`) that take
+                      precedence over the configuration file
+    :return: dictionary of stage name -> True if the stage was run, False if skipped
+             (results of the initial build in watch mode)
+    """
+    config_path = Path(config_path)
     base_dir = (config_path if config_path.is_dir() else config_path.parent).resolve()
     os.chdir(base_dir)
+    if is_profiling():
+        profiling_context()["package"] = str(base_dir)
 
-    i18n_configuration = read_configuration(config_path)
+    i18n_configuration = {**read_configuration(config_path), **(overrides or {})}
+    engine = configured_choice(i18n_configuration, "po_engine", PO_ENGINES)
+    manifest = BuildManifest(base_dir, force=force)
 
     babel_ini_file = ensure_babel_configuration(base_dir)
     babel_translations_dir = ensure_babel_output_translations(
         base_dir, i18n_configuration
     )
-    babel_messages_pot = extract_babel_messages(
-        base_dir, babel_ini_file, babel_translations_dir, i18n_configuration
+
+    # catalogues parsed by the pipeline, kept in memory between rebuilds in --watch mode
+    state = {}
+
+    def build():
+        with po_engine(engine), counting_outputs() as outputs:
+            results = build_pipeline(
+                base_dir,
+                babel_ini_file,
+                babel_translations_dir,
+                i18n_configuration,
+                without_ui=without_ui,
+                manifest=manifest,
+                jobs=jobs,
+                state=state,
+            ).run()
+        # outputs with unchanged content are not rewritten
+        click.secho(
+            f"{outputs['written']} of {outputs['written'] + outputs['unchanged']} "
+            f"outputs updated",
+            fg="green",
+        )
+        return results
+
+    results = build()
+
+    if watch:
+        manifest.force = False
+        watch_translations(
+            base_dir, babel_translations_dir, i18n_configuration, without_ui, build
+        )
+
+    return results
+
+
+def check_translations(config_path: Path, without_ui=False, overrides=None) -> dict:
+    """Reports catalogues of a single package that are not up to date with the sources.
+
+    Messages are extracted and merged with the catalogues and input translations
+    in memory, nothing in the package is written. Node is started
+    only when there are i18next sources to extract.
+
+    :param config_path: path to `setup.cfg`, `oarepo.yaml` or to a directory containing them
+    :param without_ui: exclude i18next sources and input translations
+    :param overrides: values of the i18n configuration that take precedence
+                      over the configuration file
+    :return: dictionary of catalogue name (`messages.pot` or language) -> drift
+             (see :func:`oarepo_tools.check.catalogue_drift`), empty when up to date
+    """
+    config_path = Path(config_path)
+    base_dir = (config_path if config_path.is_dir() else config_path.parent).resolve()
+    os.chdir(base_dir)
+    if is_profiling():
+        profiling_context()["package"] = str(base_dir)
+
+    i18n_configuration = {**read_configuration(config_path), **(overrides or {})}
+    with po_engine(configured_choice(i18n_configuration, "po_engine", PO_ENGINES)):
+        drift = _translations_drift(base_dir, i18n_configuration, without_ui)
+    if drift:
+        click.secho(f"Translations of {base_dir} are not up to date:", fg="red")
+        for name, changes in drift.items():
+            click.secho(format_drift(name, changes), fg="red")
+    else:
+        click.secho(f"Translations of {base_dir} are up to date", fg="green")
+    return drift
+
+
+def _translations_drift(base_dir: Path, i18n_configuration: dict, without_ui) -> dict:
+    # drift of messages.pot and of every language, empty drifts are left out
+    babel_output_translations = i18n_configuration.get("babel_output_translations")
+    if not babel_output_translations:
+        click.secho(
+            f"configuration error: `babel_output_translations` directory missing or invalid.",
+            fg="red",
+        )
+        sys.exit(1)
+    babel_translations_dir = base_dir / babel_output_translations
+
+    index = FileIndex(configured_excludes(i18n_configuration), base_dir=base_dir)
+    templates = [
+        extract_babel_catalogue(
+            base_dir,
+            BABEL_CONFIGURATION,
+            i18n_configuration,
+            source_files=_source_files(
+                index,
+                base_dir,
+                i18n_configuration,
+                "babel_source_paths",
+                BABEL_SOURCE_PATTERNS,
+            ),
+        )
+    ]
+    i18next_source_files = (
+        []
+        if without_ui
+        else _source_files(
+            index,
+            base_dir,
+            i18n_configuration,
+            "i18next_source_paths",
+            I18NEXT_SOURCE_PATTERNS,
+        )
     )
+    if i18next_source_files:
+        if needs_node_toolchain(i18n_configuration):
+            ensure_node_toolchain()
+        with tempfile.TemporaryDirectory() as temp_dir:
+            templates.append(
+                extract_i18next_catalogue(
+                    base_dir,
+                    Path(temp_dir),
+                    i18n_configuration,
+                    source_files=i18next_source_files,
+                )
+            )
+
+    messages_template = merge_message_templates(templates)
+
+    if messages_template is None:
+        messages_template = Catalogue()
+    messages_pot = babel_translations_dir / "messages.pot"
+
+    drift = {
+        "messages.pot": catalogue_drift(
+            messages_template,
+            load_catalogue(messages_pot) if messages_pot.exists() else None,
+        )
+    }
 
+    for language in i18n_configuration.get("languages", ("cs", "en")):
+        catalogue_file = (
+            babel_translations_dir / language / "LC_MESSAGES" / "messages.po"
+        )
+        if catalogue_file.exists():
+            actual = load_catalogue(catalogue_file)
+            # parsed again, the expected catalogue is built by merging into it in memory
+            expected = load_catalogue(catalogue_file)
+        else:
+            actual = None
+            expected = Catalogue()
+
+        merge_babel_catalogues(messages_template, expected)
+        for input_translations in i18n_configuration.get(
+            "babel_input_translations", []
+        ):
+            input_catalogue_file = (
+                base_dir / input_translations / language / "LC_MESSAGES" / "messages.po"
+            )
+            if input_catalogue_file.exists():
+                input_catalogue = load_cached_catalogue(input_catalogue_file)
+                merge_babel_catalogues(input_catalogue, expected)
+        if not without_ui:
+            for input_translations in i18n_configuration.get(
+                "i18next_input_translations", []
+            ):
+                input_messages_file = (
+                    base_dir / input_translations / language / "translations.json"
+                )
+                if input_messages_file.exists():
+                    input_messages = json.loads(input_messages_file.read_text("utf-8"))
+                    merge_i18next_messages_to_po(input_messages, expected)
+
+        drift[language] = catalogue_drift(expected, actual)
+
+    return {name: changes for name, changes in drift.items() if changes}
+
+
+def watch_translations(
+    base_dir: Path,
+    babel_translations_dir: Path,
+    i18n_configuration: dict,
+    without_ui,
+    build,
+):
+    """Calls `build` whenever a source file, an input translation or a language catalogue changes.
+
+    Stages whose inputs were not affected by the change are skipped by the build manifest.
+    """
+    source_keys = [
+        ("babel_source_paths", BABEL_SOURCE_PATTERNS),
+        ("babel_input_translations", ("*/LC_MESSAGES/*.po",)),
+    ]
     if not without_ui:
-        i18n_translations_dir = ensure_i18next_output_translations(
+        source_keys += [
+            ("i18next_source_paths", I18NEXT_SOURCE_PATTERNS),
+            ("i18next_input_translations", ("*/translations.json",)),
+        ]
+
+    def watched_files():
+        # walked again on every call, so that new files are picked up
+        index = FileIndex(configured_excludes(i18n_configuration), base_dir=base_dir)
+        files = [
+            *babel_translations_dir.glob("*/LC_MESSAGES/*.po"),
+        ]
+        for config_key, patterns in source_keys:
+            files += _source_files(
+                index, base_dir, i18n_configuration, config_key, patterns
+            )
+        return files
+
+    def on_change(changed):
+        click.secho(
+            f"Detected changes in {', '.join(str(path) for path in changed)}",
+            fg="green",
+        )
+        started = time.monotonic()
+        try:
+            build()
+        except Exception as e:
+            click.secho(f"Build failed: {e}", fg="red")
+        else:
+            click.secho(
+                f"Rebuilt in {time.monotonic() - started:.2f}s, watching for changes",
+                fg="green",
+            )
+
+    roots = [babel_translations_dir]
+    for config_key, _ in source_keys:
+        roots += [
+            base_dir / path.strip() for path in i18n_configuration.get(config_key, [])
+        ]
+
+    # files written by the build itself: catalogues, compiled catalogues, i18next
+    # translations and the build manifest
+    output_dirs = [babel_translations_dir, base_dir / MANIFEST_DIR]
+    if not without_ui and i18n_configuration.get("i18next_output_translations"):
+        output_dirs.append(base_dir / i18n_configuration["i18next_output_translations"])
+
+    def is_output(path):
+        return any(output_dir in path.parents for output_dir in output_dirs)
+
+    click.secho("Watching for changes, press Ctrl+C to stop", fg="green")
+    try:
+        watch(roots, watched_files, on_change, is_output=is_output)
+    except KeyboardInterrupt:
+        pass
+
+
+def build_pipeline(
+    base_dir: Path,
+    babel_ini_file: Path,
+    babel_translations_dir: Path,
+    i18n_configuration: dict,
+    without_ui=False,
+    manifest: BuildManifest = None,
+    jobs=None,
+    state: dict = None,
+) -> Pipeline:
+    """Builds the DAG of `make-translations` stages.
+
+    Babel extraction, node toolchain setup and i18next extraction run concurrently,
+    the results are joined when merging message templates into `messages.pot`.
+
+    :param base_dir: Python package root directory (containing `setup.cfg` or `oarepo.yaml`)
+    :param babel_ini_file: path to the `babel.ini` configuration file
+    :param babel_translations_dir: root path of babel messages catalogue
+    :param i18n_configuration:
+    :param without_ui: exclude i18next stages
+    :param manifest: build manifest used to skip stages with unchanged inputs
+    :param jobs: maximum number of concurrently running stages and of worker processes
+    :param state: values (e.g. parsed catalogues) shared between stages, pass the same
+                  dictionary to reuse them across repeated runs
+    :return: pipeline ready to be run
+    """
+    configuration = {
+        "i18n": i18n_configuration,
+        "without_ui": without_ui,
+        "versions": tool_versions(),
+    }
+    work_dir = base_dir / MANIFEST_DIR
+    babel_messages_pot = babel_translations_dir / "messages.pot"
+    i18next_extracted_pot = work_dir / "i18next" / "messages.pot"
+    # values produced by stages and consumed by the stages that require them:
+    # i18next output translations directory is known once `setup_i18next` stage finishes,
+    # extracted message templates are passed to `merge_templates` in memory,
+    # messages template is parsed once by `merge_templates` and reused by `update`
+    state = {} if state is None else state
+    # source paths and input translations are walked only once per build
+    index = FileIndex(configured_excludes(i18n_configuration), base_dir=base_dir)
+
+    def catalogue_files():
+        return sorted(babel_translations_dir.glob("*/LC_MESSAGES/*.po"))
+
+    def babel_source_files():
+        return _source_files(
+            index,
+            base_dir,
+            i18n_configuration,
+            "babel_source_paths",
+            BABEL_SOURCE_PATTERNS,
+        )
+
+    def extract_babel():
+        source_files = babel_source_files()
+        state["babel_template"] = extract_babel_catalogue(
+            base_dir,
+            babel_ini_file,
+            i18n_configuration,
+            source_files=source_files,
+            cache_dir=work_dir / "babel" / "cache",
+            jobs=jobs,
+        )
+        add_counters(files_scanned=len(source_files))
+
+    def extract_babel_inputs():
+        return fingerprint([babel_ini_file, *babel_source_files()], configuration)
+
+    def setup_i18next():
+        state["i18n_translations_dir"] = ensure_i18next_output_translations(
             base_dir, i18n_configuration
         )
 
-        with tempfile.TemporaryDirectory() as i18n_temp:
-            i18n_messages_pot = extract_i18next_messages(
-                base_dir, Path(i18n_temp), i18n_configuration
+    def extract_i18next():
+        i18next_extracted_pot.parent.mkdir(parents=True, exist_ok=True)
+        i18next_extracted_pot.unlink(missing_ok=True)
+        source_files = _source_files(
+            index,
+            base_dir,
+            i18n_configuration,
+            "i18next_source_paths",
+            I18NEXT_SOURCE_PATTERNS,
+        )
+        state["i18next_template"] = extract_i18next_catalogue(
+            base_dir,
+            i18next_extracted_pot.parent,
+            i18n_configuration,
+            source_files=source_files,
+            cache_dir=work_dir / "i18next" / "cache",
+            jobs=jobs,
+        )
+        if state["i18next_template"] is not None:
+            # read by merge_templates when this stage is skipped in a later build
+            save_catalogue(state["i18next_template"], i18next_extracted_pot)
+        add_counters(files_scanned=len(source_files))
+
+    def merge_templates():
+        if "babel_template" not in state:
+            # extraction was skipped in this process, the cache makes it cheap to repeat
+            extract_babel()
+        templates = [state["babel_template"]]
+        if not without_ui:
+            templates.append(state.get("i18next_template", i18next_extracted_pot))
+        state["messages_template"] = merge_message_templates(
+            templates, babel_messages_pot
+        )
+        if state["messages_template"] is not None:
+            add_counters(entries_merged=len(state["messages_template"]))
+
+    def update():
+        messages_template = state.get("messages_template")
+        update_translations(
+            base_dir,
+            babel_messages_pot if messages_template is None else messages_template,
+            babel_translations_dir,
+            i18n_configuration,
+            without_ui,
+            jobs=jobs,
+        )
+
+    def compile_i18next():
+        compile_i18next_translations(
+            babel_translations_dir, state["i18n_translations_dir"], i18n_configuration
+        )
+
+    def compile_i18next_outputs():
+        translations_dir = state["i18n_translations_dir"]
+        return fingerprint(
+            [
+                translations_dir / "messages" / "index.js",
+                *sorted(
+                    translations_dir.glob("messages/*/LC_MESSAGES/translations.json")
+                ),
+            ]
+        )
+
+    pipeline = Pipeline(manifest, jobs=jobs)
+
+    pipeline.add(
+        Stage(
+            "extract_babel",
+            extract_babel,
+            inputs=extract_babel_inputs,
+        )
+    )
+
+    if not without_ui:
+        pipeline.add(Stage("setup_i18next", setup_i18next))
+        pipeline.add(
+            Stage(
+                "extract_i18next",
+                extract_i18next,
+                # only i18next-scanner and i18next-conv need the node toolchain
+                requires=(
+                    ["setup_i18next"]
+                    if needs_node_toolchain(i18n_configuration)
+                    else []
+                ),
+                inputs=lambda: fingerprint(
+                    _source_files(
+                        index,
+                        base_dir,
+                        i18n_configuration,
+                        "i18next_source_paths",
+                        I18NEXT_SOURCE_PATTERNS,
+                    ),
+                    configuration,
+                ),
+                outputs=lambda: fingerprint([i18next_extracted_pot]),
             )
-            merge_babel_catalogues(i18n_messages_pot, babel_messages_pot)
+        )
 
-    update_babel_translations(babel_messages_pot, babel_translations_dir)
+    pipeline.add(
+        Stage(
+            "merge_templates",
+            merge_templates,
+            requires=["extract_babel"] + ([] if without_ui else ["extract_i18next"]),
+            inputs=lambda: fingerprint(
+                [] if without_ui else [i18next_extracted_pot],
+                extract_babel_inputs(),
+            ),
+            outputs=lambda: fingerprint([babel_messages_pot]),
+        )
+    )
+
+    pipeline.add(
+        Stage(
+            "update",
+            update,
+            requires=["merge_templates"],
+            inputs=lambda: fingerprint(
+                [
+                    babel_messages_pot,
+                    *_source_files(
+                        index,
+                        base_dir,
+                        i18n_configuration,
+                        "babel_input_translations",
+                        ("*/LC_MESSAGES/*.po",),
+                    ),
+                    *(
+                        []
+                        if without_ui
+                        else _source_files(
+                            index,
+                            base_dir,
+                            i18n_configuration,
+                            "i18next_input_translations",
+                            ("*/translations.json",),
+                        )
+                    ),
+                ],
+                configuration,
+            ),
+            outputs=lambda: fingerprint(catalogue_files()),
+        )
+    )
 
-    for extra_babel_translations in i18n_configuration.get(
-        "babel_input_translations", []
-    ):
-        merge_catalogue_dirs(
-            base_dir / extra_babel_translations, babel_translations_dir
+    pipeline.add(
+        Stage(
+            "compile_babel",
+            lambda: compile_babel_translations(babel_translations_dir, jobs=jobs),
+            requires=["update"],
+            inputs=lambda: fingerprint(catalogue_files(), configuration),
+            outputs=lambda: fingerprint(
+                [f.with_suffix(".mo") for f in catalogue_files()]
+            ),
         )
+    )
 
     if not without_ui:
-        for extra_i18next_translations in i18n_configuration.get(
-            "i18next_input_translations", []
-        ):
-            merge_catalogues_from_i18next_translation_dir(
-                base_dir / extra_i18next_translations, babel_translations_dir
+        pipeline.add(
+            Stage(
+                "compile_i18next",
+                compile_i18next,
+                requires=["update", "setup_i18next"],
+                inputs=lambda: fingerprint(catalogue_files(), configuration),
+                outputs=compile_i18next_outputs,
             )
+        )
+
+    return pipeline
+
+
+def merge_message_templates(
+    templates, messages_pot: Optional[Path] = None
+) -> Optional[polib.POFile]:
+    """Merges extracted message templates (in the given order) into `messages_pot`.
+
+    :param templates: extracted catalogues or paths to extracted `.pot` files,
+                      None and missing paths are ignored. The catalogues are not modified.
+    :param messages_pot: path to the resulting `messages.pot` catalogue,
+                         when not given the merged catalogue is only returned
+    :return: the merged catalogue, so that it does not need to be parsed again
+    """
+    templates = [
+        load_catalogue(template)
+        for template in templates
+        if isinstance(template, polib.POFile)
+        or (template is not None and template.exists())
+    ]
+    if not templates:
+        click.secho("No messages were extracted", fg="yellow")
+        return None
+
+    messages_template = Catalogue()
+    messages_template.header = templates[0].header
+    messages_template.metadata = dict(templates[0].metadata)
+    messages_template.metadata_is_fuzzy = list(templates[0].metadata_is_fuzzy or [])
+    for template in templates:
+        merge_babel_catalogues(template, messages_template)
+    if messages_pot is not None:
+        save_template(messages_template, messages_pot)
 
-    compile_babel_translations(babel_translations_dir)
+    return messages_template
+
+
+def update_translations(
+    base_dir: Path,
+    babel_messages_pot,
+    babel_translations_dir: Path,
+    i18n_configuration: dict,
+    without_ui=False,
+    jobs=None,
+):
+    """Updates language catalogues from `messages.pot` and merges in all input translations.
+
+    :param babel_messages_pot: path to `messages.pot` or an already parsed catalogue
+    """
+    update_babel_translations(
+        babel_messages_pot,
+        babel_translations_dir,
+        [
+            base_dir / extra_babel_translations
+            for extra_babel_translations in i18n_configuration.get(
+                "babel_input_translations", []
+            )
+        ],
+        jobs=jobs,
+    )
 
     if not without_ui:
-        compile_i18next_translations(
-            babel_translations_dir, i18n_translations_dir, i18n_configuration
+        merge_catalogues_from_i18next_translation_dir(
+            [
+                base_dir / extra_i18next_translations
+                for extra_i18next_translations in i18n_configuration.get(
+                    "i18next_input_translations", []
+                )
+            ],
+            babel_translations_dir,
         )
 
 
+def _source_files(
+    index: FileIndex, base_dir: Path, i18n_configuration: dict, config_key, patterns
+):
+    return collect_files(
+        [base_dir / path.strip() for path in i18n_configuration.get(config_key, [])],
+        patterns,
+        index,
+    )
+
+
 def read_configuration(config_path: Path):
     try:
         return read_configuration_from_setup_cfg(
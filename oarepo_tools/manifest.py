@@ -0,0 +1,227 @@
+import functools
+import hashlib
+import importlib.metadata
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+import click
+
+from .index import FileIndex
+
+MANIFEST_DIR = ".make-translations"
+MANIFEST_FILE = "manifest.json"
+
+# path -> (mtime in ns, size, hex digest), so that long-running processes (--watch)
+# do not re-read files that did not change
+_hash_cache = {}
+
+
+def hash_file(path: Path) -> str:
+    """Computes a content hash of a single file.
+
+    :param path: path to the file
+    :return: hex digest of the file contents or an empty string if the file is missing
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return ""
+
+    path = str(path)
+    cached = _hash_cache.get(path)
+    if cached and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    _hash_cache[path] = (stat.st_mtime_ns, stat.st_size, digest)
+    return digest
+
+
+# umask of the process, read once as it can only be read by changing it
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+# numbers of outputs written (or left untouched) by `write_output` in this process
+_output_counts = {"written": 0, "unchanged": 0}
+_output_counts_lock = threading.Lock()
+
+
+def write_output(path: Path, content: bytes) -> bool:
+    """Writes a generated file, unless it already has exactly the same content.
+
+    Unchanged files keep their mtime, so that file watchers (webpack, Flask reloader, ...)
+    are not triggered. The content is compared by hash, which is cached by :func:`hash_file`.
+    The file is replaced atomically, readers never see a partially written file.
+
+    :param path: path to the output file
+    :param content: the whole content of the file
+    :return: True if the file was written, False if it was up to date
+    """
+    digest = hashlib.sha256(content).hexdigest()
+    if hash_file(path) == digest:
+        count_outputs(unchanged=1)
+        return False
+
+    path = Path(path)
+    try:
+        mode = os.stat(path).st_mode & 0o777
+    except OSError:
+        mode = 0o666 & ~_UMASK
+    with tempfile.NamedTemporaryFile(
+        dir=path.parent, prefix=f".{path.name}.", delete=False
+    ) as f:
+        try:
+            f.write(content)
+            f.close()
+            # temporary files are private, the output gets the usual permissions
+            os.chmod(f.name, mode)
+            os.replace(f.name, path)
+        except BaseException:
+            os.unlink(f.name)
+            raise
+
+    stat = os.stat(path)
+    _hash_cache[str(path)] = (stat.st_mtime_ns, stat.st_size, digest)
+    count_outputs(written=1)
+    return True
+
+
+def count_outputs(written=0, unchanged=0):
+    """Adds to the numbers of written and unchanged outputs, e.g. those reported by worker processes."""
+    with _output_counts_lock:
+        _output_counts["written"] += written
+        _output_counts["unchanged"] += unchanged
+
+
+@contextmanager
+def counting_outputs():
+    """Counts outputs written by `write_output` in the enclosed block.
+
+    Yields a dictionary which is filled with `written` and `unchanged` counts on exit.
+    """
+    counts = {}
+    before = dict(_output_counts)
+    try:
+        yield counts
+    finally:
+        for key, value in _output_counts.items():
+            counts[key] = value - before[key]
+
+
+def collect_files(
+    paths: Iterable[Path], patterns: Iterable[str], index: Optional[FileIndex] = None
+) -> list:
+    """Lists all files under `paths` matching any of the glob `patterns`.
+
+    :param paths: files or directories to look into
+    :param patterns: glob patterns relative to each directory (e.g. `**/*.py`)
+    :param index: file index to take the files from, excluded directories
+                  (`node_modules`, `.git`, ...) are never entered
+    :return: sorted list of unique file paths
+    """
+    return (index or FileIndex()).files(paths, patterns)
+
+
+@functools.lru_cache
+def tool_versions() -> dict:
+    """Versions of oarepo-tools and babel, part of every stage fingerprint and cache key,
+    so that an upgrade of the tools rebuilds everything."""
+    versions = {}
+    for distribution in ("oarepo-tools", "babel"):
+        try:
+            versions[distribution] = importlib.metadata.version(distribution)
+        except importlib.metadata.PackageNotFoundError:
+            versions[distribution] = None
+    return versions
+
+
+def fingerprint(files: Iterable[Path] = (), configuration=None) -> str:
+    """Computes a single fingerprint of the contents of `files` and `configuration`.
+
+    :param files: paths of files whose content (and presence) is part of the fingerprint
+    :param configuration: any JSON-serializable value that is part of the fingerprint
+    :return: hex digest
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(configuration, sort_keys=True, default=str).encode())
+    for path in sorted({str(f) for f in files}):
+        digest.update(f"\0{path}\0{hash_file(path)}".encode())
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """Persistent record of input fingerprints of `make-translations` stages.
+
+    A stage is skipped when the fingerprint of its inputs is the same as the one taken
+    before its last successful run and its outputs were not changed since that run.
+    """
+
+    def __init__(self, base_dir: Path, force=False):
+        """
+        :param base_dir: Python package root directory (containing `setup.cfg` or `oarepo.yaml`)
+        :param force: when set, all stages are run regardless of the recorded state
+        """
+        self.manifest_file = base_dir / MANIFEST_DIR / MANIFEST_FILE
+        self.force = force
+        self.stages = self._load()
+        self._lock = threading.Lock()
+
+    def _load(self) -> dict:
+        try:
+            return json.loads(self.manifest_file.read_text("utf-8")).get("stages", {})
+        except (OSError, ValueError, AttributeError):
+            return {}
+
+    def save(self):
+        self.manifest_file.parent.mkdir(parents=True, exist_ok=True)
+        self.manifest_file.write_text(
+            json.dumps({"stages": self.stages}, indent=2, sort_keys=True), "utf-8"
+        )
+
+    def is_up_to_date(self, stage: str, stage_fingerprint: dict) -> bool:
+        return not self.force and self.stages.get(stage) == stage_fingerprint
+
+    def run(
+        self,
+        stage: str,
+        inputs: Callable[[], str],
+        func: Callable,
+        *args,
+        outputs: Optional[Callable[[], str]] = None,
+        **kwargs,
+    ) -> Optional[bool]:
+        """Runs `func` unless the `inputs` fingerprint of `stage` is unchanged.
+
+        The inputs are fingerprinted before `func` runs, so an input changed while the stage
+        is running is built again by the next run. The outputs are fingerprinted after `func`
+        finishes, so that the files written by the stage itself do not invalidate it,
+        while outputs changed by anyone else do.
+
+        :param stage: stage name
+        :param inputs: callable returning the current fingerprint of the stage inputs
+        :param func: stage function, called with `args` and `kwargs`
+        :param outputs: callable returning the current fingerprint of the stage outputs
+        :return: True if the stage was run, False if it was skipped
+        """
+        stage_fingerprint = {
+            "inputs": inputs(),
+            "outputs": outputs() if outputs is not None else None,
+        }
+        if self.is_up_to_date(stage, stage_fingerprint):
+            click.secho(f"Skipping {stage}: inputs unchanged", fg="yellow")
+            return False
+
+        func(*args, **kwargs)
+
+        if outputs is not None:
+            stage_fingerprint["outputs"] = outputs()
+        with self._lock:
+            self.stages[stage] = stage_fingerprint
+            self.save()
+        return True
@@ -0,0 +1,130 @@
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Iterable, Optional
+
+from .manifest import BuildManifest
+from .profiling import add_record, measure
+
+
+class Stage:
+    """A single step of the `make-translations` pipeline.
+
+    :param name: unique stage name, used in the build manifest and in `requires`
+    :param func: callable performing the stage
+    :param requires: names of stages that must finish before this one starts
+    :param inputs: optional callable returning a fingerprint of the stage inputs.
+                   When given, the stage is skipped if the fingerprint is unchanged
+                   since its last run (see :class:`BuildManifest`).
+    :param outputs: optional callable returning a fingerprint of the files written
+                    by the stage, the stage is run again when they were changed since
+    """
+
+    def __init__(
+        self,
+        name: str,
+        func: Callable,
+        requires: Iterable[str] = (),
+        inputs: Optional[Callable[[], str]] = None,
+        outputs: Optional[Callable[[], str]] = None,
+    ):
+        self.name = name
+        self.func = func
+        self.requires = tuple(requires)
+        self.inputs = inputs
+        self.outputs = outputs
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, requires={self.requires!r})"
+
+
+class Pipeline:
+    """Runs a DAG of stages, each stage as soon as all its requirements have finished.
+
+    Independent stages run concurrently in a thread pool of at most `jobs` workers.
+    """
+
+    def __init__(self, manifest: Optional[BuildManifest] = None, jobs=None):
+        self.manifest = manifest
+        self.jobs = jobs or os.cpu_count() or 1
+        self.stages = {}
+        # stage name -> True if the stage was run, False if it was skipped
+        self.results = {}
+
+    def add(self, stage: Stage) -> Stage:
+        if stage.name in self.stages:
+            raise ValueError(f"Duplicate pipeline stage {stage.name}")
+        self.stages[stage.name] = stage
+        return stage
+
+    def _check(self):
+        for stage in self.stages.values():
+            for required in stage.requires:
+                if required not in self.stages:
+                    raise ValueError(
+                        f"Stage {stage.name} requires unknown stage {required}"
+                    )
+
+        # Kahn's algorithm, fails on cycles
+        remaining = {name: set(s.requires) for name, s in self.stages.items()}
+        while remaining:
+            ready = [name for name, requires in remaining.items() if not requires]
+            if not ready:
+                raise ValueError(f"Cyclic dependency between stages {list(remaining)}")
+            for name in ready:
+                del remaining[name]
+            for requires in remaining.values():
+                requires.difference_update(ready)
+
+    def _run_stage(self, stage: Stage):
+        record = {"name": stage.name}
+        try:
+            with measure(stage.name) as record:
+                if self.manifest is not None and stage.inputs is not None:
+                    was_run = self.manifest.run(
+                        stage.name, stage.inputs, stage.func, outputs=stage.outputs
+                    )
+                else:
+                    stage.func()
+                    was_run = True
+        except BaseException as e:
+            # failed stages are reported too, with the time spent until the failure
+            record["failed"] = f"{type(e).__name__}: {e}"
+            raise
+        else:
+            record["skipped"] = not was_run
+        finally:
+            add_record(record)
+        return was_run
+
+    def run(self) -> dict:
+        """Runs all stages.
+
+        :return: dictionary of stage name -> True if the stage was run, False if skipped
+        :raises: the first exception raised by any stage; stages that have not started yet
+                 are cancelled, running ones are allowed to finish.
+        """
+        self._check()
+
+        done = set()
+        pending = dict(self.stages)
+        running = {}
+
+        with ThreadPoolExecutor(max_workers=self.jobs) as executor:
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if all(required in done for required in stage.requires):
+                        del pending[name]
+                        running[executor.submit(self._run_stage, stage)] = name
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    name = running.pop(future)
+                    error = future.exception()
+                    if error is not None:
+                        for other in running:
+                            other.cancel()
+                        raise error
+                    self.results[name] = future.result()
+                    done.add(name)
+
+        return self.results
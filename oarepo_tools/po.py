@@ -0,0 +1,655 @@
+import array
+import codecs
+import hashlib
+import os
+import re
+import struct
+import textwrap
+from contextlib import contextmanager
+from pathlib import Path
+
+import polib
+
+from oarepo_tools.manifest import hash_file, write_output
+
+# engines parsing and writing catalogues: `native` (the parser and writer below) or `polib`
+PO_ENGINES = ("native", "polib")
+
+# engine used in this process, see :func:`po_engine`
+PO_ENGINE = "native"
+
+_CHARSET = re.compile(rb'"?Content-Type:.+? charset=([\w_\-:\.]+)')
+_UNESCAPE = re.compile(r'\\(\\|n|t|r|v|b|f|")')
+_UNESCAPES = {"n": "\n", "t": "\t", "r": "\r", "v": "\v", "b": "\b", "f": "\f"}
+_UNESCAPED_QUOTE = re.compile(r'([^\\]|^)"')
+_NEEDS_ESCAPE = re.compile(r'[\\\t\r\n\v\b\f"]')
+_SPECIAL_CHARS = ("\\", "\n", "\r", "\t", "\v", "\b", "\f", '"')
+
+_KEYWORDS = {"msgctxt": "ct", "msgid": "mi", "msgstr": "ms", "msgid_plural": "mp"}
+_PREVIOUS_KEYWORDS = {"msgid_plural": "pp", "msgid": "pm", "msgctxt": "pc"}
+_ALL_STATES = {"st", "he", "gc", "oc", "fl", "ct", "pc", "pm", "pp", "tc"}
+_ALL_STATES |= {"ms", "mp", "mx", "mi"}
+# symbol -> states it may follow, the same state machine as polib uses
+_TRANSITIONS = {
+    "tc": _ALL_STATES - {"ct"},
+    "gc": _ALL_STATES,
+    "oc": _ALL_STATES,
+    "fl": _ALL_STATES,
+    "pc": _ALL_STATES,
+    "pm": _ALL_STATES,
+    "pp": _ALL_STATES,
+    "ct": {"st", "he", "gc", "oc", "fl", "tc", "pc", "pm", "pp", "ms", "mx"},
+    "mi": {"st", "he", "gc", "oc", "fl", "ct", "tc", "pc", "pm", "pp", "ms", "mx"},
+    "mp": {"tc", "gc", "pc", "pm", "pp", "mi"},
+    "ms": {"mi", "mp", "tc"},
+    "mx": {"mi", "mx", "mp", "tc"},
+    "mc": {"ct", "mi", "mp", "ms", "mx", "pm", "pp", "pc"},
+}
+_CONTINUABLE = _TRANSITIONS["mc"]
+_MSGID_FOLLOWS = _TRANSITIONS["mi"]
+_MSGSTR_FOLLOWS = _TRANSITIONS["ms"]
+# state -> attribute extended by a continuation line
+_CONTINUED = {
+    "ct": "msgctxt",
+    "mi": "msgid",
+    "mp": "msgid_plural",
+    "ms": "msgstr",
+    "pp": "previous_msgid_plural",
+    "pm": "previous_msgid",
+    "pc": "previous_msgctxt",
+}
+
+
+class _SyntaxError(Exception):
+    pass
+
+
+def _unescape(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return _UNESCAPE.sub(lambda m: _UNESCAPES.get(m.group(1), m.group(1)), value)
+
+
+def _escape(value: str) -> str:
+    if _NEEDS_ESCAPE.search(value) is None:
+        return value
+    return polib.escape(value)
+
+
+class Entry:
+    """Catalogue entry with the same attributes (and constructor) as `polib.POEntry`.
+
+    Entries of both types may be mixed in a catalogue.
+    """
+
+    __slots__ = (
+        "msgid",
+        "msgstr",
+        "msgid_plural",
+        "msgstr_plural",
+        "msgctxt",
+        "obsolete",
+        "comment",
+        "tcomment",
+        "occurrences",
+        "flags",
+        "previous_msgctxt",
+        "previous_msgid",
+        "previous_msgid_plural",
+        "linenum",
+    )
+
+    def __init__(
+        self,
+        msgid="",
+        msgstr="",
+        msgid_plural="",
+        msgstr_plural=None,
+        msgctxt=None,
+        obsolete=False,
+        comment="",
+        tcomment="",
+        occurrences=None,
+        flags=None,
+        previous_msgctxt=None,
+        previous_msgid=None,
+        previous_msgid_plural=None,
+        linenum=None,
+    ):
+        self.msgid = msgid
+        self.msgstr = msgstr
+        self.msgid_plural = msgid_plural
+        self.msgstr_plural = {} if msgstr_plural is None else msgstr_plural
+        self.msgctxt = msgctxt
+        self.obsolete = obsolete
+        self.comment = comment
+        self.tcomment = tcomment
+        self.occurrences = [] if occurrences is None else occurrences
+        self.flags = [] if flags is None else flags
+        self.previous_msgctxt = previous_msgctxt
+        self.previous_msgid = previous_msgid
+        self.previous_msgid_plural = previous_msgid_plural
+        self.linenum = linenum
+
+    def __copy__(self):
+        copy = Entry.__new__(Entry)
+        for name in Entry.__slots__:
+            setattr(copy, name, getattr(self, name))
+        return copy
+
+    def __repr__(self):
+        return f"<Entry {self.msgid!r}>"
+
+    def __unicode__(self, wrapwidth=78):
+        return format_entry(self, wrapwidth)
+
+    __str__ = __unicode__
+
+    @property
+    def fuzzy(self):
+        return "fuzzy" in self.flags
+
+    @fuzzy.setter
+    def fuzzy(self, value):
+        if value and not self.fuzzy:
+            self.flags.insert(0, "fuzzy")
+        elif not value and self.fuzzy:
+            self.flags.remove("fuzzy")
+
+    @property
+    def msgid_with_context(self):
+        if self.msgctxt:
+            return f"{self.msgctxt}\x04{self.msgid}"
+        return self.msgid
+
+    def translated(self):
+        if self.obsolete or self.fuzzy:
+            return False
+        if self.msgstr != "":
+            return True
+        if self.msgstr_plural:
+            return all(value != "" for value in self.msgstr_plural.values())
+        return False
+
+
+@contextmanager
+def po_engine(engine: str):
+    """Parses and writes catalogues by the given engine inside the block.
+
+    :param engine: one of :data:`PO_ENGINES`
+    """
+    global PO_ENGINE
+    previous, PO_ENGINE = PO_ENGINE, engine
+    try:
+        yield
+    finally:
+        PO_ENGINE = previous
+
+
+class Catalogue(polib.POFile):
+    """`polib.POFile` serialized by the native writer (unless `PO_ENGINE` is `polib`).
+
+    The output is the same as the one of polib, so the engines can be switched without
+    changing any catalogue on disk.
+    """
+
+    def __unicode__(self):
+        if PO_ENGINE == "polib":
+            return super().__unicode__()
+
+        lines = []
+        for header in self.header.split("\n"):
+            if not header:
+                lines.append("#\n")
+            elif header[:1] in (",", ":"):
+                lines.append(f"#{header}\n")
+            else:
+                lines.append(f"# {header}\n")
+
+        wrapwidth = self.wrapwidth
+        entries = [format_entry(self.metadata_as_entry(), wrapwidth)]
+        entries += [format_entry(e, wrapwidth) for e in self if not e.obsolete]
+        entries += [format_entry(e, wrapwidth) for e in self if e.obsolete]
+        return "".join(lines) + "\n".join(entries)
+
+    __str__ = __unicode__
+
+    def to_binary(self):
+        if PO_ENGINE == "polib":
+            return super().to_binary()
+
+        # the same layout as polib (and msgfmt) writes, built without repeated concatenation
+        entries = self.translated_entries()
+        entries.sort(key=lambda entry: entry.msgid_with_context.encode("utf-8"))
+        entries = [self.metadata_as_entry(), *entries]
+        ids, strs, offsets = [], [], []
+        ids_length = strs_length = 0
+        for entry in entries:
+            msgid = entry.msgid
+            if entry.msgctxt:
+                msgid = f"{entry.msgctxt}\x04{msgid}"
+            if entry.msgid_plural:
+                msgid = f"{msgid}\0{entry.msgid_plural}"
+                msgstr = "\0".join(
+                    entry.msgstr_plural[index] for index in sorted(entry.msgstr_plural)
+                )
+            else:
+                msgstr = entry.msgstr
+            msgid = msgid.encode(self.encoding)
+            msgstr = msgstr.encode(self.encoding)
+            offsets.append((ids_length, len(msgid), strs_length, len(msgstr)))
+            ids.append(msgid)
+            strs.append(msgstr)
+            ids_length += len(msgid) + 1
+            strs_length += len(msgstr) + 1
+
+        keystart = 7 * 4 + 16 * len(entries)
+        valuestart = keystart + ids_length
+        key_offsets = []
+        value_offsets = []
+        for id_offset, id_length, str_offset, str_length in offsets:
+            key_offsets += [id_length, id_offset + keystart]
+            value_offsets += [str_length, str_offset + valuestart]
+
+        return b"".join(
+            [
+                struct.pack(
+                    "Iiiiiii",
+                    polib.MOFile.MAGIC,
+                    0,
+                    len(entries),
+                    7 * 4,
+                    7 * 4 + len(entries) * 8,
+                    0,
+                    keystart,
+                ),
+                array.array("i", key_offsets + value_offsets).tobytes(),
+                b"\0".join(ids),
+                b"\0",
+                b"\0".join(strs),
+                b"\0",
+            ]
+        )
+
+
+def _format_field(fieldname, delflag, plural_index, field, wrapwidth):
+    lines = field.splitlines(True)
+    if len(lines) > 1:
+        lines = ["", *lines]
+    else:
+        lines = [field]
+        width = wrapwidth - len(fieldname) - 3 - len(plural_index)
+        if wrapwidth > 0 and len(field) > width:
+            # escaped characters do not count into the width
+            width += sum(field.count(char) for char in _SPECIAL_CHARS)
+            if len(field) > width:
+                lines = [""] + [
+                    polib.unescape(item)
+                    for item in textwrap.wrap(
+                        polib.escape(field),
+                        wrapwidth - 2,
+                        drop_whitespace=False,
+                        break_long_words=False,
+                    )
+                ]
+
+    result = [f'{delflag}{fieldname}{plural_index} "{_escape(lines[0])}"']
+    for line in lines[1:]:
+        result.append(f'{delflag}"{_escape(line)}"')
+    return result
+
+
+def format_entry(entry, wrapwidth=78) -> str:
+    """Formats an entry (`Entry` or `polib.POEntry`) exactly as polib does."""
+    lines = []
+    obsolete = entry.obsolete
+    comments = ((entry.tcomment, "# "), (None if obsolete else entry.comment, "#. "))
+    for value, prefix in comments:
+        if value:
+            for comment in value.split("\n"):
+                if wrapwidth > 0 and len(comment) + len(prefix) > wrapwidth:
+                    lines += textwrap.wrap(
+                        comment,
+                        wrapwidth,
+                        initial_indent=prefix,
+                        subsequent_indent=prefix,
+                        break_long_words=False,
+                    )
+                else:
+                    lines.append(prefix + comment)
+
+    if not obsolete and entry.occurrences:
+        occurrences = " ".join(
+            f"{path}:{lineno}" if lineno else path for path, lineno in entry.occurrences
+        )
+        if wrapwidth > 0 and len(occurrences) + 3 > wrapwidth:
+            # hyphens are not a place to break file names at
+            lines += [
+                line.replace("*", "-")
+                for line in textwrap.wrap(
+                    occurrences.replace("-", "*"),
+                    wrapwidth,
+                    initial_indent="#: ",
+                    subsequent_indent="#: ",
+                    break_long_words=False,
+                )
+            ]
+        else:
+            lines.append("#: " + occurrences)
+
+    if entry.flags:
+        lines.append("#, " + ", ".join(entry.flags))
+
+    prefix = "#~| " if obsolete else "#| "
+    for fieldname, value in (
+        ("msgctxt", entry.previous_msgctxt),
+        ("msgid", entry.previous_msgid),
+        ("msgid_plural", entry.previous_msgid_plural),
+    ):
+        if value is not None:
+            lines += _format_field(fieldname, prefix, "", value, wrapwidth)
+
+    delflag = "#~ " if obsolete else ""
+    if entry.msgctxt is not None:
+        lines += _format_field("msgctxt", delflag, "", entry.msgctxt, wrapwidth)
+    lines += _format_field("msgid", delflag, "", entry.msgid, wrapwidth)
+    if entry.msgid_plural:
+        lines += _format_field(
+            "msgid_plural", delflag, "", entry.msgid_plural, wrapwidth
+        )
+    if entry.msgstr_plural:
+        for index in sorted(entry.msgstr_plural):
+            lines += _format_field(
+                "msgstr",
+                delflag,
+                f"[{index}]",
+                entry.msgstr_plural[index],
+                wrapwidth,
+            )
+    else:
+        lines += _format_field("msgstr", delflag, "", entry.msgstr, wrapwidth)
+    lines.append("")
+    return "\n".join(lines)
+
+
+def _check_quotes(value):
+    if '"' in value[1:-1] and _UNESCAPED_QUOTE.search(value[1:-1]):
+        raise _SyntaxError("unescaped double quote found")
+
+
+def _parse(text: str, catalogue: Catalogue):
+    # a single pass over the lines with the state machine of polib, entries are plain
+    # `__slots__` objects and the line handlers are inlined
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    if text.startswith("\ufeff"):
+        text = text[1:]
+
+    entries = []
+    entry = Entry()
+    state = "st"
+    msgstr_index = 0
+    header = []
+    first_token = None
+    for lineno, line in enumerate(text.split("\n"), 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        # fast paths of the most frequent lines, the same result as the general path
+        first_char = line[0]
+        if first_char == '"':
+            first_token = '"'
+            if state not in _CONTINUABLE:
+                raise _SyntaxError(f"line {lineno}")
+            _check_quotes(line)
+            value = _unescape(line[1:-1])
+            if state == "mx":
+                entry.msgstr_plural[msgstr_index] += value
+            elif state == "ms":
+                entry.msgstr += value
+            elif state == "mi":
+                entry.msgid += value
+            else:
+                attribute = _CONTINUED[state]
+                setattr(entry, attribute, getattr(entry, attribute) + value)
+            continue
+        if first_char == "m":
+            if line.startswith('msgid "'):
+                first_token = "msgid"
+                if state not in _MSGID_FOLLOWS:
+                    raise _SyntaxError(f"line {lineno}")
+                _check_quotes(line[6:])
+                if state == "ms" or state == "mx":
+                    entries.append(entry)
+                    entry = Entry(linenum=lineno)
+                entry.obsolete = False
+                entry.msgid = _unescape(line[7:-1])
+                state = "mi"
+                continue
+            if line.startswith('msgstr "'):
+                first_token = "msgstr"
+                if state not in _MSGSTR_FOLLOWS:
+                    raise _SyntaxError(f"line {lineno}")
+                _check_quotes(line[7:])
+                entry.msgstr = _unescape(line[8:-1])
+                state = "ms"
+                continue
+        elif first_char == "#" and line.startswith("#: "):
+            first_token = "#:"
+            if state == "ms" or state == "mx":
+                entries.append(entry)
+                entry = Entry(linenum=lineno)
+            occurrences = entry.occurrences
+            for occurrence in line[3:].split():
+                path, separator, line_number = occurrence.rpartition(":")
+                if separator and line_number.isdigit():
+                    occurrences.append((path, line_number))
+                else:
+                    occurrences.append((occurrence, ""))
+            state = "oc"
+            continue
+
+        tokens = line.split(None, 2)
+        first_token = tokens[0]
+        if first_token == "#~|":
+            continue
+        obsolete = first_token == "#~" and len(tokens) > 1
+        if obsolete:
+            line = line[3:].strip()
+            tokens = tokens[1:]
+            first_token = tokens[0]
+
+        token = line
+        if first_token in _KEYWORDS and len(tokens) > 1:
+            token = line[len(first_token) :].lstrip()
+            _check_quotes(token)
+            symbol = _KEYWORDS[first_token]
+        elif first_token == "#:":
+            if len(tokens) <= 1:
+                continue
+            symbol = "oc"
+        elif line[0] == '"':
+            _check_quotes(line)
+            symbol = "mc"
+        elif line[:7] == "msgstr[":
+            symbol = "mx"
+        elif first_token == "#,":
+            if len(tokens) <= 1:
+                continue
+            symbol = "fl"
+        elif first_token == "#" or first_token.startswith("##"):
+            symbol = "tc"
+        elif first_token == "#.":
+            if len(tokens) <= 1:
+                continue
+            symbol = "gc"
+        elif first_token == "#|":
+            if len(tokens) <= 2:
+                # continuation of a previous msgid or an invalid line
+                if len(tokens) <= 1 or not tokens[1].startswith('"'):
+                    raise _SyntaxError(f"line {lineno}")
+            token = line[2:].lstrip()
+            if tokens[1].startswith('"'):
+                symbol = "mc"
+            elif tokens[1] in _PREVIOUS_KEYWORDS:
+                token = token[len(tokens[1]) :].lstrip()
+                symbol = _PREVIOUS_KEYWORDS[tokens[1]]
+            else:
+                raise _SyntaxError(f"line {lineno}")
+        else:
+            raise _SyntaxError(f"line {lineno}")
+
+        if state not in _TRANSITIONS[symbol]:
+            raise _SyntaxError(f"line {lineno}")
+
+        if symbol == "mc":
+            value = _unescape(token[1:-1])
+            if state == "mx":
+                entry.msgstr_plural[msgstr_index] += value
+            else:
+                attribute = _CONTINUED[state]
+                setattr(entry, attribute, getattr(entry, attribute) + value)
+            # continuation does not change the state
+            continue
+
+        if symbol == "tc" and state in ("st", "he"):
+            header.append(token[2:])
+            state = "he"
+            continue
+
+        if symbol not in ("mp", "ms", "mx") and state in ("ms", "mx"):
+            # a new entry starts
+            entries.append(entry)
+            entry = Entry(linenum=lineno)
+
+        if symbol == "mi":
+            entry.obsolete = obsolete
+            entry.msgid = _unescape(token[1:-1])
+        elif symbol == "ms":
+            entry.msgstr = _unescape(token[1:-1])
+        elif symbol == "oc":
+            for occurrence in token[3:].split():
+                path, separator, line_number = occurrence.rpartition(":")
+                if separator and line_number.isdigit():
+                    entry.occurrences.append((path, line_number))
+                else:
+                    entry.occurrences.append((occurrence, ""))
+        elif symbol == "fl":
+            entry.flags += [flag.strip() for flag in token[3:].split(",")]
+        elif symbol == "gc":
+            entry.comment = (
+                token[3:] if not entry.comment else f"{entry.comment}\n{token[3:]}"
+            )
+        elif symbol == "tc":
+            comment = token.lstrip("#")
+            if comment.startswith(" "):
+                comment = comment[1:]
+            entry.tcomment = (
+                comment if not entry.tcomment else f"{entry.tcomment}\n{comment}"
+            )
+        elif symbol == "mx":
+            msgstr_index = int(token[7])
+            entry.msgstr_plural[msgstr_index] = _unescape(
+                token[token.find('"') + 1 : -1]
+            )
+        elif symbol == "mp":
+            entry.msgid_plural = _unescape(token[1:-1])
+        elif symbol == "ct":
+            entry.msgctxt = _unescape(token[1:-1])
+        elif symbol == "pm":
+            entry.previous_msgid = _unescape(token[1:-1])
+        elif symbol == "pp":
+            entry.previous_msgid_plural = _unescape(token[1:-1])
+        elif symbol == "pc":
+            entry.previous_msgctxt = _unescape(token[1:-1])
+        state = symbol
+
+    if first_token is not None and not first_token.startswith("#"):
+        # trailing comments are not an entry
+        entries.append(entry)
+    catalogue.extend(entries)
+
+    catalogue.header = "\n".join(header)
+    for index, metadata_entry in enumerate(catalogue):
+        if metadata_entry.msgid == "" and not metadata_entry.obsolete:
+            break
+    else:
+        return catalogue
+
+    del catalogue[index]
+    catalogue.metadata_is_fuzzy = metadata_entry.flags
+    key = None
+    for line in metadata_entry.msgstr.splitlines():
+        name, separator, value = line.partition(":")
+        if separator:
+            key = name
+            catalogue.metadata[key] = value.strip()
+        elif key is not None:
+            catalogue.metadata[key] += "\n" + line.strip()
+    return catalogue
+
+
+def pofile(path) -> polib.POFile:
+    """Parses a PO/POT file, a drop-in replacement of `polib.pofile`.
+
+    The native parser is several times faster than polib and keeps entries in compact
+    :class:`Entry` objects. Files it does not understand (other encodings than UTF-8,
+    syntax errors) are parsed by polib, as well as all files when `PO_ENGINE` is `polib`.
+
+    :param path: path to the PO/POT file
+    :return: parsed catalogue
+    """
+    if PO_ENGINE == "polib":
+        return polib.pofile(str(path), klass=Catalogue)
+
+    with open(path, "rb") as f:
+        content = f.read()
+    match = _CHARSET.search(content)
+    encoding = match.group(1).decode() if match else "utf-8"
+    try:
+        if codecs.lookup(encoding).name != "utf-8":
+            raise _SyntaxError(f"{encoding} encoded catalogue")
+        catalogue = Catalogue(fpath=str(path), encoding=encoding)
+        return _parse(content.decode("utf-8"), catalogue)
+    except (_SyntaxError, LookupError, UnicodeError, ValueError, TypeError, IndexError):
+        return polib.pofile(str(path), klass=Catalogue)
+
+
+def save_catalogue(catalogue: polib.POFile, path, mofile=None) -> bool:
+    """Saves a catalogue (and its compiled `.mo` file), files with unchanged content are not written.
+
+    :param catalogue: catalogue to save
+    :param path: path to the PO/POT file
+    :param mofile: path to the MO file, when not given the catalogue is not compiled
+    :return: True if any of the files was written
+    """
+    written = write_output(path, str(catalogue).encode(catalogue.encoding))
+    if mofile is not None:
+        written = write_output(mofile, catalogue.to_binary()) or written
+    return written
+
+
+_POT_CREATION_DATE = re.compile(rb'"POT-Creation-Date: (.*?)\\n"')
+
+
+def save_template(catalogue: polib.POFile, path) -> bool:
+    """Saves a messages template, keeping the file untouched if only its creation date changed.
+
+    :param catalogue: messages template
+    :param path: path to the POT file
+    :return: True if the file was written
+    """
+    creation_date = catalogue.metadata.get("POT-Creation-Date")
+    previous = os.path.exists(path) and _POT_CREATION_DATE.search(
+        Path(path).read_bytes()
+    )
+    if creation_date and previous:
+        catalogue.metadata["POT-Creation-Date"] = previous.group(1).decode()
+        try:
+            content = str(catalogue).encode(catalogue.encoding)
+        finally:
+            catalogue.metadata["POT-Creation-Date"] = creation_date
+        if hashlib.sha256(content).hexdigest() == hash_file(path):
+            return write_output(path, content)
+    return save_catalogue(catalogue, path)
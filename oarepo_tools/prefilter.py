@@ -0,0 +1,61 @@
+import mmap
+import re
+from typing import Iterable
+
+import click
+
+from oarepo_tools.profiling import add_counters
+
+# Jinja2 `{% trans %}` blocks contain messages without any function call
+JINJA_TRANS_BLOCK = rb"\{%[-+]?\s*trans\b"
+
+
+def marker_pattern(functions: Iterable[str] = (), markers: Iterable[bytes] = ()):
+    """Compiles a bytes pattern matching any place a translatable message may start at.
+
+    :param functions: names of translation functions (e.g. `_`, `lazy_gettext` or
+                      `i18next.t`), matched only when called
+    :param markers: additional regular expressions (e.g. of a `<Trans>` component)
+    """
+    alternatives = list(markers)
+    functions = sorted(functions, key=len, reverse=True)
+    if functions:
+        alternatives.append(
+            rb"(?<![\w$])(?:"
+            + b"|".join(re.escape(name.encode()) for name in functions)
+            + rb")[\s\\]*\("
+        )
+    return re.compile(b"|".join(alternatives) or rb"(?!)")
+
+
+def has_markers(path, pattern) -> bool:
+    """Tells if the file at `path` contains a match of `pattern`, without decoding it."""
+    with open(path, "rb") as f:
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as content:
+                return pattern.search(content) is not None
+        except ValueError:
+            # empty files cannot be mapped
+            return False
+
+
+def prefilter(source_files: list, pattern, name: str) -> list:
+    """Drops files that cannot contain any translatable message.
+
+    Searching for the markers is much cheaper than tokenizing or parsing the files,
+    only the remaining candidates are passed to the extractors.
+
+    :param source_files: files to filter
+    :param pattern: pattern of :func:`marker_pattern`
+    :param name: name of the extraction reported in the output
+    :return: files containing a marker, in the original order
+    """
+    candidates = [path for path in source_files if has_markers(path, pattern)]
+    skipped = len(source_files) - len(candidates)
+    add_counters(files_prefiltered=skipped)
+    if source_files:
+        click.secho(
+            f"Skipped {skipped} of {len(source_files)} {name} files "
+            f"({skipped / len(source_files):.0%}) without translation markers"
+        )
+    return candidates
@@ -0,0 +1,231 @@
+import json
+import platform
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Optional
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# profiler receiving records of measured stages, see `profiling()`
+_active_profiler = None
+
+# record of the stage being measured in the current thread, see `add_counters()`
+_current = threading.local()
+
+# number of blocks being measured in all threads, the peak of traced memory is global
+# and is reset only when no other block is measured
+_active_measures = 0
+_active_measures_lock = threading.Lock()
+
+
+def _children_cpu_time():
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _peak_rss_kb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, kilobytes elsewhere
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+@contextmanager
+def measure(name: str, **counters):
+    """Measures the enclosed block and yields its record.
+
+    The record contains wall time and CPU time of the current thread, which belong to
+    the block alone. The other values are process-wide and, when stages run concurrently,
+    include the work of the overlapping stages as well: CPU time of child processes
+    (e.g. npm) finished during the block, peak RSS over the whole lifetime of the process
+    and, when `tracemalloc` is tracing, peak traced memory since the block (or the first
+    of the overlapping blocks) started. Counters (number of files, entries, ...) can be
+    added to the yielded record directly or from nested code through :func:`add_counters`.
+
+    Measuring works without an active profiler (e.g. in worker processes); pass the record
+    to :func:`add_record` to report it.
+
+    :param name: name of the measured stage
+    :param counters: initial counters
+    """
+    record = {"name": name, **counters}
+    previous = getattr(_current, "record", None)
+    _current.record = record
+
+    global _active_measures
+    with _active_measures_lock:
+        if not _active_measures and tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        _active_measures += 1
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    children_cpu = _children_cpu_time()
+    try:
+        yield record
+    finally:
+        record["wall_time"] = time.perf_counter() - wall
+        record["cpu_time"] = time.thread_time() - cpu
+        record["process_children_cpu_time"] = _children_cpu_time() - children_cpu
+        record["process_peak_rss_kb"] = _peak_rss_kb()
+        if tracemalloc.is_tracing():
+            record["process_peak_traced_kb"] = (
+                tracemalloc.get_traced_memory()[1] // 1024
+            )
+        with _active_measures_lock:
+            _active_measures -= 1
+        _current.record = previous
+
+
+def add_counters(**counters):
+    """Adds counters to the record of the stage measured in the current thread (if any)."""
+    record = getattr(_current, "record", None)
+    if record is not None:
+        for key, value in counters.items():
+            record[key] = record.get(key, 0) + value
+
+
+def add_record(record: dict):
+    """Reports a record (e.g. one returned from a worker process) to the active profiler."""
+    if _active_profiler is not None:
+        _active_profiler.add(record)
+
+
+def is_profiling() -> bool:
+    return _active_profiler is not None
+
+
+def profiling_context() -> dict:
+    """Returns values added to every record of the active profiler (e.g. the package being built)."""
+    return _active_profiler.context if _active_profiler is not None else {}
+
+
+class Profiler:
+    """Collects records of measured `make-translations` stages.
+
+    Usage::
+
+        profiler = Profiler(hooks=[lambda record: print(record)])
+        with profiling(profiler):
+            ...
+        profiler.write_report(Path("profile.json"))
+        print(profiler.summary_table())
+
+    :param hooks: callables receiving every record as soon as it is added
+    :param trace_memory: trace Python allocations with `tracemalloc` (slow)
+    """
+
+    def __init__(self, hooks=(), trace_memory=False):
+        self.hooks = list(hooks)
+        self.trace_memory = trace_memory
+        self.records = []
+        # values added to every record, e.g. the package being built
+        self.context = {}
+        self.started = datetime.now(timezone.utc)
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[dict], None]):
+        self.hooks.append(hook)
+
+    def add(self, record: dict):
+        record = {**self.context, **record}
+        with self._lock:
+            self.records.append(record)
+        for hook in self.hooks:
+            hook(record)
+
+    def report(self) -> dict:
+        return {
+            "started": self.started.isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "records": self.records,
+        }
+
+    def write_report(self, path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2), "utf-8")
+
+    def summary_table(self) -> str:
+        columns = [
+            "wall_time",
+            "cpu_time",
+            "process_children_cpu_time",
+            "process_peak_rss_kb",
+        ]
+        if self.trace_memory:
+            columns.append("process_peak_traced_kb")
+        fixed = {"name", "package", "skipped", "failed", *columns}
+
+        # process-wide values include the overlapping stages
+        rows = [
+            ["stage", "wall [s]", "cpu [s]", "proc. children [s]", "proc. rss [MB]"]
+        ]
+        if self.trace_memory:
+            rows[0].append("proc. traced [MB]")
+        rows[0].append("counters")
+
+        for record in self.records:
+            name = record["name"]
+            if record.get("failed"):
+                name += " (failed)"
+            elif record.get("skipped"):
+                name += " (skipped)"
+            if "package" in record:
+                name = f"{Path(record['package']).name}: {name}"
+            row = [name]
+            for column in columns:
+                value = record.get(column)
+                if value is None:
+                    row.append("-")
+                elif column.endswith("_kb"):
+                    row.append(f"{value / 1024:.1f}")
+                else:
+                    row.append(f"{value:.3f}")
+            row.append(
+                ", ".join(f"{k}={v}" for k, v in record.items() if k not in fixed)
+            )
+            rows.append(row)
+
+        widths = [max(len(row[i]) for row in rows) for i in range(len(rows[0]))]
+        return "\n".join(
+            "  ".join(
+                cell.ljust(width) if i in (0, len(row) - 1) else cell.rjust(width)
+                for i, (cell, width) in enumerate(zip(row, widths))
+            ).rstrip()
+            for row in rows
+        )
+
+
+@contextmanager
+def profiling(profiler: Optional[Profiler]):
+    """Makes `profiler` receive records of all stages measured within the block.
+
+    :param profiler: profiler to activate, when None profiling stays disabled
+    """
+    global _active_profiler
+    if profiler is None:
+        yield None
+        return
+
+    previous = _active_profiler
+    _active_profiler = profiler
+    started_tracing = profiler.trace_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        yield profiler
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _active_profiler = previous
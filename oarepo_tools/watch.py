@@ -0,0 +1,128 @@
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable
+
+import click
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+# Time to wait after the first change notification for more changes (e.g. editor saves)
+DEBOUNCE_INTERVAL = 0.1
+
+
+def snapshot(files: Iterable[Path]) -> dict:
+    """Records modification time and size of each of `files`.
+
+    :param files: paths to files
+    :return: dictionary of path -> (mtime in ns, size)
+    """
+    result = {}
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        result[Path(path)] = (stat.st_mtime_ns, stat.st_size)
+    return result
+
+
+def changed_files(previous: dict, current: dict) -> list:
+    """Lists files that were added, removed or modified between two snapshots."""
+    return sorted(
+        path
+        for path in previous.keys() | current.keys()
+        if previous.get(path) != current.get(path)
+    )
+
+
+if Observer is not None:
+
+    class _WakeUpHandler(FileSystemEventHandler):
+        def __init__(self, wake_up: threading.Event):
+            self.wake_up = wake_up
+
+        def on_any_event(self, event):
+            if event.event_type not in ("opened", "closed_no_write"):
+                self.wake_up.set()
+
+
+def _start_observer(roots: Iterable[Path], wake_up: threading.Event):
+    if Observer is None:
+        click.secho(
+            'watchdog is not installed, polling for changes. Install it using "pip install watchdog" '
+            "to be notified about changes immediately.",
+            fg="yellow",
+        )
+        return None
+
+    observer = Observer()
+    handler = _WakeUpHandler(wake_up)
+    for root in sorted({Path(root) for root in roots if Path(root).is_dir()}):
+        observer.schedule(handler, str(root), recursive=True)
+    observer.start()
+    return observer
+
+
+def watch(
+    roots: Iterable[Path],
+    list_files: Callable[[], Iterable[Path]],
+    on_change: Callable[[list], None],
+    interval=0.5,
+    is_output: Callable[[Path], bool] = None,
+):
+    """Calls `on_change` with a list of changed files whenever any of the watched files changes.
+
+    Filesystem notifications (inotify etc. through `watchdog`) are used when available,
+    otherwise the files are polled every `interval` seconds. Blocks until interrupted.
+
+    Changes of output files (see `is_output`) made while `on_change` runs are not reported,
+    any other file changed in the meantime is reported by the next call.
+
+    :param roots: directories to watch
+    :param list_files: callable returning all watched files (called on every change,
+                       so that new files are picked up)
+    :param on_change: callback receiving the list of changed files
+    :param interval: polling interval in seconds
+    :param is_output: callable telling if a file is written by `on_change` itself
+    """
+    wake_up = threading.Event()
+    observer = _start_observer(roots, wake_up)
+    previous = snapshot(list_files())
+
+    try:
+        while True:
+            if observer is not None:
+                wake_up.wait()
+                time.sleep(DEBOUNCE_INTERVAL)
+                wake_up.clear()
+            else:
+                time.sleep(interval)
+
+            current = snapshot(list_files())
+            changed = changed_files(previous, current)
+            if changed:
+                on_change(changed)
+                if is_output is not None:
+                    # absorb the outputs written by the callback itself, other files keep
+                    # the state from before the callback, so that their edits are not lost
+                    current = {
+                        path: state
+                        for path, state in current.items()
+                        if not is_output(path)
+                    }
+                    current.update(
+                        (path, state)
+                        for path, state in snapshot(list_files()).items()
+                        if is_output(path)
+                    )
+            previous = current
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()
@@ -26,6 +26,7 @@ from oarepo_tools.babel import (
     ensure_babel_configuration,
     ensure_babel_output_translations,
 )
+from oarepo_tools.manifest import MANIFEST_DIR
 
 pytest_plugins = ("celery.contrib.pytest",)
 
@@ -94,6 +95,9 @@ def _clear_translations(config):
     if i18next_output_translations:
         shutil.rmtree(str(i18next_output_translations), ignore_errors=True)
 
+    # build manifest and extraction caches, a leftover manifest would skip stages
+    shutil.rmtree(str(Path(__file__).parent / MANIFEST_DIR), ignore_errors=True)
+
 
 @pytest.fixture(scope="module")
 def extra_entry_points():
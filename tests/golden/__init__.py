@@ -0,0 +1,101 @@
+"""Golden files of the i18next tests - the expected output of the shipped node tools
+(i18next-conv, i18next-scanner) for the inputs defined in the test modules.
+
+The native implementations are compared against them offline, the `*_matches_node` tests
+check that the node tools still produce them. Regenerate them with `python -m tests.golden`
+(needs npm).
+"""
+
+import json
+import os
+from pathlib import Path
+from subprocess import check_call
+
+from oarepo_tools.i18next import npm_proj_cwd, npm_proj_env
+
+GOLDEN_DIR = Path(__file__).parent
+
+
+def compiled_dir(skip_untranslated: bool) -> Path:
+    """:return: directory with the golden `messages` written by `compile_catalog`"""
+    return (
+        GOLDEN_DIR / "compiled" / ("skip-untranslated" if skip_untranslated else "all")
+    )
+
+
+# golden template written by `generate_pot` for the extracted messages
+GOLDEN_POT = GOLDEN_DIR / "messages.pot"
+
+# golden `extracted-messages.json` written by `extract_messages`, named after the source file
+SCANNED_DIR = GOLDEN_DIR / "scanned"
+
+
+def node_compile_catalog(translations_dir, output_dir, languages, skip_untranslated):
+    """Compiles the catalogues with the shipped `compile_catalog` script.
+
+    :param translations_dir: directory with `<language>/LC_MESSAGES/messages.po` catalogues
+    :param output_dir: directory where `messages` are written
+    :param languages: languages to compile
+    :param skip_untranslated: skip untranslated and fuzzy messages
+    """
+    for language in languages:
+        (Path(output_dir) / "messages" / language / "LC_MESSAGES").mkdir(
+            parents=True, exist_ok=True
+        )
+    check_call(
+        ["npm", "run", "compile_catalog", "--", str(translations_dir), str(output_dir)]
+        + (["--skip-untranslated"] if skip_untranslated else []),
+        env={**os.environ, "LANGUAGES": ",".join(languages)},
+        cwd=npm_proj_cwd,
+    )
+
+
+def node_generate_pot(extracted_messages: dict, output_file):
+    """Converts extracted i18next keys to a messages template with the shipped
+    `generate_pot` script.
+
+    :param extracted_messages: dictionary of i18next keys -> translations
+    :param output_file: path of the written template
+    """
+    messages_file = Path(output_file).with_suffix(".json")
+    messages_file.write_text(json.dumps(extracted_messages))
+    try:
+        check_call(
+            ["npm", "run", "generate_pot", "--", str(messages_file), str(output_file)],
+            cwd=npm_proj_cwd,
+        )
+    finally:
+        messages_file.unlink()
+
+
+def node_extract_messages(source_file, output_dir) -> dict:
+    """Reads i18next keys of a source file with the shipped `extract_messages` command.
+
+    :param source_file: scanned JS(X) or TypeScript file
+    :param output_dir: directory where `extracted-messages.json` is written
+    :return: the extracted keys -> default values, in the order of the file
+    """
+    check_call(
+        [
+            "npm",
+            "run",
+            "extract_messages",
+            "--",
+            "--output",
+            str(output_dir),
+            str(source_file),
+        ],
+        env={**npm_proj_env, "LANGUAGES": "en"},
+        cwd=npm_proj_cwd,
+    )
+    return json.loads((Path(output_dir) / "extracted-messages.json").read_text("utf-8"))
+
+
+def read_tree(directory) -> dict:
+    """:return: dictionary of paths relative to the directory -> content of the files"""
+    directory = Path(directory)
+    return {
+        path.relative_to(directory).as_posix(): path.read_bytes()
+        for path in sorted(directory.rglob("*"))
+        if path.is_file()
+    }
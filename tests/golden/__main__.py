@@ -0,0 +1,56 @@
+"""Regenerates the golden files with the shipped node tools: `python -m tests.golden`"""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from oarepo_tools.i18next import ensure_node_toolchain
+from tests.golden import (
+    GOLDEN_POT,
+    SCANNED_DIR,
+    compiled_dir,
+    node_compile_catalog,
+    node_extract_messages,
+    node_generate_pot,
+)
+from tests.test_i18next_compiler import (
+    CATALOGUES,
+    EXTRACTED_MESSAGES,
+    _write_catalogues,
+)
+from tests.test_i18next_scanner import SCANNED_SOURCES
+
+
+def regenerate_compiled(work_dir: Path):
+    _write_catalogues(work_dir / "translations")
+    for skip_untranslated in (True, False):
+        output_dir = compiled_dir(skip_untranslated)
+        shutil.rmtree(output_dir, ignore_errors=True)
+        node_compile_catalog(
+            work_dir / "translations",
+            output_dir,
+            list(CATALOGUES),
+            skip_untranslated,
+        )
+
+
+def regenerate_scanned(work_dir: Path):
+    for name, source in SCANNED_SOURCES.items():
+        source_file = work_dir / name
+        source_file.write_text(source, "utf-8")
+        node_extract_messages(source_file, work_dir)
+        shutil.copyfile(
+            work_dir / "extracted-messages.json", SCANNED_DIR / f"{name}.json"
+        )
+
+
+def main():
+    ensure_node_toolchain()
+    with tempfile.TemporaryDirectory() as work_dir:
+        regenerate_compiled(Path(work_dir))
+        regenerate_scanned(Path(work_dir))
+    node_generate_pot(EXTRACTED_MESSAGES, GOLDEN_POT)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,24 @@
+import io
 import os
 import shutil
 from pathlib import Path
 
 import polib
 
+from oarepo_tools import extraction
 from oarepo_tools.babel import (
+    BABEL_CONFIGURATION,
     compile_babel_translations,
     ensure_babel_configuration,
     ensure_babel_output_translations,
+    extract_babel_catalogue,
     extract_babel_messages,
+    merge_babel_catalogue_files,
     merge_babel_catalogues,
     merge_catalogue_dirs,
     update_babel_translations,
 )
+from oarepo_tools.babel.extractors import extract_jinjax
 from tests.conftest import _clear_translations
 
 jinjax_strings = ["jinjaxstring1"]
@@ -100,6 +106,89 @@ def test_extract_messages(
     # Ensure all translation strings are empty after extraction
     assert all([entry.msgstr == "" for entry in entries.values()])
 
+    # JinjaX attributes are extracted with their line in the template
+    assert entries["jinjaxstring2"].occurrences == [
+        ("mock_module/templates/Component.jinja", "7")
+    ]
+
+
+def test_extract_messages_cache(
+    app, db, cache, monkeypatch, i18n_configuration, babel_ini_file, tmp_path, capsys
+):
+    source_dir = tmp_path / "mock_module"
+    shutil.copytree(
+        Path(__file__).parent / "mock_module" / "templates", source_dir / "templates"
+    )
+    source = source_dir / "module.py"
+    source.write_text("_('pythonstring1')\n")
+    cache_dir = tmp_path / "cache"
+    output_dir = tmp_path / "output"
+    output_dir.mkdir()
+
+    def extract():
+        messages_pot = extract_babel_messages(
+            tmp_path,
+            babel_ini_file,
+            output_dir,
+            i18n_configuration,
+            cache_dir=cache_dir,
+        )
+        return {entry.msgid: entry for entry in polib.pofile(str(messages_pot))}
+
+    original = extract()
+    assert len(list(cache_dir.glob("*.json"))) == 3
+
+    # cached messages are the same as the extracted ones
+    cached = extract()
+    assert list(cached) == list(original)
+    assert [e.occurrences for e in cached.values()] == [
+        e.occurrences for e in original.values()
+    ]
+
+    # only the changed file is extracted again, its previous entry is pruned
+    source.write_text("_('pythonstring1')\n_('pythonstring3')\n")
+    capsys.readouterr()
+    entries = extract()
+    assert "Extracted 1 files, 2 unchanged" in capsys.readouterr().out
+    assert "pythonstring3" in entries
+    assert entries["pythonstring3"].occurrences == [("mock_module/module.py", "2")]
+    assert len(list(cache_dir.glob("*.json"))) == 3
+
+    # an upgrade of the tools extracts everything again
+    monkeypatch.setattr(
+        extraction, "tool_versions", lambda: {"oarepo-tools": "0", "babel": "0"}
+    )
+    capsys.readouterr()
+    assert list(extract()) == list(entries)
+    assert "Extracted 3 files, 0 unchanged" in capsys.readouterr().out
+
+
+def test_extract_jinjax(app, db, cache):
+    template = b"""<div>
+    <h1>{{ _("heading") }}</h1>
+    {% set options = {"size": 1} %}
+    <Field label={ _('label') }
+           options={ {"title": _("title"), "brace": "}"} }
+           help={
+               _("help")
+           }>
+    </Field>
+    <style> p { color: red; } </style>
+</div>"""
+    assert list(
+        extract_jinjax(
+            io.BytesIO(template),
+            ["_"],
+            [],
+            {"encoding": "utf-8", "extensions": "jinjax.jinjax.JinjaX"},
+        )
+    ) == [
+        (2, "_", "heading", []),
+        (4, "_", "label", []),
+        (5, "_", "title", []),
+        (7, "_", "help", []),
+    ]
+
 
 def test_update_babel_translations(
     app,
@@ -245,6 +334,40 @@ def test_merge_babel_catalogues(
     target_path.with_suffix(".mo").unlink()
 
 
+def test_merge_babel_catalogue_files(app, db, cache, tmp_path, pofile):
+    sources = []
+    for index, entries in enumerate(
+        [
+            [polib.POEntry(msgid="Welcome", msgstr="Vitejte")],
+            [
+                polib.POEntry(msgid="Welcome", msgstr="Zdravim"),
+                polib.POEntry(msgid="Other", msgstr=""),
+            ],
+            [polib.POEntry(msgid="Other", msgstr="Ostatni")],
+        ]
+    ):
+        sources.append(tmp_path / f"source{index}.po")
+        pofile(entries, str(sources[-1]))
+    pofile([polib.POEntry(msgid="Target", msgstr="Cil")], str(tmp_path / "batch.po"))
+    pofile([polib.POEntry(msgid="Target", msgstr="Cil")], str(tmp_path / "serial.po"))
+
+    merge_babel_catalogue_files(sources, tmp_path / "batch.po")
+    for source in sources:
+        merge_babel_catalogues(source, tmp_path / "serial.po")
+
+    # the same result as merging the sources one by one, later sources take precedence
+    assert (tmp_path / "batch.po").read_text() == (tmp_path / "serial.po").read_text()
+    assert (tmp_path / "batch.mo").read_bytes() == (tmp_path / "serial.mo").read_bytes()
+    entries = {
+        entry.msgid: entry.msgstr for entry in polib.pofile(tmp_path / "batch.po")
+    }
+    assert entries == {"Target": "Cil", "Welcome": "Zdravim", "Other": "Ostatni"}
+
+    pofile([], str(tmp_path / "nomo.po"))
+    merge_babel_catalogue_files(sources, tmp_path / "nomo.po", compile_mo=False)
+    assert not (tmp_path / "nomo.mo").exists()
+
+
 def test_merge_catalogue_dirs(
     app,
     db,
@@ -282,3 +405,161 @@ def test_merge_catalogue_dirs(
                 for entry in source_entries.values()
             ]
         )
+
+
+def test_update_babel_translations_in_parallel(
+    app,
+    db,
+    cache,
+    i18n_configuration,
+    base_dir,
+    babel_ini_file,
+    babel_output_translations,
+    extra_translations_dir,
+    pofile,
+):
+    _clear_translations(i18n_configuration)
+    babel_output_translations = ensure_babel_output_translations(
+        base_dir, i18n_configuration
+    )
+    messages_pot = extract_babel_messages(
+        base_dir, babel_ini_file, babel_output_translations, i18n_configuration
+    )
+
+    input_translations_dir = extra_translations_dir / "input"
+    (input_translations_dir / "cs/LC_MESSAGES").mkdir(parents=True)
+    pofile(
+        [
+            polib.POEntry(msgid="pythonstring1", msgstr="prelozeno"),
+            polib.POEntry(msgid="inputstring1", msgstr="vstup"),
+        ],
+        str(input_translations_dir / "cs/LC_MESSAGES/messages.po"),
+    )
+
+    update_babel_translations(
+        messages_pot, babel_output_translations, [input_translations_dir], jobs=1
+    )
+    serial_results = {
+        path: path.read_text()
+        for path in babel_output_translations.glob("*/LC_MESSAGES/messages.po")
+    }
+
+    _clear_translations(i18n_configuration)
+    babel_output_translations = ensure_babel_output_translations(
+        base_dir, i18n_configuration
+    )
+    messages_pot = extract_babel_messages(
+        base_dir, babel_ini_file, babel_output_translations, i18n_configuration
+    )
+    update_babel_translations(
+        messages_pot, babel_output_translations, [input_translations_dir], jobs=3
+    )
+    compile_babel_translations(babel_output_translations, jobs=3)
+
+    for path, content in serial_results.items():
+        assert path.read_text() == content
+        assert path.with_suffix(".mo").exists()
+
+    entries = {
+        entry.msgid: entry.msgstr
+        for entry in polib.pofile(
+            str(babel_output_translations / "cs/LC_MESSAGES/messages.po")
+        )
+    }
+    assert entries["pythonstring1"] == "prelozeno"
+    assert entries["inputstring1"] == "vstup"
+
+    entries = {
+        entry.msgid: entry.msgstr
+        for entry in polib.pofile(
+            str(babel_output_translations / "en/LC_MESSAGES/messages.po")
+        )
+    }
+    assert entries["pythonstring1"] == ""
+    assert "inputstring1" not in entries
+
+
+def test_merge_parsed_babel_catalogues(app, db, cache):
+    template = polib.POFile()
+    template.append(polib.POEntry(msgid="Welcome", msgstr=""))
+
+    cs_catalogue = polib.POFile()
+    da_catalogue = polib.POFile()
+
+    assert merge_babel_catalogues(template, cs_catalogue) is cs_catalogue
+    assert merge_babel_catalogues(template, da_catalogue) is da_catalogue
+
+    translations = polib.POFile()
+    translations.append(polib.POEntry(msgid="Welcome", msgstr="Vitejte"))
+    merge_babel_catalogues(translations, cs_catalogue)
+
+    # Template entries are not shared between merged catalogues
+    assert cs_catalogue.find("Welcome").msgstr == "Vitejte"
+    assert da_catalogue.find("Welcome").msgstr == ""
+    assert template.find("Welcome").msgstr == ""
+
+
+def test_extract_babel_catalogue(
+    app, db, cache, i18n_configuration, base_dir, babel_ini_file
+):
+    catalogue = extract_babel_catalogue(base_dir, babel_ini_file, i18n_configuration)
+
+    assert isinstance(catalogue, polib.POFile)
+    msgids = [entry.msgid for entry in catalogue]
+    assert all(
+        string in msgids
+        for string in [*python_strings, *html_strings, *jinjax_strings, *jinjax_extras]
+    )
+    assert catalogue.find("jinjaxstring2").occurrences == [
+        ("mock_module/templates/Component.jinja", "7")
+    ]
+    assert catalogue.metadata["Content-Type"] == "text/plain; charset=utf-8"
+    # the header is flagged as by `pybabel extract`
+    assert '#\n#, fuzzy\nmsgid ""\n' in str(catalogue)
+
+
+def test_extract_jinjax_outside_templates(app, db, cache, tmp_path):
+    components_dir = tmp_path / "mock_module" / "components"
+    components_dir.mkdir(parents=True)
+    (components_dir / "Card.jinja").write_text(
+        '<Card title={ _("componentstring") }>{{ _("bodystring") }}</Card>'
+    )
+
+    catalogue = extract_babel_catalogue(
+        tmp_path,
+        BABEL_CONFIGURATION,
+        {"babel_source_paths": ["mock_module/"]},
+        jobs=1,
+    )
+
+    assert catalogue.find("componentstring").occurrences == [
+        ("mock_module/components/Card.jinja", "1")
+    ]
+    assert catalogue.find("bodystring") is not None
+
+
+def test_extract_messages_parallel(
+    app, db, cache, monkeypatch, i18n_configuration, base_dir, babel_ini_file, tmpdir
+):
+    serial_dir = Path(tmpdir) / "serial"
+    parallel_dir = Path(tmpdir) / "parallel"
+    serial_dir.mkdir()
+    parallel_dir.mkdir()
+
+    serial_pot = extract_babel_messages(
+        base_dir, babel_ini_file, serial_dir, i18n_configuration, jobs=1
+    )
+    monkeypatch.setattr("oarepo_tools.babel.PARALLEL_EXTRACTION_MIN_FILES", 0)
+    parallel_pot = extract_babel_messages(
+        base_dir, babel_ini_file, parallel_dir, i18n_configuration, jobs=2
+    )
+
+    def content(messages_pot):
+        # creation date may differ if the runs fall into different minutes
+        return [
+            line
+            for line in messages_pot.read_bytes().splitlines()
+            if not line.startswith(b'"POT-Creation-Date')
+        ]
+
+    assert content(parallel_pot) == content(serial_pot)
@@ -0,0 +1,40 @@
+import polib
+
+from benchmarks.generate import generate_package
+from oarepo_tools.make_translations import read_configuration
+
+
+def test_generate_package(tmp_path):
+    i18n_configuration = generate_package(
+        tmp_path, python_files=3, jinja_files=2, jsx_files=2, languages=2, entries=60
+    )
+
+    assert i18n_configuration["languages"] == ["cs", "en"]
+    assert read_configuration(tmp_path) == i18n_configuration
+    assert len(list((tmp_path / "bench_module").glob("module_*.py"))) == 3
+    assert len(list((tmp_path / "bench_module/templates").glob("*.jinja"))) == 2
+    assert len(list((tmp_path / "bench_module/templates").glob("*.html"))) == 2
+    assert (
+        len(list((tmp_path / i18n_configuration["i18next_source_paths"][0]).glob("*")))
+        == 2
+    )
+
+    for language in i18n_configuration["languages"]:
+        catalogue = polib.pofile(
+            str(
+                tmp_path
+                / i18n_configuration["babel_output_translations"]
+                / language
+                / "LC_MESSAGES"
+                / "messages.po"
+            )
+        )
+        assert len(catalogue) == 60
+
+    # generated packages are reproducible
+    again = tmp_path / "again"
+    generate_package(
+        again, python_files=3, jinja_files=2, jsx_files=2, languages=2, entries=60
+    )
+    for path in tmp_path.glob("bench_module/**/*.*"):
+        assert (again / path.relative_to(tmp_path)).read_text() == path.read_text()
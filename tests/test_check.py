@@ -0,0 +1,85 @@
+import os
+import shutil
+from pathlib import Path
+
+import polib
+
+from oarepo_tools.check import catalogue_drift, format_drift
+from oarepo_tools.make_translations import check_translations, make_translations
+
+
+def test_catalogue_drift():
+    expected = polib.POFile()
+    expected.append(polib.POEntry(msgid="kept", msgstr="translated"))
+    expected.append(polib.POEntry(msgid="added"))
+    actual = polib.POFile()
+    actual.append(polib.POEntry(msgid="kept", msgstr="old translation"))
+    actual.append(polib.POEntry(msgid="removed"))
+
+    assert catalogue_drift(expected, expected) == {}
+    assert catalogue_drift(expected, None) == {"missing": ["kept", "added"]}
+    drift = catalogue_drift(expected, actual)
+    assert drift == {
+        "missing": ["added"],
+        "obsolete": ["removed"],
+        "changed": ["kept"],
+    }
+
+    assert format_drift("cs", drift, limit=1).splitlines() == [
+        "cs: 1 missing, 1 obsolete, 1 changed",
+        "    missing: 'added'",
+        "    obsolete: 'removed'",
+        "    changed: 'kept'",
+    ]
+
+
+def _snapshot(root: Path):
+    return {
+        path: path.stat().st_mtime_ns
+        for path in root.glob("**/*")
+        if "__pycache__" not in path.parts
+    }
+
+
+def test_check_translations(tmp_path):
+    shutil.copytree(
+        Path(__file__).parent / "mock_module",
+        tmp_path / "mock_module",
+        ignore=shutil.ignore_patterns("translations", "__pycache__"),
+    )
+    (tmp_path / "setup.cfg").write_text(
+        "[oarepo.i18n]\n"
+        "languages =\n    cs\n    en\n"
+        "babel_source_paths =\n    mock_module/\n"
+        "babel_output_translations = mock_module/translations\n"
+    )
+    cwd = os.getcwd()
+    try:
+        # nothing is written when checking
+        before = _snapshot(tmp_path)
+        drift = check_translations(tmp_path, without_ui=True)
+        assert _snapshot(tmp_path) == before
+        assert set(drift) == {"messages.pot", "cs", "en"}
+        assert "jinjaxstring1" in drift["cs"]["missing"]
+        assert "htmlstring2" in drift["en"]["missing"]
+
+        make_translations(tmp_path, without_ui=True)
+        assert check_translations(tmp_path, without_ui=True) == {}
+
+        template = tmp_path / "mock_module" / "templates" / "page.html"
+        template.write_text(template.read_text().replace("htmlstring2", "htmlstring3"))
+        before = _snapshot(tmp_path)
+        drift = check_translations(tmp_path, without_ui=True)
+        assert _snapshot(tmp_path) == before
+        assert drift["messages.pot"] == {
+            "missing": ["htmlstring3"],
+            "obsolete": ["htmlstring2"],
+        }
+        # the language catalogues keep entries that are no longer extracted
+        for language in ("cs", "en"):
+            assert drift[language] == {"missing": ["htmlstring3"]}
+
+        make_translations(tmp_path, without_ui=True)
+        assert check_translations(tmp_path, without_ui=True) == {}
+    finally:
+        os.chdir(cwd)
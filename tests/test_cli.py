@@ -1,6 +1,9 @@
 import os
+import shutil
 from pathlib import Path
 
+import polib
+
 from oarepo_tools.make_translations import main
 
 
@@ -47,3 +50,59 @@ def test_cli_with_empty_setupcfg(app, db, cache, extra_entry_points, cli_runner)
     finally:
         real_config_file.rename(empty_config_file)
         backup_config_file.rename(real_config_file)
+
+
+def _make_package(package_dir, message):
+    shutil.copytree(
+        Path(__file__).parent / "mock_module",
+        package_dir / "mock_module",
+        ignore=shutil.ignore_patterns("translations", "__pycache__"),
+    )
+    (package_dir / "mock_module" / "messages.py").write_text(f"_({message!r})\n")
+    shutil.copy(Path(__file__).parent / "setup.cfg", package_dir / "setup.cfg")
+    return package_dir / "setup.cfg"
+
+
+def test_cli_with_multiple_packages(
+    app, db, cache, extra_entry_points, tmp_path, capsys
+):
+    first = _make_package(tmp_path / "first", "first package message")
+    second = _make_package(tmp_path / "second", "second package message")
+
+    stored_cwd = os.getcwd()
+    try:
+        main(
+            [
+                "--without-ui",
+                "--jobs",
+                "2",
+                str(first),
+                "--all",
+                str(tmp_path / "second" / "*.cfg"),
+            ]
+        )
+    except SystemExit as se:
+        assert se.code == 0
+    finally:
+        os.chdir(stored_cwd)
+
+    for config_file, message, other_message in (
+        (first, "first package message", "second package message"),
+        (second, "second package message", "first package message"),
+    ):
+        translations_dir = config_file.parent / "mock_module" / "translations"
+        for language in ("cs", "en", "da"):
+            catalogue = polib.pofile(
+                str(translations_dir / language / "LC_MESSAGES" / "messages.po")
+            )
+            msgids = {entry.msgid for entry in catalogue}
+            assert message in msgids and other_message not in msgids
+            assert (
+                translations_dir / language / "LC_MESSAGES" / "messages.mo"
+            ).exists()
+
+    output = capsys.readouterr().out
+    summary = output[output.index("Summary:") :]
+    assert f"{first}: OK" in summary
+    assert f"{second}: OK" in summary
+    assert "FAILED" not in summary
@@ -5,6 +5,7 @@ from pathlib import Path
 
 import polib
 
+from oarepo_tools import i18next
 from oarepo_tools.babel import (
     extract_babel_messages,
     merge_babel_catalogues,
@@ -13,8 +14,10 @@ from oarepo_tools.babel import (
 from oarepo_tools.i18next import (
     compile_i18next_translations,
     ensure_i18next_output_translations,
+    ensure_node_toolchain,
     extract_i18next_messages,
     merge_catalogues_from_i18next_translation_dir,
+    merge_i18next_messages_to_catalogue,
     merge_i18next_messages_to_po,
 )
 
@@ -48,6 +51,35 @@ def test_ensure_i18next_output_translations(
         pass
 
 
+def test_ensure_node_toolchain(app, db, cache, tmp_path, monkeypatch):
+    (tmp_path / "package.json").write_text('{"devDependencies": {}}')
+    installs = []
+
+    def npm_install(args, env, cwd):
+        installs.append(args)
+        (Path(cwd) / "node_modules").mkdir(exist_ok=True)
+        (Path(cwd) / "package-lock.json").write_text("{}")
+
+    monkeypatch.setattr(i18next, "npm_proj_cwd", str(tmp_path))
+    monkeypatch.setattr(i18next, "check_call", npm_install)
+
+    def ensure(force=False):
+        monkeypatch.setattr(i18next, "_node_toolchain_ready", False)
+        ensure_node_toolchain(force=force)
+
+    ensure()
+    assert installs == [["npm", "install"]]
+    # up to date, even though npm wrote the lockfile
+    ensure()
+    assert len(installs) == 1
+
+    (tmp_path / "package.json").write_text('{"devDependencies": {"a": "1"}}')
+    ensure()
+    assert len(installs) == 2
+    ensure(force=True)
+    assert len(installs) == 3
+
+
 def test_extract_i18next_messages(app, db, cache, base_dir, tmpdir, i18n_configuration):
     messages_pot = extract_i18next_messages(base_dir, Path(tmpdir), i18n_configuration)
 
@@ -186,6 +218,43 @@ def test_merge_catalogues_from_i18next_translation_dir(
         )
 
 
+def test_merge_i18next_messages_to_catalogue(app, db, cache, tmp_path, pofile):
+    sources = []
+    for index, messages in enumerate(
+        [
+            {"jsstring1": "first", "jsstring2": "first"},
+            {"jsstring2": "second", "jsstring3": ""},
+            {"jsstring3": "third", "jsstring1": ""},
+        ]
+    ):
+        (tmp_path / f"input{index}" / "cs").mkdir(parents=True)
+        sources.append(tmp_path / f"input{index}")
+        (sources[-1] / "cs" / "translations.json").write_text(json.dumps(messages))
+    for name in ("batch", "serial"):
+        (tmp_path / name / "cs/LC_MESSAGES").mkdir(parents=True)
+        pofile(
+            [polib.POEntry(msgid="jsstring1", msgstr="")],
+            str(tmp_path / name / "cs/LC_MESSAGES/messages.po"),
+        )
+
+    merge_catalogues_from_i18next_translation_dir(sources, tmp_path / "batch")
+    for source in sources:
+        merge_i18next_messages_to_po(
+            source / "cs" / "translations.json",
+            tmp_path / "serial/cs/LC_MESSAGES/messages.po",
+        )
+
+    # the same result as merging the sources one by one, later sources take precedence
+    merged = (tmp_path / "batch/cs/LC_MESSAGES/messages.po").read_text()
+    assert merged == (tmp_path / "serial/cs/LC_MESSAGES/messages.po").read_text()
+    catalogue = merge_i18next_messages_to_catalogue([], polib.pofile(merged))
+    assert {entry.msgid: entry.msgstr for entry in catalogue} == {
+        "jsstring1": "first",
+        "jsstring2": "second",
+        "jsstring3": "third",
+    }
+
+
 def test_compile_i18next_translations(
     app,
     db,
@@ -0,0 +1,244 @@
+import json
+
+import polib
+import pytest
+
+from oarepo_tools.i18next import (
+    compile_i18next_translations,
+    configured_i18next_converter,
+    ensure_node_toolchain,
+)
+from oarepo_tools.i18next.compiler import (
+    catalogue_to_i18next,
+    dumps_i18next,
+    i18next_to_catalogue,
+    messages_index,
+)
+from oarepo_tools.po import pofile
+from tests.golden import (
+    GOLDEN_POT,
+    compiled_dir,
+    node_compile_catalog,
+    node_generate_pot,
+    read_tree,
+)
+
+CATALOGUES = {
+    "cs": r"""msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=utf-8\n"
+"Plural-Forms: nplurals=3; plural=(n==1) ? 0 : (n>=2 && n<=4) ? 1 : 2;\n"
+
+msgid "Title"
+msgstr "Název"
+
+msgid "Untranslated"
+msgstr ""
+
+#, fuzzy
+msgid "Fuzzy"
+msgstr "Nejisté"
+
+msgctxt "button"
+msgid "Open"
+msgstr "Otevřít"
+
+msgid "One file"
+msgid_plural "%(count)s files"
+msgstr[0] "Jeden soubor"
+msgstr[1] "%(count)s soubory"
+msgstr[2] ""
+
+msgid "section##title"
+msgstr "Sekce"
+
+msgid "2024"
+msgstr "Rok 2024"
+
+msgid "Quoted \"text\"\tand\\ backslash"
+msgstr "Citovaný \"text\"\ta\\ zpětné lomítko"
+""",
+    "en": r"""msgid ""
+msgstr ""
+"Content-Type: text/plain; charset=utf-8\n"
+
+msgid "Title"
+msgstr ""
+
+msgid "One file"
+msgid_plural "%(count)s files"
+msgstr[0] "One file"
+msgstr[1] "%(count)s files"
+""",
+}
+
+
+def _write_catalogues(translations_dir):
+    for language, content in CATALOGUES.items():
+        catalogue_dir = translations_dir / language / "LC_MESSAGES"
+        catalogue_dir.mkdir(parents=True)
+        (catalogue_dir / "messages.po").write_text(content, "utf-8")
+
+
+def test_catalogue_to_i18next(tmp_path):
+    _write_catalogues(tmp_path)
+    cs = pofile(tmp_path / "cs/LC_MESSAGES/messages.po")
+    en = pofile(tmp_path / "en/LC_MESSAGES/messages.po")
+
+    assert catalogue_to_i18next(cs, "cs") == {
+        "Title": "Název",
+        "Untranslated": "",
+        "Fuzzy": "Nejisté",
+        "One file_0": "Jeden soubor",
+        "One file_1": "%(count)s soubory",
+        "One file_2": "",
+        "section": {"title": "Sekce"},
+        "2024": "Rok 2024",
+        'Quoted "text"\tand\\ backslash': 'Citovaný "text"\ta\\ zpětné lomítko',
+        "Open_button": "Otevřít",
+    }
+    assert catalogue_to_i18next(en, "en", skip_untranslated=True) == {
+        "One file": "One file",
+        "One file_plural": "%(count)s files",
+    }
+
+    resources = catalogue_to_i18next(cs, "cs", skip_untranslated=True)
+    assert "Untranslated" not in resources and "Fuzzy" not in resources
+    assert "One file_2" not in resources
+
+    # fuzzy entries with other flags are skipped as well
+    fuzzy = polib.POFile()
+    fuzzy.append(
+        polib.POEntry(
+            msgid="%(name)s", msgstr="%(name)s", flags=["fuzzy", "python-format"]
+        )
+    )
+    assert catalogue_to_i18next(fuzzy, "cs", skip_untranslated=True) == {}
+    assert catalogue_to_i18next(fuzzy, "cs") == {"%(name)s": "%(name)s"}
+
+    # integer-like keys go first, as in javascript objects
+    assert dumps_i18next(resources, compact=True).startswith('{"2024":"Rok 2024",')
+    assert dumps_i18next({"a": {}}) == '{\n    "a": {}\n}'
+
+
+def test_configured_i18next_converter():
+    assert configured_i18next_converter({"i18next_converter": "native"}) == "native"
+    with pytest.raises(SystemExit):
+        configured_i18next_converter({"i18next_converter": "gettext"})
+
+
+def test_compile_i18next_translations_without_node(tmp_path):
+    _write_catalogues(tmp_path / "translations")
+    compile_i18next_translations(
+        tmp_path / "translations",
+        tmp_path / "i18next",
+        {"languages": ["cs", "en"], "i18next_converter": "native"},
+    )
+
+    translations = json.loads(
+        (tmp_path / "i18next/messages/cs/LC_MESSAGES/translations.json").read_text()
+    )
+    assert translations["Title"] == "Název"
+    assert (tmp_path / "i18next/messages/index.js").read_text() == messages_index(
+        ["cs", "en"]
+    )
+
+
+@pytest.mark.parametrize("skip_untranslated", [True, False])
+def test_compile_i18next_translations_matches_golden(tmp_path, skip_untranslated):
+    _write_catalogues(tmp_path / "translations")
+    compile_i18next_translations(
+        tmp_path / "translations",
+        tmp_path / "native",
+        {"languages": list(CATALOGUES), "i18next_converter": "native"},
+        skip_untranslated=skip_untranslated,
+    )
+    # translations.json of every language and messages/index.js, byte for byte
+    golden = read_tree(compiled_dir(skip_untranslated))
+    assert len(golden) == len(CATALOGUES) + 1
+    assert read_tree(tmp_path / "native") == golden
+
+
+@pytest.mark.parametrize("skip_untranslated", [True, False])
+def test_compile_i18next_translations_matches_node(tmp_path, skip_untranslated):
+    # the shipped i18next-conv based script still writes the golden files
+    ensure_node_toolchain()
+    _write_catalogues(tmp_path / "translations")
+    node_compile_catalog(
+        tmp_path / "translations",
+        tmp_path / "node",
+        list(CATALOGUES),
+        skip_untranslated,
+    )
+    assert read_tree(tmp_path / "node") == read_tree(compiled_dir(skip_untranslated))
+
+
+EXTRACTED_MESSAGES = {
+    "Title": "",
+    "<0>Hello</0> world": "",
+    "{{count}} files": "",
+    "{{count}} files_plural": "",
+    "{{count}} items_0": "",
+    "{{count}} items_1": "",
+    "Open_button": "",
+    "2024": "",
+}
+
+
+def test_i18next_to_catalogue():
+    catalogue = i18next_to_catalogue(EXTRACTED_MESSAGES)
+
+    assert catalogue.metadata["Project-Id-Version"] == "i18next-conv"
+    assert [(entry.msgid, entry.msgctxt) for entry in catalogue] == [
+        ("2024", None),
+        ("Title", None),
+        ("<0>Hello</0> world", None),
+        ("{{count}} files", None),
+        ("{{count}} items", None),
+        ("Open", "button"),
+    ]
+    plural = catalogue.find("{{count}} files")
+    assert plural.msgid_plural == "{{count}} files"
+    assert plural.msgstr_plural == {0: "", 1: ""}
+    # `_<number>` suffixes are plural forms as well
+    assert catalogue.find("{{count}} items").msgid_plural == "{{count}} items"
+    assert all(not entry.translated() for entry in catalogue)
+
+
+def _entries(catalogue):
+    return [
+        (
+            entry.msgctxt,
+            entry.msgid,
+            entry.msgid_plural,
+            entry.msgstr,
+            dict(entry.msgstr_plural),
+        )
+        for entry in catalogue
+    ]
+
+
+# dates of the template change on every run of i18next-conv
+_DATES = ("POT-Creation-Date", "PO-Revision-Date")
+
+
+def test_i18next_to_catalogue_matches_golden():
+    golden = polib.pofile(str(GOLDEN_POT))
+    native = i18next_to_catalogue(EXTRACTED_MESSAGES)
+    assert _entries(native) == _entries(golden)
+    assert native.metadata == {
+        key: value for key, value in golden.metadata.items() if key not in _DATES
+    }
+
+
+def test_i18next_to_catalogue_matches_node(tmp_path):
+    # the shipped i18next-conv based script still writes the golden template
+    ensure_node_toolchain()
+    node_generate_pot(EXTRACTED_MESSAGES, tmp_path / "node.pot")
+    node = polib.pofile(str(tmp_path / "node.pot"))
+    golden = polib.pofile(str(GOLDEN_POT))
+    assert _entries(node) == _entries(golden)
+    for key in _DATES:
+        node.metadata.pop(key, None)
+        golden.metadata.pop(key)
+    assert node.metadata == golden.metadata
@@ -0,0 +1,117 @@
+import json
+
+import pytest
+
+from oarepo_tools.i18next import (
+    _scan_i18next_keys,
+    configured_i18next_scanner,
+    ensure_node_toolchain,
+    i18next_scanner_options,
+    node_worker,
+)
+from oarepo_tools.i18next.scanner import scan_file, scan_source
+from tests.golden import SCANNED_DIR, node_extract_messages
+
+SOURCE = r"""import React from "react";
+import { Trans } from "react-i18next";
+
+// i18next.t("Commented")
+const pattern = /i18next.t\("Regex"\)/g;
+const ratio = count < limit ? i18next.t("Less") : 1 / 2;
+
+export const Files = ({ count, name }) => (
+  <div title={i18next.t('It\'s "quoted"')} {...props}>
+    {i18next.t("Title")}
+    {i18next.t(`Template`)}
+    {i18next.t(`Skipped ${name}`)}
+    {i18next.t("Default value", "Default")}
+    {i18next.t("{{count}} files", { count: count })}
+    {i18next.t("Open", { context: "button" })}
+    <Trans>
+      Hello <strong>{name}</strong>, you have {{ count }} new &amp; unread
+      {"messages"}
+    </Trans>
+    <Trans i18nKey=" welcome " />
+    <Trans defaults="Welcome back" context="admin" />
+    <></>
+  </div>
+);
+"""
+
+# typescript type assertions are not JSX elements
+TYPED_SOURCE = "const a = <string>i18next.t('Typed');"
+
+# sources compared with the golden output of i18next-scanner
+SCANNED_SOURCES = {"index.jsx": SOURCE, "types.ts": TYPED_SOURCE}
+
+
+def test_scan_source():
+    assert scan_source(SOURCE, ["i18next.t"], ["Trans"]) == [
+        "Less",
+        'It\'s "quoted"',
+        "Title",
+        "Template",
+        "Default value",
+        "{{count}} files",
+        "{{count}} files_plural",
+        "Open",
+        "Open_button",
+        "Hello <1></1>, you have {{count}} new & unreadmessages",
+        "welcome",
+        "Welcome back",
+        "Welcome back_admin",
+    ]
+
+    assert scan_source(TYPED_SOURCE, ["i18next.t"], ["Trans"], jsx=False) == ["Typed"]
+
+
+def test_configured_i18next_scanner():
+    assert configured_i18next_scanner({"i18next_scanner": "native"}) == "native"
+    with pytest.raises(SystemExit):
+        configured_i18next_scanner({"i18next_scanner": "babel"})
+
+
+def test_scan_i18next_keys_cache(tmp_path):
+    source_file = tmp_path / "index.jsx"
+    source_file.write_text(SOURCE)
+    other_file = tmp_path / "other.js"
+    other_file.write_text("i18next.t('Other')")
+    typed_file = tmp_path / "types.ts"
+    typed_file.write_text(TYPED_SOURCE)
+    ignored_file = tmp_path / "notes.txt"
+    ignored_file.write_text("i18next.t('Ignored')")
+    files = [str(source_file), str(other_file), str(typed_file), str(ignored_file)]
+
+    keys = _scan_i18next_keys(files, tmp_path / "cache")
+    assert keys[0] == "Less" and keys[-2:] == ["Other", "Typed"]
+    assert "Ignored" not in keys
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 4
+
+    other_file.write_text("i18next.t('Changed')")
+    assert _scan_i18next_keys(files, tmp_path / "cache")[-2] == "Changed"
+    # the entry of the previous content is pruned
+    assert len(list((tmp_path / "cache").glob("*.json"))) == 4
+
+
+@pytest.mark.parametrize("name", SCANNED_SOURCES)
+def test_scan_file_matches_golden(tmp_path, name):
+    source_file = tmp_path / name
+    source_file.write_text(SCANNED_SOURCES[name])
+    golden = json.loads((SCANNED_DIR / f"{name}.json").read_text("utf-8"))
+    assert scan_file(str(source_file), *i18next_scanner_options()) == list(golden)
+
+
+@pytest.mark.parametrize("name", SCANNED_SOURCES)
+def test_scan_file_matches_node(tmp_path, name):
+    # the shipped i18next-scanner command still extracts the golden keys
+    ensure_node_toolchain()
+    source_file = tmp_path / name
+    source_file.write_text(SCANNED_SOURCES[name])
+    node = node_extract_messages(source_file, tmp_path)
+    golden = json.loads((SCANNED_DIR / f"{name}.json").read_text("utf-8"))
+    assert list(node.items()) == list(golden.items())
+    # the node worker extracts the same keys as the command
+    assert (
+        node_worker().request("extract", files=[str(source_file)], languages=["en"])
+        == node
+    )
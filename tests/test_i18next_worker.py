@@ -0,0 +1,94 @@
+import pytest
+
+from oarepo_tools import i18next
+from oarepo_tools.i18next import compile_i18next_translations
+from oarepo_tools.i18next.compiler import messages_index
+from oarepo_tools.i18next.worker import NodeWorker, NodeWorkerError
+
+ECHO_WORKER = r"""
+const readline = require("readline");
+readline.createInterface({ input: process.stdin }).on("line", (line) => {
+  const request = JSON.parse(line);
+  if (request.command === "exit") {
+    process.exit(3);
+  }
+  const response = request.command === "echo"
+    ? { id: request.id, result: { pid: process.pid, value: request.value } }
+    : { id: request.id, error: `unknown command ${request.command}` };
+  process.stdout.write(JSON.stringify(response) + "\n");
+});
+"""
+
+
+def test_node_worker(tmp_path):
+    script = tmp_path / "worker.js"
+    script.write_text(ECHO_WORKER)
+    worker = NodeWorker(script)
+    try:
+        first = worker.request("echo", value="Příliš žluťoučký")
+        assert first["value"] == "Příliš žluťoučký"
+        # the process is reused by later requests
+        assert worker.request("echo", value=[1, {"a": None}]) == {
+            "pid": first["pid"],
+            "value": [1, {"a": None}],
+        }
+
+        with pytest.raises(NodeWorkerError, match="unknown command"):
+            worker.request("missing")
+
+        with pytest.raises(NodeWorkerError, match="exited with code 3"):
+            worker.request("exit")
+        # and started again after it exited
+        assert worker.request("echo", value=1)["pid"] != first["pid"]
+    finally:
+        worker.close()
+    assert worker.process is None
+
+
+class RecordingWorker:
+    def __init__(self, results):
+        self.results = results
+        self.requests = []
+
+    def request(self, command, **arguments):
+        self.requests.append((command, arguments))
+        return self.results[command]
+
+
+def test_node_paths_use_the_worker(tmp_path, monkeypatch):
+    worker = RecordingWorker(
+        {
+            "po_to_json": '{"Title":"Název"}',
+            "json_to_pot": 'msgid ""\nmsgstr ""\n\nmsgid "Title"\nmsgstr ""\n',
+        }
+    )
+    monkeypatch.setattr(i18next, "node_worker", lambda: worker)
+
+    catalogue_dir = tmp_path / "translations" / "cs" / "LC_MESSAGES"
+    catalogue_dir.mkdir(parents=True)
+    (catalogue_dir / "messages.po").write_text('msgid "Title"\nmsgstr "Název"\n')
+    compile_i18next_translations(
+        tmp_path / "translations",
+        tmp_path / "i18next",
+        {"languages": ["cs"], "i18next_converter": "node"},
+    )
+    assert worker.requests == [
+        (
+            "po_to_json",
+            {
+                "language": "cs",
+                "catalogue": 'msgid "Title"\nmsgstr "Název"\n',
+                "skipUntranslated": True,
+            },
+        )
+    ]
+    messages_dir = tmp_path / "i18next" / "messages"
+    assert (messages_dir / "cs/LC_MESSAGES/translations.json").read_text(
+        "utf-8"
+    ) == '{"Title":"Název"}'
+    assert (messages_dir / "index.js").read_text() == messages_index(["cs"])
+
+    template = i18next._i18next_template({"Title": "Název"}, tmp_path, "node")
+    assert worker.requests[-1] == ("json_to_pot", {"resources": {"Title": ""}})
+    assert [entry.msgid for entry in template] == ["Title"]
+    assert not (tmp_path / "extracted-messages.pot").exists()
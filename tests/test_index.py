@@ -0,0 +1,95 @@
+from oarepo_tools.index import DEFAULT_EXCLUDES, FileIndex, classify
+from oarepo_tools.manifest import collect_files
+
+
+def test_file_index(tmp_path):
+    for path in (
+        "module/__init__.py",
+        "module/templates/page.html",
+        "module/templates/Component.jinja",
+        "module/js/index.jsx",
+        "module/js/node_modules/react/index.js",
+        "module/__pycache__/__init__.cpython-311.pyc",
+        "module/generated/messages.py",
+        "module/translations/cs/LC_MESSAGES/messages.po",
+    ):
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    module = tmp_path / "module"
+
+    index = FileIndex(excludes=("node_modules", "__pycache__", "module/generated"))
+    assert index.files([tmp_path], kinds=["python", "jinja2", "jinjax"]) == [
+        module / "__init__.py",
+        module / "templates/Component.jinja",
+        module / "templates/page.html",
+    ]
+    assert index.files([tmp_path], kinds=["javascript"]) == [module / "js/index.jsx"]
+    assert index.files([module / "translations"], ["*/LC_MESSAGES/*.po"]) == [
+        module / "translations/cs/LC_MESSAGES/messages.po"
+    ]
+    assert index.files([module], ["**/*.py"]) == [module / "__init__.py"]
+    assert index.files([module], ["templates/*.html"]) == [
+        module / "templates/page.html"
+    ]
+    assert index.files([module / "__init__.py"]) == [module / "__init__.py"]
+
+    # the walk is cached until invalidated
+    (module / "added.py").write_text("")
+    assert module / "added.py" not in index.files([module], ["**/*.py"])
+    index.invalidate()
+    assert module / "added.py" in index.files([module], ["**/*.py"])
+
+    # default excludes prune vendored javascript
+    assert collect_files([tmp_path], ["**/*.js", "**/*.jsx"]) == [
+        module / "js/index.jsx"
+    ]
+
+    assert classify("index.tsx") == "javascript"
+    assert classify("README.md") is None
+
+
+def test_file_index_anchored_excludes(tmp_path):
+    for path in (
+        "build/lib/module/__init__.py",
+        "dist/module/__init__.py",
+        "module.egg-info/module/__init__.py",
+        "module/__init__.py",
+        "module/build/__init__.py",
+        "module/dist/messages.py",
+    ):
+        (tmp_path / path).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / path).write_text("")
+    module = tmp_path / "module"
+
+    # build output of the package root is pruned, packages of the same name are not
+    index = FileIndex(DEFAULT_EXCLUDES, base_dir=tmp_path)
+    assert index.files([tmp_path], ["**/*.py"]) == [
+        module / "__init__.py",
+        module / "build/__init__.py",
+        module / "dist/messages.py",
+    ]
+    assert index.files([module], ["**/*.py"]) == index.files([tmp_path], ["**/*.py"])
+
+    # outside of the package root, anchored patterns do not apply
+    index = FileIndex(DEFAULT_EXCLUDES, base_dir=module)
+    assert tmp_path / "build/lib/module/__init__.py" in index.files(
+        [tmp_path], ["**/*.py"]
+    )
+
+
+def test_file_index_symlinks(tmp_path):
+    module = tmp_path / "module"
+    (module / "venv").mkdir(parents=True)
+    (module / "__init__.py").write_text("")
+    (module / "venv" / "messages.py").write_text("")
+    (tmp_path / "shared.py").write_text("")
+    (module / "shared.py").symlink_to(tmp_path / "shared.py")
+    # a cycle of directory links is not followed
+    (module / "loop").symlink_to(module, target_is_directory=True)
+
+    assert FileIndex(base_dir=tmp_path).files([module], ["**/*.py"]) == [
+        module / "__init__.py",
+        module / "shared.py",
+        # only the `venv` of the package root is excluded
+        module / "venv/messages.py",
+    ]
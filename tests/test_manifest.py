@@ -0,0 +1,113 @@
+import os
+
+from oarepo_tools.manifest import (
+    BuildManifest,
+    collect_files,
+    counting_outputs,
+    fingerprint,
+    write_output,
+)
+
+
+def test_fingerprint(tmp_path):
+    source = tmp_path / "source.py"
+    source.write_text("_('string1')")
+
+    files = collect_files([tmp_path], ["**/*.py"])
+    assert files == [source]
+
+    original = fingerprint(files, {"languages": ["cs"]})
+    assert original == fingerprint(files, {"languages": ["cs"]})
+    assert original != fingerprint(files, {"languages": ["cs", "en"]})
+
+    source.write_text("_('string2')")
+    assert original != fingerprint(files, {"languages": ["cs"]})
+
+    source.unlink()
+    assert original != fingerprint(files, {"languages": ["cs"]})
+
+
+def test_build_manifest_skips_unchanged_stages(tmp_path):
+    source = tmp_path / "source.py"
+    source.write_text("_('string1')")
+    runs = []
+
+    def inputs():
+        return fingerprint([source])
+
+    manifest = BuildManifest(tmp_path)
+    assert manifest.run("extract", inputs, runs.append, 1)
+    assert not manifest.run("extract", inputs, runs.append, 2)
+
+    # Manifest is persistent across runs
+    manifest = BuildManifest(tmp_path)
+    assert not manifest.run("extract", inputs, runs.append, 3)
+
+    source.write_text("_('string2')")
+    assert manifest.run("extract", inputs, runs.append, 4)
+
+    manifest = BuildManifest(tmp_path, force=True)
+    assert manifest.run("extract", inputs, runs.append, 5)
+
+    assert runs == [1, 4, 5]
+
+
+def test_build_manifest_inputs_and_outputs(tmp_path):
+    source = tmp_path / "source.py"
+    source.write_text("_('string1')")
+    output = tmp_path / "messages.pot"
+    runs = []
+
+    def stage(edit_source=False):
+        runs.append(source.read_text())
+        output.write_text(source.read_text())
+        if edit_source:
+            # saved by the user while the stage is running
+            source.write_text("_('edited')")
+
+    manifest = BuildManifest(tmp_path)
+
+    def run(**kwargs):
+        return manifest.run(
+            "extract",
+            lambda: fingerprint([source]),
+            stage,
+            outputs=lambda: fingerprint([output]),
+            **kwargs,
+        )
+
+    assert run()
+    # the output written by the stage itself does not invalidate it
+    assert not run()
+
+    output.write_text("changed by someone else")
+    assert run()
+    assert not run()
+
+    assert runs == ["_('string1')"] * 2
+
+    source.write_text("_('string2')")
+    assert run(edit_source=True)
+    # the edit made while the stage was running is built by the next run
+    assert run()
+    assert not run()
+    assert runs == ["_('string1')"] * 2 + ["_('string2')", "_('edited')"]
+
+
+def test_write_output_skips_unchanged(tmp_path):
+    output = tmp_path / "messages.po"
+
+    with counting_outputs() as outputs:
+        assert write_output(output, b"content")
+        os.chmod(output, 0o640)
+        os.utime(output, ns=(1, 1))
+
+        # the same content is not written again
+        assert not write_output(output, b"content")
+        assert output.stat().st_mtime_ns == 1
+
+        assert write_output(output, b"changed")
+        assert output.read_bytes() == b"changed"
+        assert output.stat().st_mode & 0o777 == 0o640
+    assert outputs == {"written": 2, "unchanged": 1}
+    assert os.listdir(tmp_path) == ["messages.po"]
@@ -0,0 +1,47 @@
+import threading
+
+import pytest
+
+from oarepo_tools.pipeline import Pipeline, Stage
+
+
+def test_pipeline_respects_requirements():
+    order = []
+    pipeline = Pipeline(jobs=4)
+    pipeline.add(Stage("merge", lambda: order.append("merge"), requires=["a", "b"]))
+    pipeline.add(Stage("a", lambda: order.append("a")))
+    pipeline.add(Stage("b", lambda: order.append("b"), requires=["setup"]))
+    pipeline.add(Stage("setup", lambda: order.append("setup")))
+    pipeline.run()
+
+    assert sorted(order) == ["a", "b", "merge", "setup"]
+    assert order.index("setup") < order.index("b") < order.index("merge")
+    assert order.index("a") < order.index("merge")
+
+
+def test_pipeline_runs_independent_stages_concurrently():
+    # Both stages must be running at the same time to pass the barrier
+    barrier = threading.Barrier(2, timeout=5)
+    pipeline = Pipeline(jobs=2)
+    pipeline.add(Stage("a", barrier.wait))
+    pipeline.add(Stage("b", barrier.wait))
+    pipeline.run()
+
+
+def test_pipeline_errors():
+    def fail():
+        raise RuntimeError("failed")
+
+    ran = []
+    pipeline = Pipeline(jobs=1)
+    pipeline.add(Stage("a", fail))
+    pipeline.add(Stage("b", lambda: ran.append("b"), requires=["a"]))
+    with pytest.raises(RuntimeError):
+        pipeline.run()
+    assert not ran
+
+    pipeline = Pipeline()
+    pipeline.add(Stage("a", lambda: None, requires=["b"]))
+    pipeline.add(Stage("b", lambda: None, requires=["a"]))
+    with pytest.raises(ValueError):
+        pipeline.run()
@@ -0,0 +1,163 @@
+import copy
+
+import polib
+import pytest
+
+from oarepo_tools import configured_choice, parallel_map, po
+
+CATALOGUE = r"""# Translations template for mock_module.
+# This file is distributed under the same license as the mock_module project.
+#
+#, fuzzy
+msgid ""
+msgstr ""
+"Project-Id-Version: mock_module 1.0\n"
+"Content-Type: text/plain; charset=utf-8\n"
+"Plural-Forms: nplurals=3; plural=(n==1) ? 0 : (n>=2 && n<=4) ? 1 : 2;\n"
+
+# translator comment
+#. extracted comment
+#: mock_module/views.py:12 mock_module/templates/page.html:3
+#: mock_module/a-very-long-path/to/a/module/with/many/occurrences.py:1234
+#, python-format
+msgid "Hello %(name)s"
+msgstr "Ahoj %(name)s"
+
+msgctxt "button"
+msgid "Open"
+msgstr "Otevřít"
+
+#: mock_module/views.py:20
+msgid "One file"
+msgid_plural "%(num)s files"
+msgstr[0] "Jeden soubor"
+msgstr[1] "%(num)s soubory"
+msgstr[2] "%(num)s souborů"
+
+#, fuzzy
+#| msgid "Old \"quoted\" message"
+msgid ""
+"A message\n"
+"with a newline"
+msgstr ""
+
+msgid ""
+"A long message that does not fit on a single line and is therefore wrapped "
+"by the writer"
+msgstr ""
+"Dlouhá zpráva, která se nevejde na jeden řádek, a proto ji zapisovač zalomí"
+
+#~ msgid "Removed"
+#~ msgstr "Odstraněno"
+"""
+
+
+def test_parse(tmp_path):
+    catalogue_file = tmp_path / "messages.po"
+    catalogue_file.write_text(CATALOGUE, "utf-8")
+
+    catalogue = po.pofile(catalogue_file)
+    reference = polib.pofile(str(catalogue_file))
+
+    assert isinstance(catalogue, polib.POFile)
+    assert all(isinstance(entry, po.Entry) for entry in catalogue)
+    assert catalogue.header == reference.header
+    assert catalogue.metadata == reference.metadata
+    assert catalogue.metadata_is_fuzzy
+    assert len(catalogue) == len(reference) == 6
+    for entry, reference_entry in zip(catalogue, reference):
+        for attribute in po.Entry.__slots__:
+            if attribute != "obsolete":
+                assert getattr(entry, attribute) == getattr(reference_entry, attribute)
+        assert bool(entry.obsolete) == bool(reference_entry.obsolete)
+
+    assert catalogue.find("Open").msgctxt == "button"
+    assert catalogue.find("One file").msgstr_plural[2] == "%(num)s souborů"
+    assert catalogue[3].previous_msgid == 'Old "quoted" message'
+    assert catalogue[4].msgid.startswith("A long message")
+    assert catalogue[5].obsolete
+
+
+def test_round_trip(tmp_path):
+    catalogue_file = tmp_path / "messages.po"
+    catalogue_file.write_text(CATALOGUE, "utf-8")
+
+    catalogue = po.pofile(catalogue_file)
+    reference = polib.pofile(str(catalogue_file))
+
+    # the same output as polib, byte by byte
+    assert str(catalogue) == str(reference) == CATALOGUE
+    assert catalogue.to_binary() == reference.to_binary()
+
+    catalogue.save(str(tmp_path / "saved.po"))
+    assert (tmp_path / "saved.po").read_text("utf-8") == CATALOGUE
+
+
+def test_mixed_entries():
+    catalogue = po.Catalogue()
+    catalogue.append(po.Entry(msgid="native", occurrences=[("views.py", "1")]))
+    catalogue.append(polib.POEntry(msgid="polib", flags=["fuzzy"]))
+
+    reference = polib.POFile()
+    reference.append(polib.POEntry(msgid="native", occurrences=[("views.py", "1")]))
+    reference.append(polib.POEntry(msgid="polib", flags=["fuzzy"]))
+
+    assert str(catalogue) == str(reference)
+
+    entry = copy.copy(catalogue[0])
+    entry.msgstr = "copied"
+    assert catalogue[0].msgstr == ""
+
+
+def test_polib_fallback(tmp_path):
+    catalogue_file = tmp_path / "messages.po"
+    catalogue_file.write_bytes(
+        CATALOGUE.replace("charset=utf-8", "charset=iso-8859-2").encode("iso-8859-2")
+    )
+
+    # other encodings are parsed by polib
+    catalogue = po.pofile(catalogue_file)
+    assert isinstance(catalogue, po.Catalogue)
+    assert catalogue.find("Open").msgstr == "Otevřít"
+    assert not isinstance(catalogue[0], po.Entry)
+
+    catalogue_file.write_text(CATALOGUE, "utf-8")
+    with po.po_engine("polib"):
+        catalogue = po.pofile(catalogue_file)
+    assert not isinstance(catalogue[0], po.Entry)
+    assert str(catalogue) == CATALOGUE
+
+
+def _engine(shared_data, item):
+    return po.PO_ENGINE
+
+
+def test_po_engine():
+    assert configured_choice({}, "po_engine", po.PO_ENGINES) == "native"
+    assert configured_choice({"po_engine": "polib"}, "po_engine", po.PO_ENGINES) == (
+        "polib"
+    )
+    with pytest.raises(SystemExit):
+        configured_choice({"po_engine": "gettext"}, "po_engine", po.PO_ENGINES)
+
+    # worker processes use the engine of the calling process
+    with po.po_engine("polib"):
+        assert parallel_map(_engine, [1, 2], jobs=2) == ["polib", "polib"]
+    assert po.PO_ENGINE == "native"
+
+
+def test_save_template(tmp_path):
+    template_file = tmp_path / "messages.pot"
+    template = po.Catalogue()
+    template.metadata = {"POT-Creation-Date": "2024-01-01 10:00+0000"}
+    template.append(po.Entry(msgid="Open"))
+    assert po.save_template(template, template_file)
+
+    # only the creation date changed, the file is kept
+    template.metadata["POT-Creation-Date"] = "2024-02-01 10:00+0000"
+    assert not po.save_template(template, template_file)
+    assert "2024-01-01" in template_file.read_text("utf-8")
+
+    template.append(po.Entry(msgid="Close"))
+    assert po.save_template(template, template_file)
+    assert "2024-02-01" in template_file.read_text("utf-8")
@@ -0,0 +1,42 @@
+from oarepo_tools.i18next import i18next_marker_pattern
+from oarepo_tools.prefilter import (
+    JINJA_TRANS_BLOCK,
+    has_markers,
+    marker_pattern,
+    prefilter,
+)
+
+
+def test_marker_pattern():
+    pattern = marker_pattern(["_", "gettext", "lazy_gettext"], [JINJA_TRANS_BLOCK])
+
+    assert pattern.search(b'title = _("Title")')
+    assert pattern.search(b"self._ ('Title')")
+    assert pattern.search(b'label = lazy_gettext(\n    "Label"\n)')
+    assert pattern.search(b"{%- trans %}Hello{% endtrans %}")
+    assert not pattern.search(b"import gettext")
+    assert not pattern.search(b'my_("Title")')
+    assert not pattern.search(b'ngettext_lazy("Title")')
+
+    pattern = i18next_marker_pattern()
+    assert pattern.search(b'i18next.t("Title")')
+    assert pattern.search(b"<Trans>Hello</Trans>")
+    assert not pattern.search(b'import { i18next } from "@translations/i18next"')
+
+
+def test_prefilter(tmp_path, capsys):
+    files = {
+        "messages.py": '_("Title")',
+        "constants.py": "TITLE = 'Title'",
+        "empty.py": "",
+    }
+    for name, content in files.items():
+        (tmp_path / name).write_text(content)
+    pattern = marker_pattern(["_"])
+
+    assert has_markers(tmp_path / "messages.py", pattern)
+    assert not has_markers(tmp_path / "empty.py", pattern)
+    assert prefilter([tmp_path / name for name in files], pattern, "babel") == [
+        tmp_path / "messages.py"
+    ]
+    assert "Skipped 2 of 3 babel files (67%)" in capsys.readouterr().out
@@ -0,0 +1,73 @@
+import json
+
+import pytest
+
+from oarepo_tools.pipeline import Pipeline, Stage
+from oarepo_tools.profiling import Profiler, add_counters, profiling
+
+
+def test_profiler_records_stages(tmp_path):
+    hooked = []
+    profiler = Profiler(hooks=[hooked.append], trace_memory=True)
+
+    def extract():
+        add_counters(files_scanned=2)
+        add_counters(files_scanned=3)
+
+    pipeline = Pipeline(jobs=2)
+    pipeline.add(Stage("extract", extract))
+    pipeline.add(Stage("compile", lambda: None, requires=["extract"]))
+
+    with profiling(profiler):
+        profiler.context["package"] = "mock_module"
+        pipeline.run()
+
+    assert [record["name"] for record in profiler.records] == ["extract", "compile"]
+    assert hooked == profiler.records
+
+    extract_record = profiler.records[0]
+    assert extract_record["package"] == "mock_module"
+    assert extract_record["files_scanned"] == 5
+    assert extract_record["skipped"] is False
+    assert extract_record["wall_time"] >= 0
+    assert extract_record["cpu_time"] >= 0
+    assert "process_peak_rss_kb" in extract_record
+    assert "process_peak_traced_kb" in extract_record
+
+    report_path = tmp_path / "profile.json"
+    profiler.write_report(report_path)
+    assert json.loads(report_path.read_text())["records"] == profiler.records
+
+    table = profiler.summary_table().splitlines()
+    assert len(table) == 3
+    assert "mock_module: extract" in table[1]
+    assert "files_scanned=5" in table[1]
+
+
+def test_profiler_records_failed_stage():
+    profiler = Profiler()
+
+    def extract():
+        add_counters(files_scanned=1)
+        raise ValueError("broken source")
+
+    pipeline = Pipeline()
+    pipeline.add(Stage("extract", extract))
+
+    with profiling(profiler):
+        with pytest.raises(ValueError):
+            pipeline.run()
+
+    assert len(profiler.records) == 1
+    record = profiler.records[0]
+    assert record["name"] == "extract"
+    assert record["failed"] == "ValueError: broken source"
+    assert record["files_scanned"] == 1
+    assert record["wall_time"] >= 0
+    assert "extract (failed)" in profiler.summary_table()
+
+
+def test_stages_without_profiler():
+    pipeline = Pipeline()
+    pipeline.add(Stage("extract", lambda: add_counters(files_scanned=1)))
+    assert pipeline.run() == {"extract": True}
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from oarepo_tools import watch as watch_module
+from oarepo_tools.watch import changed_files, snapshot, watch
+
+
+class StopWatching(Exception):
+    pass
+
+
+def test_changed_files(tmp_path):
+    first = tmp_path / "first.py"
+    second = tmp_path / "second.py"
+    first.write_text("_('string1')")
+
+    previous = snapshot([first, second])
+    assert list(previous) == [first]
+
+    first.write_text("_('string1') + _('string2')")
+    second.write_text("_('string3')")
+    assert changed_files(previous, snapshot([first, second])) == [first, second]
+
+
+@pytest.mark.parametrize("observer", [True, False])
+def test_watch(tmp_path, monkeypatch, observer):
+    if not observer:
+        monkeypatch.setattr(watch_module, "Observer", None)
+
+    source = tmp_path / "source.py"
+    source.write_text("_('string1')")
+    output = tmp_path / "output.po"
+    changes = []
+
+    def on_change(changed):
+        changes.append(changed)
+        if len(changes) == 2:
+            raise StopWatching()
+        # changes of outputs made by the callback itself are not reported
+        output.write_text(str(len(changes)))
+        # a source saved while the callback is running is reported by the next call
+        time.sleep(0.5)
+
+    def modify():
+        time.sleep(0.5)
+        source.write_text("_('string2')")
+        time.sleep(0.3)
+        source.write_text("_('string3') + _('string4')")
+
+    threading.Thread(target=modify, daemon=True).start()
+    with pytest.raises(StopWatching):
+        watch(
+            [tmp_path],
+            lambda: [source, output],
+            on_change,
+            interval=0.1,
+            is_output=lambda path: path == output,
+        )
+
+    assert changes == [[source], [source]]